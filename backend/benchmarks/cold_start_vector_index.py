@@ -0,0 +1,124 @@
+"""Cold-start benchmark: legacy pickled VectorStoreIndex vs StorageContext + Chroma.
+
+The legacy format pickled the whole index object, and with it the embedding
+model it referenced (for bge-base, ~440 MB of weights), so every boot paid to
+deserialize a second copy of a model ModelManager had already loaded. The new
+format persists only docstore/index metadata and rehydrates from Chroma.
+
+Run from backend/:
+    python -m benchmarks.cold_start_vector_index
+    python -m benchmarks.cold_start_vector_index --docs 500 --weights-mb 440
+    python -m benchmarks.cold_start_vector_index --hf-model BAAI/bge-base-en-v1.5
+
+Without ``--hf-model`` a mock embedder carrying ``--weights-mb`` of dummy
+weights stands in for the real model, so the benchmark runs offline.
+"""
+
+import argparse
+import pickle
+import statistics
+import tempfile
+import time
+from pathlib import Path
+
+import chromadb
+import numpy as np
+from llama_index.core import Document, StorageContext, VectorStoreIndex, load_index_from_storage
+from llama_index.core.embeddings import MockEmbedding
+from llama_index.core.node_parser import SentenceSplitter
+from llama_index.vector_stores.chroma import ChromaVectorStore
+from pydantic import PrivateAttr
+
+
+class WeightedMockEmbedding(MockEmbedding):
+    """Mock embedder that pickles like a real model: it carries its weights."""
+
+    _weights: np.ndarray = PrivateAttr()
+
+    def __init__(self, weights_mb: int, **kwargs) -> None:
+        super().__init__(**kwargs)
+        self._weights = np.ones(weights_mb * 1024 * 1024 // 4, dtype=np.float32)
+
+
+def make_embed_model(args):
+    if args.hf_model:
+        from llama_index.embeddings.huggingface import HuggingFaceEmbedding
+
+        return HuggingFaceEmbedding(model_name=args.hf_model)
+    return WeightedMockEmbedding(args.weights_mb, embed_dim=768)
+
+
+def time_it(fn, repeat: int) -> float:
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - start)
+    return statistics.median(samples)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--docs", type=int, default=200)
+    parser.add_argument("--weights-mb", type=int, default=440)
+    parser.add_argument("--hf-model", default=None)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    embed_model = make_embed_model(args)
+    documents = [
+        Document(text=f"Document {i}. " + "Shipped a low-latency search service. " * 40)
+        for i in range(args.docs)
+    ]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp_path = Path(tmp)
+        client = chromadb.PersistentClient(path=str(tmp_path / "chroma"))
+        collection = client.get_or_create_collection("bench")
+
+        def vector_store():
+            return ChromaVectorStore(chroma_collection=collection)
+
+        index = VectorStoreIndex.from_documents(
+            documents,
+            embed_model=embed_model,
+            transformations=[SentenceSplitter(chunk_size=800, chunk_overlap=100)],
+            storage_context=StorageContext.from_defaults(vector_store=vector_store()),
+        )
+
+        pickle_path = tmp_path / "vector_store.pkl"
+        with open(pickle_path, "wb") as f:
+            pickle.dump(index, f)
+        metadata_dir = tmp_path / "vector"
+        index.storage_context.persist(persist_dir=str(metadata_dir))
+
+        def load_pickle():
+            with open(pickle_path, "rb") as f:
+                pickle.load(f)
+
+        def load_storage_context():
+            load_index_from_storage(
+                StorageContext.from_defaults(
+                    persist_dir=str(metadata_dir), vector_store=vector_store()
+                ),
+                embed_model=embed_model,
+            )
+
+        legacy = time_it(load_pickle, args.repeat)
+        current = time_it(load_storage_context, args.repeat)
+        pickle_bytes = pickle_path.stat().st_size
+        metadata_bytes = sum(p.stat().st_size for p in metadata_dir.iterdir())
+
+    print(f"docs={args.docs}  embedder={args.hf_model or f'mock+{args.weights_mb}MB'}")
+    print(f"{'format':<22}{'on disk':>12}{'median load':>14}")
+    print(f"{'pickle (legacy)':<22}{_size(pickle_bytes):>12}{legacy:>13.3f}s")
+    print(f"{'StorageContext+Chroma':<22}{_size(metadata_bytes):>12}{current:>13.3f}s")
+    print(f"speedup: {legacy / current:.1f}x")
+
+
+def _size(n: int) -> str:
+    return f"{n / 1024 / 1024:.1f} MB" if n >= 1024 * 1024 else f"{n / 1024:.1f} KB"
+
+
+if __name__ == "__main__":
+    main()
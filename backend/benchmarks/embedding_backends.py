@@ -0,0 +1,172 @@
+"""Embedding backend benchmark: torch vs ONNX Runtime vs ONNX int8.
+
+For each backend, in a fresh process so resident memory is attributable:
+model load time, peak RSS, single-query embedding latency (the part on the
+request's critical path) and chunk-embedding throughput (index builds). Then
+retrieval agreement against torch on our own documents:
+
+  top-1     share of questions whose best chunk matches torch's
+  overlap   mean |top-k ∩ torch top-k| / k
+  mixed     overlap when the backend's query vectors search chunks embedded
+            by torch, i.e. right after switching EMBEDDING_BACKEND on an
+            existing index (chunks are not re-embedded)
+  cosine    mean cosine between the two backends' vectors for each question
+
+Run from backend/ (ONNX backends need ``pip install "optimum[onnxruntime]"``):
+    python -m benchmarks.embedding_backends
+    python -m benchmarks.embedding_backends --backends torch onnx-int8 --top-k 4
+    python -m benchmarks.embedding_backends --queries questions.txt
+"""
+
+import argparse
+import resource
+import statistics
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import get_context
+from types import SimpleNamespace
+
+import numpy as np
+
+DEFAULT_QUESTIONS = [
+    "What is your current role?",
+    "Where did you go to university?",
+    "What programming languages do you know best?",
+    "Tell me about a project you are proud of.",
+    "Have you worked with distributed systems?",
+    "What machine learning experience do you have?",
+    "How do you approach debugging a production incident?",
+    "What cloud platforms have you used?",
+    "Are you open to relocating?",
+    "What did you build during your internship?",
+    "How can I contact you?",
+    "What are your hobbies outside work?",
+]
+
+
+def load_chunks(docs_dir: str, chunk_size: int, chunk_overlap: int) -> list[str]:
+    from llama_index.core import SimpleDirectoryReader
+    from llama_index.core.node_parser import SentenceSplitter
+
+    documents = SimpleDirectoryReader(docs_dir).load_data()
+    splitter = SentenceSplitter(chunk_size=chunk_size, chunk_overlap=chunk_overlap)
+    return [node.get_content() for node in splitter.get_nodes_from_documents(documents)]
+
+
+def run_backend(backend, model_name, onnx_dir, quantization, chunks, questions, repeat):
+    """Child process: load one backend, time it, return its vectors."""
+    from chat.embedding_backend import load_embedding_model
+
+    started = time.perf_counter()
+    settings = SimpleNamespace(
+        embedding_model=model_name,
+        embedding_backend=backend,
+        embedding_onnx_dir=onnx_dir,
+        embedding_onnx_quantization=quantization,
+    )
+    model, loaded = load_embedding_model(settings)
+    model.get_query_embedding("warm up")
+    load_seconds = time.perf_counter() - started
+
+    latencies = []
+    for _ in range(repeat):
+        for question in questions:
+            start = time.perf_counter()
+            model.get_query_embedding(question)
+            latencies.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    chunk_vectors = model.get_text_embedding_batch(chunks)
+    chunk_seconds = time.perf_counter() - start
+
+    return {
+        "loaded": loaded,
+        "load_s": load_seconds,
+        "rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+        "query_p50_ms": statistics.median(latencies) * 1000,
+        "query_p95_ms": statistics.quantiles(latencies, n=20)[-1] * 1000,
+        "chunks_per_s": len(chunks) / chunk_seconds if chunk_seconds else 0.0,
+        "queries": np.asarray([model.get_query_embedding(q) for q in questions]),
+        "chunks": np.asarray(chunk_vectors),
+    }
+
+
+def top_k(queries: np.ndarray, chunks: np.ndarray, k: int) -> np.ndarray:
+    queries = queries / np.linalg.norm(queries, axis=1, keepdims=True)
+    chunks = chunks / np.linalg.norm(chunks, axis=1, keepdims=True)
+    return np.argsort(-(queries @ chunks.T), axis=1)[:, :k]
+
+
+def overlap(a: np.ndarray, b: np.ndarray) -> float:
+    k = a.shape[1]
+    return float(np.mean([len(set(x) & set(y)) / k for x, y in zip(a, b, strict=True)]))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--backends", nargs="+", default=["torch", "onnx", "onnx-int8"])
+    parser.add_argument("--model", default="BAAI/bge-base-en-v1.5")
+    parser.add_argument("--docs-dir", default="./documents")
+    parser.add_argument("--chunk-size", type=int, default=800)
+    parser.add_argument("--chunk-overlap", type=int, default=100)
+    parser.add_argument("--queries", default=None, help="file with one question per line")
+    parser.add_argument("--quantization", default="avx2")
+    parser.add_argument("--onnx-dir", default=None, help="reuse an int8 export directory")
+    parser.add_argument("--top-k", type=int, default=4)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    if "torch" not in args.backends:
+        args.backends.insert(0, "torch")  # the reference for agreement
+    questions = DEFAULT_QUESTIONS
+    if args.queries:
+        with open(args.queries, encoding="utf-8") as f:
+            questions = [line.strip() for line in f if line.strip()]
+    chunks = load_chunks(args.docs_dir, args.chunk_size, args.chunk_overlap)
+    k = min(args.top_k, len(chunks))
+
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        for backend in args.backends:
+            with ProcessPoolExecutor(1, mp_context=get_context("spawn")) as pool:
+                result = pool.submit(
+                    run_backend,
+                    backend,
+                    args.model,
+                    args.onnx_dir or tmp,
+                    args.quantization,
+                    chunks,
+                    questions,
+                    args.repeat,
+                ).result()
+            if result["loaded"] != backend:
+                print(f"{backend}: unavailable (fell back to {result['loaded']}); skipped")
+                continue
+            results[backend] = result
+
+    reference = results["torch"]
+    reference_top = top_k(reference["queries"], reference["chunks"], k)
+    print(f"model={args.model}  chunks={len(chunks)}  questions={len(questions)}  k={k}")
+    print(
+        f"{'backend':<11}{'load':>8}{'rss':>9}{'q p50':>9}{'q p95':>9}{'chunks/s':>10}"
+        f"{'top-1':>8}{'overlap':>9}{'mixed':>8}{'cosine':>8}"
+    )
+    for backend, r in results.items():
+        own = top_k(r["queries"], r["chunks"], k)
+        mixed = top_k(r["queries"], reference["chunks"], k)
+        cosine = np.mean(
+            np.sum(r["queries"] * reference["queries"], axis=1)
+            / (np.linalg.norm(r["queries"], axis=1) * np.linalg.norm(reference["queries"], axis=1))
+        )
+        print(
+            f"{backend:<11}{r['load_s']:>7.1f}s{r['rss_mb']:>6.0f} MB"
+            f"{r['query_p50_ms']:>7.1f}ms{r['query_p95_ms']:>7.1f}ms{r['chunks_per_s']:>10.1f}"
+            f"{np.mean(own[:, 0] == reference_top[:, 0]):>8.2f}"
+            f"{overlap(own, reference_top):>9.2f}{overlap(mixed, reference_top):>8.2f}"
+            f"{cosine:>8.4f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,133 @@
+"""KG retrieval benchmark: LLM keyword expansion vs the LLM-free entity mode.
+
+Brings the RAG stack up as the server does, then asks the same questions in
+KG mode under each ``KG_RETRIEVAL_MODE`` (answer and retrieval caches off):
+
+  retrieval   KG retriever alone; in "llm" mode this includes the keyword
+              expansion round trip to the provider
+  ttft        time to the first streamed chunk of the answer, as a visitor
+              sees it through ``QueryEngine.process_query``
+  total       time to the end of the answer
+  nodes       nodes handed to synthesis
+  shared      mean share of the "llm" mode's context (by node text) that the
+              other mode also retrieved
+
+Needs provider keys and makes real LLM calls; ``--pause`` spaces questions
+out so free-tier rate limits don't skew the numbers. Run from backend/:
+    python -m benchmarks.kg_retrieval
+    python -m benchmarks.kg_retrieval --repeat 3 --pause 6
+    python -m benchmarks.kg_retrieval --queries questions.txt
+"""
+
+import argparse
+import asyncio
+import statistics
+import time
+
+from benchmarks.embedding_backends import DEFAULT_QUESTIONS
+from chat.kg_retrieval import KG_RETRIEVAL_MODES
+
+
+def percentile(samples: list[float], q: float) -> float:
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+async def ask(query_engine, question: str, chat_size: int) -> tuple[float, float]:
+    from chat.chatdata import Chat
+
+    start = time.perf_counter()
+    ttft = None
+    async for _chunk in query_engine.process_query(question, Chat(chat_size), None, "KG"):
+        if ttft is None:
+            ttft = time.perf_counter() - start
+    total = time.perf_counter() - start
+    return (ttft if ttft is not None else total), total
+
+
+async def run_mode(cm, mode: str, questions: list[str], repeat: int, pause: float) -> dict:
+    from llama_index.core.schema import QueryBundle
+
+    from chat.prompt import CURRENT_QUESTION
+
+    cm.settings.kg_retrieval_mode = mode
+    query_engine = cm.query_engine
+    if not query_engine.initialize():
+        raise RuntimeError(f"KG_RETRIEVAL_MODE={mode} failed to initialize")
+    query_engine.cache_manager = None
+
+    result = {"retrieval": [], "ttft": [], "total": [], "nodes": [], "context": {}}
+    for question in questions:
+        for _ in range(repeat):
+            query_context = query_engine.system_prompt + f"\n{CURRENT_QUESTION} {question}\n"
+            start = time.perf_counter()
+            nodes = query_engine.query_engine_KG.retrieve(QueryBundle(query_context))
+            result["retrieval"].append(time.perf_counter() - start)
+            result["nodes"].append(len(nodes))
+            result["context"][question] = {n.node.get_content() for n in nodes}
+
+            ttft, total = await ask(query_engine, question, cm.settings.chat_size)
+            result["ttft"].append(ttft)
+            result["total"].append(total)
+            await asyncio.sleep(pause)
+    return result
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--modes", nargs="+", default=list(KG_RETRIEVAL_MODES))
+    parser.add_argument("--provider", default=None, help="defaults to DEFAULT_MODEL_PROVIDER")
+    parser.add_argument("--queries", default=None, help="file with one question per line")
+    parser.add_argument("--repeat", type=int, default=1)
+    parser.add_argument("--pause", type=float, default=4.0, help="seconds between questions")
+    args = parser.parse_args()
+
+    import server
+
+    questions = DEFAULT_QUESTIONS
+    if args.queries:
+        with open(args.queries, encoding="utf-8") as f:
+            questions = [line.strip() for line in f if line.strip()]
+    server.SETTINGS.retrieval_cache_size = 0
+    cm = server._build_chat_manager(args.provider or server.SETTINGS.default_model_provider)
+
+    async def run_all() -> dict[str, dict]:
+        # One event loop for every mode: the async LLM clients are bound to it.
+        return {
+            mode: await run_mode(cm, mode, questions, args.repeat, args.pause)
+            for mode in args.modes
+        }
+
+    try:
+        results = asyncio.run(run_all())
+    finally:
+        cm.cleanup()
+
+    reference = results.get("llm")
+    print(
+        f"{'mode':<8}{'retrieval p50':>15}{'p95':>8}{'ttft p50':>10}{'p95':>8}"
+        f"{'total p50':>11}{'nodes':>7}{'shared':>8}"
+    )
+    for mode, r in results.items():
+        shared = "-"
+        if reference is not None and mode != "llm":
+            ratios = [
+                len(r["context"][q] & ref) / len(ref)
+                for q, ref in reference["context"].items()
+                if ref
+            ]
+            shared = f"{statistics.mean(ratios):.0%}" if ratios else "-"
+        print(
+            f"{mode:<8}"
+            f"{statistics.median(r['retrieval']) * 1000:>13.0f}ms"
+            f"{percentile(r['retrieval'], 0.95) * 1000:>6.0f}ms"
+            f"{statistics.median(r['ttft']) * 1000:>8.0f}ms"
+            f"{percentile(r['ttft'], 0.95) * 1000:>6.0f}ms"
+            f"{statistics.median(r['total']) * 1000:>9.0f}ms"
+            f"{statistics.mean(r['nodes']):>7.1f}"
+            f"{shared:>8}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+"""Semantic cache calibration: where to put SEMANTIC_CACHE_THRESHOLD.
+
+Embeds labelled question pairs with the configured embedding model and
+reports their cosine similarity two ways:
+
+  query     ``get_query_embedding`` on both sides (bge's retrieval
+            instruction prepended), how the cache used to compare questions
+  text      ``get_text_embedding`` on both sides, the symmetric embedding the
+            cache compares questions with now
+
+For each, the lowest paraphrase score and the highest near-miss score (same
+question about a different entity, which must not share an answer). A
+threshold between the two serves paraphrases without cross-serving
+near-misses; if they overlap, no threshold does. Run from backend/:
+    python -m benchmarks.semantic_cache
+    python -m benchmarks.semantic_cache --pairs pairs.tsv   # a<TAB>b<TAB>hit|miss
+"""
+
+import argparse
+
+import numpy as np
+
+# (question, question, should they share a cached answer?)
+DEFAULT_PAIRS = [
+    ("What is your current role?", "What do you do right now?", True),
+    ("Where did you go to university?", "Which university did you attend?", True),
+    ("What programming languages do you know best?", "Which languages are you strongest in?", True),
+    ("How can I contact you?", "What's the best way to reach you?", True),
+    ("What are your hobbies outside work?", "What do you do for fun?", True),
+    (
+        "Have you worked with distributed systems?",
+        "Do you have distributed systems experience?",
+        True,
+    ),
+    ("Did you work at Moss?", "Did you work at Google?", False),
+    ("What did you build at Moss?", "What did you build at your internship?", False),
+    ("Have you used Redis?", "Have you used Kafka?", False),
+    ("Do you know Python?", "Do you know Rust?", False),
+    ("What did you study at IU Bloomington?", "What did you study in high school?", False),
+    ("Tell me about Inpersona.", "Tell me about Odyssey.", False),
+]
+
+
+def load_pairs(path: str) -> list[tuple[str, str, bool]]:
+    pairs = []
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            if line.strip():
+                a, b, label = line.rstrip("\n").split("\t")
+                pairs.append((a, b, label.strip().lower() == "hit"))
+    return pairs
+
+
+def cosine(a, b) -> float:
+    a, b = np.asarray(a, dtype=np.float32), np.asarray(b, dtype=np.float32)
+    return float(a @ b / (np.linalg.norm(a) * np.linalg.norm(b)))
+
+
+def main() -> None:
+    from chat.embedding_backend import load_embedding_model
+    from settings import PropertyGraphSettings
+
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("--pairs", help="TSV of question<TAB>question<TAB>hit|miss")
+    args = parser.parse_args()
+    pairs = load_pairs(args.pairs) if args.pairs else DEFAULT_PAIRS
+
+    settings = PropertyGraphSettings.from_env()
+    model, _loaded = load_embedding_model(settings)
+    print(f"{settings.embedding_model} ({settings.embedding_backend}), {len(pairs)} pairs")
+    print(f"current SEMANTIC_CACHE_THRESHOLD={settings.semantic_cache_threshold}\n")
+
+    for kind, embed in (
+        ("query", model.get_query_embedding),
+        ("text", model.get_text_embedding),
+    ):
+        hits, misses = [], []
+        for a, b, should_hit in pairs:
+            score = cosine(embed(a), embed(b))
+            (hits if should_hit else misses).append(score)
+            print(f"  {kind:5} {score:.3f} {'hit ' if should_hit else 'miss'}  {a} | {b}")
+        low_hit, high_miss = min(hits), max(misses)
+        verdict = (
+            f"any threshold in ({high_miss:.3f}, {low_hit:.3f}] separates them"
+            if high_miss < low_hit
+            else "overlap: no threshold separates them"
+        )
+        print(
+            f"{kind}: lowest paraphrase {low_hit:.3f}, highest near-miss {high_miss:.3f}; {verdict}\n"
+        )
+
+
+if __name__ == "__main__":
+    main()
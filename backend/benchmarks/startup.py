@@ -0,0 +1,89 @@
+"""Startup benchmark: where a cold start of the backend spends its time.
+
+Each run is a fresh interpreter that imports ``server`` (all that stands
+between process start and the first ``/health`` answer), then brings the RAG
+stack up exactly as the background warmup does and reports the stage timings
+``StartupProgress`` records:
+
+  imports   deferred imports (torch, transformers, chromadb, LlamaIndex)
+  models    LLM clients + embedding model load
+  chroma    Chroma client and collection open
+  indices   vector + property-graph index load (or incremental sync/build)
+  engines   query engines
+
+Run from backend/ with the same environment as the server (.env is read).
+With existing storage this measures a restart; against empty storage it
+includes the full index build:
+    python -m benchmarks.startup
+    python -m benchmarks.startup --repeat 3 --imports 15
+"""
+
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+from collections import Counter
+
+from chat.startup import STAGES
+
+CHILD = """
+import json, time
+start = time.perf_counter()
+import server
+server_import = time.perf_counter() - start
+from chat.startup import StartupProgress
+progress = StartupProgress()
+cm = server._build_chat_manager(server.SETTINGS.default_model_provider, progress)
+total = time.perf_counter() - start
+cm.cleanup()
+print(json.dumps({"server import": server_import, **progress.completed, "total": total}))
+"""
+
+
+def run_once() -> dict[str, float]:
+    out = subprocess.run(
+        [sys.executable, "-c", CHILD], capture_output=True, text=True, check=True
+    ).stdout
+    return json.loads(out.strip().splitlines()[-1])
+
+
+def import_breakdown(top: int) -> list[tuple[str, float]]:
+    """Self import time of ``chat.ChatManager``'s dependency tree, per top-level package."""
+    stderr = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import chat.ChatManager"],
+        capture_output=True,
+        text=True,
+        check=True,
+    ).stderr
+    totals: Counter[str] = Counter()
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, _cumulative, module = line.removeprefix("import time:").split("|")
+        totals[module.strip().split(".")[0]] += int(self_us)
+    return [(package, us / 1e6) for package, us in totals.most_common(top)]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=1)
+    parser.add_argument("--imports", type=int, default=10, help="packages to list (0 = none)")
+    args = parser.parse_args()
+
+    runs = [run_once() for _ in range(args.repeat)]
+    print(f"{'stage':<16}{'median':>10}")
+    for stage in ("server import", *STAGES, "total"):
+        samples = [run[stage] for run in runs if stage in run]
+        if samples:
+            print(f"{stage:<16}{statistics.median(samples):>9.2f}s")
+    print("(/health answers after 'server import'; /ready turns 200 at 'total')")
+
+    if args.imports:
+        print(f"\n{'package':<24}{'self import':>12}")
+        for package, seconds in import_breakdown(args.imports):
+            print(f"{package:<24}{seconds:>11.2f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,171 @@
+"""Vector retrieval benchmark: Chroma (HNSW) vs the in-memory NumPy retriever.
+
+For each corpus size a persistent Chroma collection of random unit vectors
+(bge-base width by default) is written the way the index build writes chunks.
+Then each backend runs in a fresh process, so memory is attributable:
+
+  load      chroma: open the client and answer a first query (HNSW is loaded
+            lazily); numpy: read every embedding out of Chroma into the matrix
+  rss       resident memory the backend added, after loading and querying
+  peak      growth in peak resident memory (transient load buffers included)
+  p50/p95   per-query latency for top-k, including the returned nodes' text
+            and metadata (what the query engine needs)
+  recall    share of the exact top-k (numpy float32) the backend returned
+
+Queries are perturbed copies of stored vectors, like questions close to one
+chunk. Run from backend/:
+    python -m benchmarks.vector_retrieval
+    python -m benchmarks.vector_retrieval --sizes 1000 10000 --queries 500
+    python -m benchmarks.vector_retrieval --backends numpy numpy-float16 --dim 384
+"""
+
+import argparse
+import os
+import resource
+import statistics
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import get_context
+
+import numpy as np
+
+BACKENDS = ("chroma", "numpy", "numpy-float16")
+COLLECTION = "benchmark"
+
+
+def vectors(size: int, dim: int, seed: int) -> np.ndarray:
+    rows = np.random.default_rng(seed).normal(size=(size, dim)).astype(np.float32)
+    return rows / np.linalg.norm(rows, axis=1, keepdims=True)
+
+
+def queries(size: int, dim: int, count: int) -> np.ndarray:
+    rng = np.random.default_rng(1)
+    picked = vectors(size, dim, seed=0)[rng.integers(0, size, count)]
+    return picked + rng.normal(scale=0.5 / np.sqrt(dim), size=picked.shape).astype(np.float32)
+
+
+def resident_mb() -> float:
+    with open("/proc/self/statm") as f:
+        return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 2**20
+
+
+def peak_mb() -> float:
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024  # KiB on Linux
+
+
+def build(path: str, size: int, dim: int, batch: int = 5000) -> float:
+    """Child process: write ``size`` chunks into a persistent collection."""
+    import chromadb
+    from llama_index.core.schema import TextNode
+    from llama_index.vector_stores.chroma import ChromaVectorStore
+
+    start = time.perf_counter()
+    collection = chromadb.PersistentClient(path=path).get_or_create_collection(COLLECTION)
+    store = ChromaVectorStore(chroma_collection=collection)
+    rows = vectors(size, dim, seed=0)
+    for offset in range(0, size, batch):
+        store.add(
+            [
+                TextNode(
+                    id_=f"doc.txt#{i}",
+                    text=f"chunk {i} " * 40,
+                    metadata={"file_name": "doc.txt"},
+                    embedding=rows[i].tolist(),
+                )
+                for i in range(offset, min(offset + batch, size))
+            ]
+        )
+    return time.perf_counter() - start
+
+
+def run_backend(backend: str, path: str, size: int, dim: int, k: int, count: int) -> dict:
+    """Child process: load one backend and time its queries."""
+    import chromadb
+    from llama_index.core.schema import QueryBundle
+
+    from chat.numpy_retriever import NumpyVectorRetriever
+
+    probes = queries(size, dim, count)
+    rss_before, peak_before = resident_mb(), peak_mb()
+    start = time.perf_counter()
+    collection = chromadb.PersistentClient(path=path).get_collection(COLLECTION)
+    if backend == "chroma":
+
+        def search(query):
+            result = collection.query(
+                query_embeddings=[query.tolist()],
+                n_results=k,
+                include=["documents", "metadatas", "distances"],
+            )
+            return result["ids"][0]
+
+        search(probes[0])
+    else:
+        dtype = "float16" if backend.endswith("float16") else "float32"
+        retriever = NumpyVectorRetriever.from_collection(collection, None, k, dtype)
+
+        def search(query):
+            bundle = QueryBundle(query_str="", embedding=query.tolist())
+            return [n.node.node_id for n in retriever.retrieve(bundle)]
+
+    load = time.perf_counter() - start
+
+    latencies, results = [], []
+    for query in probes:
+        start = time.perf_counter()
+        results.append(search(query))
+        latencies.append(time.perf_counter() - start)
+    latencies.sort()
+    return {
+        "load": load,
+        "rss_mb": resident_mb() - rss_before,
+        "peak_mb": peak_mb() - peak_before,
+        "p50": statistics.median(latencies),
+        "p95": latencies[min(len(latencies) - 1, int(0.95 * len(latencies)))],
+        "results": results,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1_000, 10_000, 100_000])
+    parser.add_argument("--backends", nargs="+", default=list(BACKENDS), choices=BACKENDS)
+    parser.add_argument("--dim", type=int, default=768)
+    parser.add_argument("--top-k", type=int, default=4)
+    parser.add_argument("--queries", type=int, default=200)
+    args = parser.parse_args()
+
+    backends = [b for b in BACKENDS if b in args.backends or b == "numpy"]  # numpy = exact
+    context = get_context("spawn")
+    print(
+        f"{'chunks':>8}  {'backend':<14}{'load':>8}{'rss':>9}{'peak':>9}{'p50':>9}{'p95':>9}{'recall':>8}"
+    )
+    for size in args.sizes:
+        with tempfile.TemporaryDirectory() as path:
+            with ProcessPoolExecutor(1, mp_context=context) as pool:
+                built = pool.submit(build, path, size, args.dim).result()
+            print(f"{size:>8}  (collection written in {built:.1f}s)")
+            results = {}
+            for backend in backends:
+                with ProcessPoolExecutor(1, mp_context=context) as pool:
+                    results[backend] = pool.submit(
+                        run_backend, backend, path, size, args.dim, args.top_k, args.queries
+                    ).result()
+            exact = results["numpy"]["results"]
+            for backend in backends:
+                if backend not in args.backends:
+                    continue
+                r = results[backend]
+                recall = statistics.mean(
+                    len(set(got) & set(want)) / len(want)
+                    for got, want in zip(r["results"], exact, strict=True)
+                )
+                print(
+                    f"{size:>8}  {backend:<14}{r['load']:>7.2f}s{r['rss_mb']:>7.0f}MB{r['peak_mb']:>7.0f}MB"
+                    f"{r['p50'] * 1000:>7.2f}ms{r['p95'] * 1000:>7.2f}ms{recall:>8.1%}"
+                )
+
+
+if __name__ == "__main__":
+    main()
@@ -1,68 +1,285 @@
 import json
 import logging
+import threading
+import time
+from collections import Counter
 
+import numpy as np
 import redis
 
+from . import metrics
+from .circuit_breaker import CircuitBreaker
+from .local_cache import LocalCache
+
 logger = logging.getLogger(__name__)
 
 
+class _SemanticIndex:
+    """In-process nearest-neighbour index over cached question embeddings.
+
+    Vectors are L2-normalized on insert so cosine similarity is a single dot
+    product against one contiguous float32 matrix. The cache holds at most
+    ``max_cached_items`` entries, so brute force beats any ANN structure here.
+    Lookups and writes come from worker threads and the invalidation listener
+    at once; the lock keeps each key lined up with its matrix row.
+    """
+
+    def __init__(self) -> None:
+        self._keys: list[str] = []
+        self._matrix: np.ndarray | None = None
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._keys)
+
+    def add(self, key: str, vector: np.ndarray) -> None:
+        vector = _unit(vector)
+        with self._lock:
+            if key in self._keys:
+                self._matrix[self._keys.index(key)] = vector
+                return
+            if self._matrix is not None and self._matrix.shape[1] != vector.shape[0]:
+                # A different embedding model was swapped in; old vectors are useless.
+                self._keys, self._matrix = [], None
+            row = vector[np.newaxis, :]
+            self._keys = [*self._keys, key]
+            self._matrix = row if self._matrix is None else np.vstack([self._matrix, row])
+
+    def remove(self, keys) -> None:
+        with self._lock:
+            drop = {k for k in keys if k in self._keys}
+            if not drop:
+                return
+            keep = [i for i, k in enumerate(self._keys) if k not in drop]
+            self._keys = [self._keys[i] for i in keep]
+            self._matrix = self._matrix[keep] if keep else None
+
+    def clear(self) -> None:
+        with self._lock:
+            self._keys = []
+            self._matrix = None
+
+    def nearest(self, vector: np.ndarray) -> tuple[str, float] | None:
+        with self._lock:
+            if self._matrix is None:
+                return None
+            scores = self._matrix @ _unit(vector)
+            best = int(np.argmax(scores))
+            return self._keys[best], float(scores[best])
+
+
+def _unit(vector) -> np.ndarray:
+    vector = np.asarray(vector, dtype=np.float32)
+    norm = float(np.linalg.norm(vector))
+    return vector / norm if norm else vector
+
+
 class CacheManager:
     """Redis-backed cache for question -> response pairs, with frequency-based eviction.
 
-    The cache is keyed on the lowercased / trimmed question. A Redis sorted set
-    tracks how often each question has been asked; once the cache exceeds
-    `max_cached_items` entries, the least-frequent ones are evicted.
+    Entries are keyed on ``(namespace, question)``: the lowercased / trimmed
+    question inside a caller-supplied namespace that encodes everything the
+    answer depends on besides the question (engine, transformation, provider,
+    prompt + index fingerprint; see ``QueryEngine.cache_namespace``). All keys
+    also carry a cache *generation* read from ``GENERATION_KEY``;
+    ``bump_generation`` invalidates every entry in O(1) by moving to fresh
+    keys, and the orphaned generation ages out under Redis' LRU policy.
+    ``adopt_fingerprint`` bumps it whenever the prompt + index fingerprint
+    changes, so answers no new namespace can ever read don't linger.
+
+    A Redis sorted set tracks how often each entry has been asked; once the
+    cache exceeds `max_cached_items` entries, the least-frequent ones are
+    evicted.
+
+    Once an embedding model is attached (``attach_embed_model``), exact-key
+    misses fall through to a semantic tier: the question is embedded and
+    matched against the embeddings of every cached question in the same
+    namespace, and the nearest cached answer is served if its cosine
+    similarity clears ``semantic_threshold``. Embeddings are persisted in a
+    Redis hash (per embedding model) so the tier survives restarts.
+
+    Hot answers are also kept in a per-process ``LocalCache`` (L1) that
+    ``get_local_response`` serves without touching Redis. Redis stays the
+    shared L2 and the source of invalidation: evictions, clears and
+    generation bumps are published on ``INVALIDATION_CHANNEL`` and every
+    process drops the keys from its L1. L1 hits are counted locally and
+    folded into the frequency sorted set on the next write, so hot questions
+    are not evicted from L2 just because L1 absorbed their traffic.
+
+    Redis health is tracked by a ``CircuitBreaker`` fed from the outcome of
+    real commands rather than a PING per call: after ``failure_threshold``
+    consecutive Redis errors every method short-circuits without I/O until a
+    background probe sees Redis answer again. Short socket timeouts keep a
+    slow Redis from stalling a query before the breaker trips.
     """
 
     CACHE_KEY_PREFIX = "odyssey:cache:"
     FREQUENCY_KEY = "odyssey:query_frequency"
+    VECTORS_KEY_PREFIX = "odyssey:cache_vectors:"
+    GENERATION_KEY = "odyssey:cache_generation"
+    INVALIDATION_CHANNEL = "odyssey:cache_invalidate"
+    WARM_SET_KEY = "odyssey:warm_set"
+    FINGERPRINT_KEY = "odyssey:cache_fingerprint"
+    DEFAULT_NAMESPACE = "default"
+    # Keys per DEL command when clearing, so one huge command can't stall Redis.
+    DELETE_BATCH = 500
 
-    def __init__(self, redis_url: str = "redis://localhost:6379", max_cached_items: int = 6):
+    def __init__(
+        self,
+        redis_url: str = "redis://localhost:6379",
+        max_cached_items: int = 6,
+        semantic_threshold: float = 0.95,
+        local_cache_size: int = 256,
+        local_cache_ttl_seconds: float = 300.0,
+        failure_threshold: int = 3,
+        probe_interval_seconds: float = 5.0,
+        socket_timeout_seconds: float = 0.25,
+    ):
         self.max_cached_items = max_cached_items
+        self.semantic_threshold = semantic_threshold
+        self.embed_model = None
+        self.local_cache = LocalCache(local_cache_size, local_cache_ttl_seconds)
+        self.generation = 0
+        self._semantic_indexes: dict[str, _SemanticIndex] = {}
+        self._embed_model_name: str | None = None
+        self._pending_hits: Counter[str] = Counter()
+        self._hits_lock = threading.Lock()
+        self._pubsub = None
+        self._listener = None
+        self._breaker = CircuitBreaker(
+            probe=self._ping,
+            failure_threshold=failure_threshold,
+            probe_interval=probe_interval_seconds,
+            on_open=lambda: metrics.CACHE_CIRCUIT_OPEN.set(1),
+            on_close=self._on_recovered,
+            name="Redis cache",
+        )
         try:
-            self.redis_client = redis.from_url(redis_url)
-            self.redis_client.ping()
-            logger.info(f"Redis cache initialized at {redis_url}")
+            self.redis_client = redis.from_url(
+                redis_url,
+                socket_timeout=socket_timeout_seconds,
+                socket_connect_timeout=socket_timeout_seconds,
+            )
         except Exception as e:
             logger.error(f"Failed to initialize Redis connection: {e}")
             self.redis_client = None
+            return
+        if self._ping():
+            logger.info(f"Redis cache initialized at {redis_url}")
+            self._load_generation()
+            self._subscribe_invalidations()
+        else:
+            # Start degraded instead of giving up: the probe attaches the
+            # cache as soon as Redis comes up.
+            logger.error(f"Redis unreachable at {redis_url}; caching disabled until it recovers")
+            self._breaker.trip()
+
+    def attach_embed_model(self, embed_model) -> None:
+        """Enable the semantic tier using the already-loaded embedding model.
+
+        Rehydrates the in-process index from the embeddings persisted for this
+        model, skipping any whose answer has since been evicted.
+        """
+        self.embed_model = embed_model
+        self._embed_model_name = (
+            getattr(embed_model, "model_name", None) or type(embed_model).__name__
+        )
+        self._load_semantic_index()
+
+    # ----------------------------------------------------------------- keys
+
+    @property
+    def _frequency_key(self) -> str:
+        return f"{self.FREQUENCY_KEY}:{self.generation}"
+
+    @property
+    def _vectors_key(self) -> str | None:
+        if self._embed_model_name is None:
+            return None
+        # ":text" keeps out vectors stored when questions took query embeddings.
+        return f"{self.VECTORS_KEY_PREFIX}{self.generation}:{self._embed_model_name}:text"
+
+    def _cache_key(self, entry: str) -> str:
+        return f"{self.CACHE_KEY_PREFIX}{self.generation}:{entry}"
+
+    def _entry(self, question: str, namespace: str | None) -> str:
+        """Sorted-set member / L1 key: ``<namespace>|<normalized question>``."""
+        return f"{namespace or self.DEFAULT_NAMESPACE}|{self.normalize_question(question)}"
+
+    @staticmethod
+    def _split_entry(entry: str) -> tuple[str, str]:
+        namespace, _, question = entry.partition("|")
+        return namespace, question
 
     # ----------------------------------------------------------------- queries
 
     def is_available(self) -> bool:
-        if not self.redis_client:
-            return False
-        try:
-            return bool(self.redis_client.ping())
-        except Exception:
-            return False
+        """Whether Redis should be used right now. No I/O: reads the breaker."""
+        return self.redis_client is not None and not self._breaker.is_open
+
+    def get_local_response(self, question: str, namespace: str | None = None) -> str | None:
+        """L1 lookup only: no I/O, safe to call directly from the event loop."""
+        entry = self._entry(question, namespace)
+        cached = self.local_cache.get(entry)
+        if cached is None:
+            return None
+        with self._hits_lock:
+            self._pending_hits[entry] += 1
+        metrics.CACHE_HITS.labels(tier="local").inc()
+        return cached
 
-    def get_cached_response(self, question: str) -> str | None:
+    def get_cached_response(self, question: str, namespace: str | None = None) -> str | None:
+        cached = self.get_local_response(question, namespace)
+        if cached is not None:
+            return cached
         if not self.is_available():
             return None
         try:
-            key = self._normalize_question(question)
-            cached = self.redis_client.get(self.CACHE_KEY_PREFIX + key)
+            entry = self._entry(question, namespace)
+            cached = self.redis_client.get(self._cache_key(entry))
             if cached is None:
-                return None
-            self.redis_client.zincrby(self.FREQUENCY_KEY, 1, key)
+                response = self._get_semantic_match(question, namespace)
+                self._breaker.record_success()
+                return response
+            self.redis_client.zincrby(self._frequency_key, 1, entry)
+            self._breaker.record_success()
             logger.info(f"Cache hit for question: {question[:30]}...")
-            return json.loads(cached)
+            response = json.loads(cached)
+            self.local_cache.set(entry, response)
+            metrics.CACHE_HITS.labels(tier="redis").inc()
+            return response
         except Exception as e:
+            self._record_error(e)
             logger.error(f"Error retrieving from cache: {e}")
             return None
 
-    def cache_response(self, question: str, response: str) -> bool:
+    def cache_response(self, question: str, response: str, namespace: str | None = None) -> bool:
         if not self.is_available():
             return False
         try:
-            key = self._normalize_question(question)
-            self.redis_client.set(self.CACHE_KEY_PREFIX + key, json.dumps(response))
-            self.redis_client.zincrby(self.FREQUENCY_KEY, 1, key)
-            self._prune_cache()
+            entry = self._entry(question, namespace)
+            vector = self._embed_question(question)
+            # One round trip (not a transaction) for the write, the vector,
+            # pending L1 hit counts and the cache size that decides whether to
+            # prune.
+            pipe = self.redis_client.pipeline(transaction=False)
+            pipe.set(self._cache_key(entry), json.dumps(response))
+            pipe.zincrby(self._frequency_key, 1, entry)
+            if vector is not None:
+                pipe.hset(self._vectors_key, entry, vector.tobytes())
+            self._queue_local_hits(pipe)
+            pipe.zcard(self._frequency_key)
+            size = pipe.execute()[-1]
+            self.local_cache.set(entry, response)
+            if vector is not None:
+                self._semantic_index_for(entry).add(entry, vector)
+            self._prune_cache(size)
+            self._breaker.record_success()
             logger.info(f"Cached response for question: {question[:30]}...")
             return True
         except Exception as e:
+            self._record_error(e)
             logger.error(f"Error caching response: {e}")
             return False
 
@@ -70,54 +287,341 @@ class CacheManager:
         if not self.is_available():
             return False
         try:
-            for question in self.redis_client.zrange(self.FREQUENCY_KEY, 0, -1):
-                self.redis_client.delete(self.CACHE_KEY_PREFIX + question.decode("utf-8"))
-            self.redis_client.delete(self.FREQUENCY_KEY)
+            keys = [
+                self._cache_key(q.decode("utf-8"))
+                for q in self.redis_client.zrange(self._frequency_key, 0, -1)
+            ]
+            keys.append(self._frequency_key)
+            if self._vectors_key:
+                keys.append(self._vectors_key)
+            # Not a transaction: MULTI/EXEC would run every batch as one
+            # command and block Redis for the whole clear after all.
+            pipe = self.redis_client.pipeline(transaction=False)
+            for start in range(0, len(keys), self.DELETE_BATCH):
+                pipe.delete(*keys[start : start + self.DELETE_BATCH])
+            pipe.publish(self.INVALIDATION_CHANNEL, json.dumps("*"))
+            pipe.execute()
+            # L1 hits on the cleared entries must not be folded back in by
+            # the next write.
+            with self._hits_lock:
+                self._pending_hits.clear()
+            self._semantic_indexes.clear()
+            self.local_cache.clear()
+            self._breaker.record_success()
             logger.info("Cache cleared")
             return True
         except Exception as e:
+            self._record_error(e)
             logger.error(f"Error clearing cache: {e}")
             return False
 
+    def bump_generation(self) -> bool:
+        """Invalidate every cached answer in O(1) by moving to a new key generation."""
+        if not self.is_available():
+            return False
+        try:
+            generation = self.redis_client.incr(self.GENERATION_KEY)
+            self.redis_client.publish(
+                self.INVALIDATION_CHANNEL, json.dumps({"generation": generation})
+            )
+            self._set_generation(generation)
+            self._breaker.record_success()
+            logger.info(f"Cache generation bumped to {generation}")
+            return True
+        except Exception as e:
+            self._record_error(e)
+            logger.error(f"Error bumping cache generation: {e}")
+            return False
+
+    def adopt_fingerprint(self, fingerprint: str) -> bool:
+        """Start a fresh generation if answers were cached under another fingerprint.
+
+        Entries under a stale fingerprint are never read again, but their
+        frequency scores would keep them in the sorted set above every new
+        answer, so each new write would be the first one pruned. The frequency
+        history is saved as the warm set first, for answer warming. Returns
+        True if the generation was bumped.
+        """
+        if not self.is_available():
+            return False
+        try:
+            previous = self.redis_client.getset(self.FINGERPRINT_KEY, fingerprint)
+            self._breaker.record_success()
+        except Exception as e:
+            self._record_error(e)
+            logger.error(f"Error reading cache fingerprint: {e}")
+            return False
+        if previous is not None and previous.decode("utf-8") == fingerprint:
+            return False
+        entries = self.get_top_entries()
+        if not entries:
+            return False  # nothing cached in this generation yet
+        self.save_warm_set(entries)
+        logger.info(f"Cache fingerprint changed to {fingerprint}")
+        return self.bump_generation()
+
     def get_top_questions(self, count: int | None = None) -> list[tuple[str, int]]:
+        """Most-asked questions, with counts summed across namespaces."""
+        totals: Counter[str] = Counter()
+        for _namespace, question, score in self.get_top_entries():
+            totals[question] += score
+        return totals.most_common(count or self.max_cached_items)
+
+    def get_top_entries(self, count: int | None = None) -> list[tuple[str, str, int]]:
+        """Most-asked ``(namespace, question, count)`` entries, most frequent first."""
         if not self.is_available():
             return []
         try:
-            limit = count or self.max_cached_items
-            entries = self.redis_client.zrange(
-                self.FREQUENCY_KEY,
-                0,
-                limit - 1,
-                desc=True,
-                withscores=True,
-            )
-            return [(q.decode("utf-8"), int(score)) for q, score in entries]
+            pipe = self.redis_client.pipeline(transaction=False)
+            self._queue_local_hits(pipe)
+            end = count - 1 if count else -1
+            pipe.zrange(self._frequency_key, 0, end, desc=True, withscores=True)
+            entries = pipe.execute()[-1]
+            self._breaker.record_success()
+            return [
+                (*self._split_entry(entry.decode("utf-8")), int(score)) for entry, score in entries
+            ]
         except Exception as e:
+            self._record_error(e)
             logger.error(f"Error getting top questions: {e}")
             return []
 
-    # ----------------------------------------------------------------- internals
+    def has_response(self, question: str, namespace: str | None = None) -> bool:
+        """Whether an answer is cached, without counting it as a hit."""
+        if not self.is_available():
+            return False
+        try:
+            exists = self.redis_client.exists(self._cache_key(self._entry(question, namespace)))
+            self._breaker.record_success()
+            return bool(exists)
+        except Exception as e:
+            self._record_error(e)
+            logger.error(f"Error checking cache: {e}")
+            return False
 
-    def _prune_cache(self) -> None:
+    def save_warm_set(self, entries: list[tuple[str, str, int]]) -> None:
+        """Remember the questions worth pre-answering, outside any cache generation.
+
+        ``clear_cache`` and ``bump_generation`` drop the frequency history along
+        with the answers; this copy is what answer warming falls back on then.
+        """
         if not self.is_available():
             return
         try:
-            all_questions = self.redis_client.zrange(
-                self.FREQUENCY_KEY,
-                0,
-                -1,
-                desc=True,
-                withscores=True,
-            )
-            if len(all_questions) <= self.max_cached_items:
+            self.redis_client.set(self.WARM_SET_KEY, json.dumps(entries))
+            self._breaker.record_success()
+        except Exception as e:
+            self._record_error(e)
+            logger.error(f"Error saving warm set: {e}")
+
+    def get_warm_set(self) -> list[tuple[str, str, int]]:
+        if not self.is_available():
+            return []
+        try:
+            raw = self.redis_client.get(self.WARM_SET_KEY)
+            self._breaker.record_success()
+            return [tuple(entry) for entry in json.loads(raw)] if raw else []
+        except Exception as e:
+            self._record_error(e)
+            logger.error(f"Error reading warm set: {e}")
+            return []
+
+    # ----------------------------------------------------------------- semantic tier
+
+    def _semantic_index_for(self, entry: str) -> _SemanticIndex:
+        namespace = self._split_entry(entry)[0]
+        index = self._semantic_indexes.get(namespace)
+        if index is None:
+            # setdefault: two threads racing here must end up with one index.
+            index = self._semantic_indexes.setdefault(namespace, _SemanticIndex())
+        return index
+
+    def _forget_vectors(self, entries) -> None:
+        for entry in entries:
+            index = self._semantic_indexes.get(self._split_entry(entry)[0])
+            if index is not None:
+                index.remove([entry])
+
+    def _load_semantic_index(self) -> None:
+        self._semantic_indexes.clear()
+        if self.embed_model is None or not self.is_available():
+            return
+        try:
+            stored = self.redis_client.hgetall(self._vectors_key)
+            live = {q.decode("utf-8") for q in self.redis_client.zrange(self._frequency_key, 0, -1)}
+            loaded = 0
+            for raw_entry, raw_vector in stored.items():
+                entry = raw_entry.decode("utf-8")
+                if entry in live:
+                    vector = np.frombuffer(raw_vector, dtype=np.float32)
+                    self._semantic_index_for(entry).add(entry, vector)
+                    loaded += 1
+            logger.info(f"Semantic cache loaded {loaded} question embeddings")
+            self._breaker.record_success()
+        except Exception as e:
+            self._record_error(e)
+            logger.error(f"Error loading semantic cache index: {e}")
+
+    def _get_semantic_match(self, question: str, namespace: str | None) -> str | None:
+        """Serve the cached answer of the nearest paraphrase, if close enough."""
+        index = self._semantic_indexes.get(namespace or self.DEFAULT_NAMESPACE)
+        if self.embed_model is None or index is None or not len(index):
+            return None
+        vector = self._embed_question(question)
+        match = index.nearest(vector)
+        if match is None:
+            return None
+        entry, score = match
+        metrics.SEMANTIC_SIMILARITY.observe(score)
+        if score < self.semantic_threshold:
+            return None
+        cached = self.redis_client.get(self._cache_key(entry))
+        if cached is None:
+            # Evicted (or flushed) behind our back; forget the stale vector.
+            index.remove([entry])
+            return None
+        self.redis_client.zincrby(self._frequency_key, 1, entry)
+        logger.info(f"Semantic cache hit ({score:.3f}) for question: {question[:30]}...")
+        metrics.CACHE_HITS.labels(tier="semantic").inc()
+        return json.loads(cached)
+
+    def _embed_question(self, question: str) -> np.ndarray | None:
+        # Questions are compared with each other, so both sides take the
+        # symmetric text embedding: bge's query instruction is for matching a
+        # query against passages and pulls any two questions close together.
+        if self.embed_model is None:
+            return None
+        return np.asarray(self.embed_model.get_text_embedding(question), dtype=np.float32)
+
+    # ----------------------------------------------------------------- internals
+
+    def _prune_cache(self, size: int | None = None) -> None:
+        """Evict the least-frequent overflow entries.
+
+        Only the overflow slice of the sorted set is read (ZRANGE ascending is
+        O(log N + overflow)), and all deletes go out in one MULTI/EXEC
+        pipeline, so a write costs the same no matter how large the cache is.
+        """
+        try:
+            if size is None:
+                size = self.redis_client.zcard(self._frequency_key)
+            overflow = size - self.max_cached_items
+            if overflow <= 0:
                 return
-            for question, _ in all_questions[self.max_cached_items :]:
-                key = question.decode("utf-8")
-                self.redis_client.delete(self.CACHE_KEY_PREFIX + key)
-                self.redis_client.zrem(self.FREQUENCY_KEY, question)
+            victims = self.redis_client.zrange(self._frequency_key, 0, overflow - 1)
+            if not victims:
+                return
+            evicted = [v.decode("utf-8") for v in victims]
+            # MULTI/EXEC: an answer, its frequency and its vector go together.
+            pipe = self.redis_client.pipeline(transaction=True)
+            pipe.delete(*(self._cache_key(e) for e in evicted))
+            pipe.zrem(self._frequency_key, *victims)
+            if self._vectors_key:
+                pipe.hdel(self._vectors_key, *evicted)
+            pipe.publish(self.INVALIDATION_CHANNEL, json.dumps(evicted))
+            pipe.execute()
+            self._forget_vectors(evicted)
+            self.local_cache.delete(evicted)
         except Exception as e:
+            self._record_error(e)
             logger.error(f"Error pruning cache: {e}")
 
+    def _record_error(self, exc: Exception) -> None:
+        """Count Redis failures toward the breaker; bugs on our side don't trip it."""
+        if isinstance(exc, redis.RedisError):
+            self._breaker.record_failure()
+
+    def _ping(self) -> bool:
+        try:
+            return bool(self.redis_client.ping())
+        except Exception:
+            return False
+
+    def _load_generation(self) -> None:
+        try:
+            raw = self.redis_client.get(self.GENERATION_KEY)
+            self._set_generation(int(raw) if raw is not None else 0)
+        except Exception as e:
+            self._record_error(e)
+            logger.error(f"Error reading cache generation: {e}")
+
+    def _set_generation(self, generation: int) -> None:
+        if generation == self.generation:
+            return
+        self.generation = generation
+        with self._hits_lock:
+            self._pending_hits.clear()
+        self.local_cache.clear()
+        self._semantic_indexes.clear()
+
+    def _on_recovered(self) -> None:
+        """Redis is back: resync everything that may have drifted while it was gone."""
+        metrics.CACHE_CIRCUIT_OPEN.set(0)
+        # Invalidations published while we were disconnected were missed.
+        self.local_cache.clear()
+        self._load_generation()
+        if self._listener is None:
+            self._subscribe_invalidations()
+        self._load_semantic_index()
+
+    def _queue_local_hits(self, pipe) -> None:
+        """Fold L1 hit counts into the shared frequency sorted set (via ``pipe``)."""
+        with self._hits_lock:
+            pending, self._pending_hits = self._pending_hits, Counter()
+        for entry, hits in pending.items():
+            # XX: never resurrect a question that was evicted in the meantime.
+            pipe.zadd(self._frequency_key, {entry: hits}, xx=True, incr=True)
+
+    # ----------------------------------------------------------------- invalidation
+
+    def _subscribe_invalidations(self) -> None:
+        """Listen for evictions/clears from any process and drop them from L1.
+
+        Best effort: if the subscription fails, L1 entries still expire after
+        their TTL.
+        """
+        try:
+            self._pubsub = self.redis_client.pubsub(ignore_subscribe_messages=True)
+            self._pubsub.subscribe(**{self.INVALIDATION_CHANNEL: self._on_invalidation})
+            self._listener = self._pubsub.run_in_thread(
+                sleep_time=1.0, daemon=True, exception_handler=self._on_listener_error
+            )
+        except Exception as e:
+            logger.warning(f"Cache invalidation subscription failed, relying on L1 TTL: {e}")
+            self._pubsub = None
+            self._listener = None
+
+    @staticmethod
+    def _on_listener_error(exc, _pubsub, _thread) -> None:
+        # Keep the listener thread alive across a Redis outage; the pub/sub
+        # connection resubscribes on its next successful read.
+        logger.warning(f"Cache invalidation listener error: {exc}")
+        time.sleep(1.0)
+
+    def _on_invalidation(self, message) -> None:
+        try:
+            payload = json.loads(message["data"])
+        except (KeyError, TypeError, ValueError):
+            return
+        if payload == "*":
+            self.local_cache.clear()
+        elif isinstance(payload, dict) and "generation" in payload:
+            self._set_generation(int(payload["generation"]))
+        else:
+            self.local_cache.delete(payload)
+
+    def close(self) -> None:
+        """Stop the invalidation listener and breaker probe. Idempotent."""
+        self._breaker.stop()
+        if self._listener is not None:
+            try:
+                self._listener.stop()
+                self._pubsub.close()
+            except Exception as e:
+                logger.error(f"Error closing cache invalidation listener: {e}")
+            self._listener = None
+            self._pubsub = None
+
     @staticmethod
-    def _normalize_question(question: str) -> str:
+    def normalize_question(question: str) -> str:
         return question.lower().strip()
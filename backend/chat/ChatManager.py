@@ -1,16 +1,20 @@
+import asyncio
 import logging
-import threading
 from collections.abc import AsyncIterator
-from concurrent.futures import ThreadPoolExecutor
 from contextlib import contextmanager
-from pathlib import Path
 
+from . import metrics
 from .CacheManager import CacheManager
 from .chatdata import Chat
-from .ChromaClient import ChromaStoreManager
+from .index_generation import (
+    IndexGeneration,
+    active_generation_id,
+    new_generation_id,
+    write_active_generation_id,
+)
 from .ModelsManager import ModelManager
-from .query_engine import QueryEngine
-from .vector_store_manager import VectorStoreManager
+from .startup import StartupProgress
+from .worker_pool import BoundedExecutor
 
 logger = logging.getLogger(__name__)
 
@@ -22,17 +26,17 @@ class ChatManager:
         self.settings = settings
         provider = model_provider or settings.default_model_provider
         self.model_manager = ModelManager(settings, provider)
-        self.chroma_store_manager = ChromaStoreManager(settings)
-        self.vector_store_manager = VectorStoreManager(
-            settings,
-            self.model_manager,
-            self.chroma_store_manager,
-        )
         self.cache_manager: CacheManager | None = None
         if settings.redis_url:
             self.cache_manager = CacheManager(
                 redis_url=settings.redis_url,
                 max_cached_items=settings.cache_size,
+                semantic_threshold=settings.semantic_cache_threshold,
+                local_cache_size=settings.local_cache_size,
+                local_cache_ttl_seconds=settings.local_cache_ttl_seconds,
+                failure_threshold=settings.cache_failure_threshold,
+                probe_interval_seconds=settings.cache_probe_interval_seconds,
+                socket_timeout_seconds=settings.cache_socket_timeout_seconds,
             )
             logger.info(f"Initialized cache manager with Redis at {settings.redis_url}")
         else:
@@ -40,37 +44,116 @@ class ChatManager:
         # The manager holds only shared, stateless-across-connections resources
         # (indices, engines, cache). Conversation history is per-connection and
         # passed into query() by the caller — never stored here.
-        self.query_engine = QueryEngine(self.vector_store_manager, self.cache_manager)
-        self.thread_pool = ThreadPoolExecutor(max_workers=settings.thread_pool_size)
-        # Guards reinitialization when a client requests a different model provider.
-        self._swap_lock = threading.Lock()
+        # Bounded pool the blocking LLM streams run on; a full pool answers
+        # "busy" immediately rather than spawning another thread.
+        self.thread_pool = BoundedExecutor(
+            max_workers=settings.thread_pool_size, max_queue=settings.llm_queue_depth
+        )
+        # The indices + engines currently serving; replaced wholesale by a
+        # reload (see chat.index_generation).
+        self.generation: IndexGeneration | None = self._new_generation(
+            active_generation_id(settings.storage_dir)
+        )
+        # Background releases of retired generations (see query).
+        self._releasing: set[asyncio.Task] = set()
+
+    def _new_generation(self, generation_id: str | None) -> IndexGeneration:
+        return IndexGeneration.create(
+            self.settings, generation_id, self.model_manager, self.cache_manager, self.thread_pool
+        )
 
-    def initialize_system(self) -> bool:
+    @property
+    def query_engine(self):
+        return self.generation.query_engine if self.generation else None
+
+    @property
+    def vector_store_manager(self):
+        return self.generation.vector_store_manager if self.generation else None
+
+    def initialize_system(self, progress: StartupProgress | None = None) -> bool:
         """Initialize all components of the system."""
+        progress = progress or StartupProgress()
         try:
-            Path(self.settings.storage_dir).mkdir(parents=True, exist_ok=True)
-
-            if not self.model_manager.initialize():
-                return False
-            if not self.chroma_store_manager.initialize():
-                return False
-            if not self.vector_store_manager.run():
+            with progress.track("models"):
+                if not self.model_manager.initialize():
+                    return False
+            if self.cache_manager:
+                self.cache_manager.attach_embed_model(self.model_manager.embed_model)
+            if not self.generation.build(progress=progress):
                 return False
-            return self.query_engine.initialize()
+            self._adopt_cache_fingerprint(self.generation)
+            return True
         except Exception as e:
             logger.error(f"Error initializing system: {e}", exc_info=True)
             return False
 
-    def query(
+    def build_generation(self) -> IndexGeneration | None:
+        """Build the next index generation from the current documents.
+
+        Blocking (embedding, KG extraction): run it off the event loop. The
+        active generation keeps serving meanwhile. Returns None on failure,
+        with the partial build already cleaned up.
+        """
+        generation = self._new_generation(new_generation_id())
+        try:
+            built = generation.build(seed=self.generation)
+        except Exception as e:
+            logger.error(f"Error building index generation: {e}", exc_info=True)
+            built = False
+        if not built:
+            generation.release()
+            metrics.RELOADS.labels(outcome="failed").inc()
+            return None
+        self._adopt_cache_fingerprint(generation)
+        return generation
+
+    def _adopt_cache_fingerprint(self, generation: IndexGeneration) -> None:
+        # A new prompt or index moves every answer to new cache namespaces;
+        # start a fresh cache generation so the stranded ones go with it.
+        if self.cache_manager and generation.query_engine is not None:
+            self.cache_manager.adopt_fingerprint(generation.query_engine.fingerprint)
+
+    async def activate_generation(self, generation: IndexGeneration) -> None:
+        """Serve ``generation`` from now on. Call on the event loop.
+
+        New queries go to it at once; queries already streaming finish on the
+        previous generation, which is released after the last one completes and
+        its query engine has nothing left running (``release_when_idle``).
+        """
+        write_active_generation_id(self.settings.storage_dir, generation.id)
+        previous, self.generation = self.generation, generation
+        metrics.RELOADS.labels(outcome="ok").inc()
+        logger.info(f"Activated index generation {generation.id}")
+        if previous is not None:
+            previous.retired = True
+            if previous.in_flight == 0:
+                await previous.release_when_idle()
+
+    async def query(
         self,
         question: str,
         chat: Chat,
         query_transformation: str | None = None,
         choice_of_vector_store: str | None = None,
+        model_provider: str | None = None,
     ) -> AsyncIterator[str]:
-        return self.query_engine.process_query(
-            question, chat, query_transformation, choice_of_vector_store
-        )
+        # Pin the generation for the whole answer, so a reload mid-stream
+        # never swaps the indices out from under it.
+        generation = self.generation
+        generation.in_flight += 1
+        try:
+            async for chunk in generation.query_engine.process_query(
+                question, chat, query_transformation, choice_of_vector_store, model_provider
+            ):
+                yield chunk
+        finally:
+            generation.in_flight -= 1
+            if generation.retired and generation.in_flight == 0:
+                # In the background: an abandoned stream may take a while to
+                # wind down, and this answer is already over.
+                task = asyncio.create_task(generation.release_when_idle())
+                self._releasing.add(task)
+                task.add_done_callback(self._releasing.discard)
 
     @contextmanager
     def managed_resources(self):
@@ -83,16 +166,15 @@ class ChatManager:
         """Release all owned resources. Idempotent."""
         if getattr(self, "thread_pool", None) is not None:
             try:
-                self.thread_pool.shutdown(wait=True)
+                # Don't block on streams still in flight; they finish on
+                # their own threads.
+                self.thread_pool.shutdown(wait=False)
             except Exception as e:
                 logger.error(f"Error shutting down thread pool: {e}")
+        if getattr(self, "cache_manager", None) is not None:
+            self.cache_manager.close()
+        if getattr(self, "model_manager", None) is not None:
+            self.model_manager.close()
 
-        for attr in (
-            "thread_pool",
-            "model_manager",
-            "chroma_store_manager",
-            "vector_store_manager",
-            "cache_manager",
-            "query_engine",
-        ):
+        for attr in ("thread_pool", "model_manager", "cache_manager", "generation"):
             setattr(self, attr, None)
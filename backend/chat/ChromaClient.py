@@ -7,19 +7,24 @@ logger = logging.getLogger(__name__)
 
 
 class ChromaStoreManager:
-    """Owns the persistent ChromaDB client + the single shared collection used by both indices."""
+    """Owns the persistent ChromaDB client + the single shared collection used by both indices.
+
+    Each index generation (see ``chat.index_generation``) gets its own
+    collection; ``collection_name`` defaults to the original one.
+    """
 
     COLLECTION_NAME = "property_graph_store"
 
-    def __init__(self, settings):
+    def __init__(self, settings, collection_name: str = COLLECTION_NAME):
         self.settings = settings
+        self.collection_name = collection_name
         self.chroma_client = None
         self.collection = None
 
     def initialize(self) -> bool:
         try:
             self.chroma_client = chromadb.PersistentClient(path=self.settings.chroma_db_path)
-            self.collection = self.chroma_client.get_or_create_collection(self.COLLECTION_NAME)
+            self.collection = self.chroma_client.get_or_create_collection(self.collection_name)
             return True
         except Exception as e:
             logger.error(f"Error initializing Chroma vector store: {e}", exc_info=True)
@@ -27,3 +32,26 @@ class ChromaStoreManager:
 
     def get_vector_store(self) -> ChromaVectorStore:
         return ChromaVectorStore(chroma_collection=self.collection)
+
+    def copy_from(self, source: "ChromaStoreManager", batch_size: int = 1000) -> None:
+        """Copy every record (ids, embeddings, text, metadata) from ``source``'s collection."""
+        offset = 0
+        while True:
+            rows = source.collection.get(
+                include=["embeddings", "documents", "metadatas"], limit=batch_size, offset=offset
+            )
+            if not rows["ids"]:
+                return
+            self.collection.add(
+                ids=rows["ids"],
+                embeddings=rows["embeddings"],
+                documents=rows["documents"],
+                metadatas=rows["metadatas"],
+            )
+            offset += len(rows["ids"])
+
+    def drop(self) -> None:
+        """Delete this manager's collection. Used to release a retired generation."""
+        if self.chroma_client is not None:
+            self.chroma_client.delete_collection(self.collection_name)
+        self.collection = None
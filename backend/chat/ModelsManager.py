@@ -1,18 +1,46 @@
+import importlib
 import logging
+import threading
 
-from llama_index.core import Settings
-from llama_index.embeddings.huggingface import HuggingFaceEmbedding
-from llama_index.llms.google_genai import GoogleGenAI
-from llama_index.llms.groq import Groq
-from llama_index.llms.openai import OpenAI
+from .embedding_backend import cache_model_name, load_embedding_model
+from .embedding_batcher import BatchingEmbedding
+from .embedding_cache import CachedEmbedding, EmbeddingStore
 
 logger = logging.getLogger(__name__)
 
 SUPPORTED_PROVIDERS = ("groq", "gemini", "openai")
+# LlamaIndex client class per provider. Imported only when that provider is
+# built: each SDK drags in its own HTTP stack, and a provider nobody asks for
+# should cost nothing, at startup or after.
+LLM_CLASSES = {
+    "groq": ("llama_index.llms.groq", "Groq"),
+    "gemini": ("llama_index.llms.google_genai", "GoogleGenAI"),
+    "openai": ("llama_index.llms.openai", "OpenAI"),
+}
+# Providers whose LlamaIndex client streams natively over asyncio (astream_*),
+# rather than wrapping a blocking stream. Anything else is streamed through the
+# worker-thread bridge in QueryEngine. A client's async HTTP session is bound to
+# the event loop that first used it, so async calls belong on the server loop
+# only; code running its own loop (KG extraction during a build) uses the
+# blocking API on threads.
+ASYNC_STREAMING_PROVIDERS = ("groq", "gemini", "openai")
 
 
 class ModelManager:
-    """Initializes the LLM + embedding model and writes them into the LlamaIndex global Settings."""
+    """Provider registry: one LLM client per configured provider, built once.
+
+    ``model_provider`` is the default used when a request names none; its
+    client is built at startup, next to a single shared embedding model, and
+    must initialize. Every other provider is built (SDK import included) the
+    first time a request asks for it and reused after that, so different
+    visitors can use different providers at the same time while the ones
+    nobody picks cost nothing. A provider that fails to build (missing key,
+    bad config) is logged once and left unavailable.
+
+    Nothing is written to LlamaIndex's global ``Settings``: the LLM, embedding
+    model and chunking parameters are handed explicitly to every index and
+    engine that needs them, so concurrent requests never share mutable globals.
+    """
 
     def __init__(self, settings, model_provider: str = "gemini"):
         self.settings = settings
@@ -22,43 +50,121 @@ class ModelManager:
                 f"Unsupported model_provider {self.model_provider!r}. "
                 f"Expected one of: {', '.join(SUPPORTED_PROVIDERS)}"
             )
-        self.llm = None
+        self.llms: dict = {}
+        # Providers whose build failed; not retried per request.
+        self._unavailable: set[str] = set()
+        self._llms_lock = threading.Lock()
         self.embed_model = None
+        self.embedding_backend: str | None = None
+
+    @property
+    def llm(self):
+        """The default provider's LLM (used for index construction)."""
+        return self.llms.get(self.model_provider)
+
+    def has_provider(self, provider: str) -> bool:
+        return self._provider_llm(provider.lower()) is not None
+
+    def get_llm(self, provider: str | None = None):
+        """LLM client for ``provider`` (default when None). KeyError if unavailable."""
+        name = (provider or self.model_provider).lower()
+        llm = self._provider_llm(name)
+        if llm is None:
+            raise KeyError(f"model_provider {name!r} is not configured")
+        return llm
+
+    def supports_async_streaming(self, provider: str | None = None) -> bool:
+        return (provider or self.model_provider).lower() in ASYNC_STREAMING_PROVIDERS
 
     def initialize(self) -> bool:
         try:
-            if self.model_provider == "groq":
-                logger.info(f"Initializing Groq model: {self.settings.groq_model}")
-                self.llm = Groq(model=self.settings.groq_model, api_key=self.settings.groq_api_key)
-            elif self.model_provider == "openai":
-                if not self.settings.openai_api_key:
-                    raise ValueError(
-                        "OPENAI_API_KEY is required when model_provider=openai. "
-                        "Set it in the environment or via settings.openai_api_key."
-                    )
-                logger.info(f"Initializing OpenAI model: {self.settings.openai_model}")
-                self.llm = OpenAI(
-                    model=self.settings.openai_model,
-                    api_key=self.settings.openai_api_key,
-                    max_tokens=self.settings.max_tokens,
+            self.llms[self.model_provider] = self._build_llm(self.model_provider)
+
+            logger.info(
+                f"Initializing embedding model: {self.settings.embedding_model} "
+                f"({self.settings.embedding_backend})"
+            )
+            self.embed_model, self.embedding_backend = load_embedding_model(self.settings)
+            if self.settings.query_embedding_batch_size > 1:
+                # Under the cache, so only misses wait for a batch.
+                self.embed_model = BatchingEmbedding(
+                    self.embed_model,
+                    self.settings.query_embedding_batch_window_seconds,
+                    self.settings.query_embedding_batch_size,
                 )
-            else:  # gemini (via the google-genai SDK)
-                logger.info(f"Initializing Gemini model: {self.settings.google_model}")
-                self.llm = GoogleGenAI(
-                    model=self.settings.google_model, api_key=self.settings.google_api_key
+            if self.settings.embedding_cache_path:
+                store = EmbeddingStore(
+                    self.settings.embedding_cache_path,
+                    self.settings.embedding_cache_size,
+                    self.settings.embedding_cache_max_rows,
+                )
+                self.embed_model = CachedEmbedding(
+                    self.embed_model,
+                    store,
+                    cache_model_name(self.settings.embedding_model, self.embedding_backend),
+                )
+                logger.info(
+                    f"Embedding cache at {self.settings.embedding_cache_path} "
+                    f"({len(store)} vectors)"
                 )
-
-            Settings.llm = self.llm
-            Settings.chunk_overlap = self.settings.chunk_overlap
-            Settings.max_tokens = self.settings.max_tokens
-
-            logger.info(f"Initializing embedding model: {self.settings.embedding_model}")
-            self.embed_model = HuggingFaceEmbedding(model_name=self.settings.embedding_model)
-            Settings.embed_model = self.embed_model
-            Settings.similarity_top_k = self.settings.similarity_top_k
-            Settings.chunk_size = self.settings.chunk_size
 
             return True
         except Exception as e:
             logger.error(f"Error initializing models: {e}", exc_info=True)
             return False
+
+    def close(self) -> None:
+        model = self.embed_model
+        if isinstance(model, CachedEmbedding):
+            model.store.close()
+            model = model.inner
+        if isinstance(model, BatchingEmbedding):
+            model.close()
+
+    def _provider_llm(self, provider: str):
+        """The provider's client, built on first use; None if it cannot be."""
+        llm = self.llms.get(provider)
+        if llm is not None or provider not in SUPPORTED_PROVIDERS:
+            return llm
+        with self._llms_lock:
+            if provider in self.llms or provider in self._unavailable:
+                return self.llms.get(provider)
+            if provider == "openai" and not self.settings.openai_api_key:
+                logger.info("OPENAI_API_KEY not set; openai provider unavailable")
+                self._unavailable.add(provider)
+                return None
+            try:
+                self.llms[provider] = self._build_llm(provider)
+            except Exception as e:
+                logger.warning(f"Provider {provider} unavailable: {e}")
+                self._unavailable.add(provider)
+                return None
+            return self.llms[provider]
+
+    def _build_llm(self, provider: str):
+        if provider == "groq":
+            logger.info(f"Initializing Groq model: {self.settings.groq_model}")
+            Groq = _llm_class("groq")
+            return Groq(model=self.settings.groq_model, api_key=self.settings.groq_api_key)
+        if provider == "openai":
+            if not self.settings.openai_api_key:
+                raise ValueError(
+                    "OPENAI_API_KEY is required when model_provider=openai. "
+                    "Set it in the environment or via settings.openai_api_key."
+                )
+            logger.info(f"Initializing OpenAI model: {self.settings.openai_model}")
+            OpenAI = _llm_class("openai")
+            return OpenAI(
+                model=self.settings.openai_model,
+                api_key=self.settings.openai_api_key,
+                max_tokens=self.settings.max_tokens,
+            )
+        # gemini (via the google-genai SDK)
+        logger.info(f"Initializing Gemini model: {self.settings.google_model}")
+        GoogleGenAI = _llm_class("gemini")
+        return GoogleGenAI(model=self.settings.google_model, api_key=self.settings.google_api_key)
+
+
+def _llm_class(provider: str) -> type:
+    module, name = LLM_CLASSES[provider]
+    return getattr(importlib.import_module(module), name)
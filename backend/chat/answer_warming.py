@@ -0,0 +1,101 @@
+"""Answer warming: re-answer the most-asked questions before visitors do.
+
+A cold process, a reload (new index fingerprint, so new cache namespaces) or
+a cache flush leaves every popular question to pay full retrieval + LLM
+latency on its next visitor. ``warm_answers`` takes the most frequent entries
+from the cache's frequency history and asks each through
+``ChatManager.query``, so the answer is generated, redacted and cached exactly
+as a visitor's would be.
+
+  - Each entry keeps the engine / transformation / provider it was asked
+    with; only the fingerprint is replaced by the current one.
+  - Questions already cached under the current namespace are skipped.
+  - Questions run one at a time, at most ``requests_per_minute`` LLM calls,
+    so warming never holds more than one worker or eats the provider quota
+    visitors need.
+  - The list warmed is saved outside the cache generation, so warming after
+    ``clear_cache``/``bump_generation`` still knows what was popular.
+"""
+
+import asyncio
+import logging
+import time
+from collections import Counter
+
+from . import metrics
+from .chatdata import Chat
+from .query_engine import QueryEngine
+
+logger = logging.getLogger(__name__)
+
+OUTCOMES = ("warmed", "cached", "failed", "skipped")
+
+
+def plan_warmup(
+    entries: list[tuple[str, str, int]], top_n: int
+) -> list[tuple[str, str, str | None, str | None]]:
+    """Top ``(question, vector_store, query_transformation, model_provider)`` to warm.
+
+    Counts for the same question under different fingerprints (earlier index
+    builds) are summed.
+    """
+    totals: Counter[tuple[str, str, str | None, str | None]] = Counter()
+    for namespace, question, count in entries:
+        parsed = QueryEngine.parse_namespace(namespace)
+        if parsed is not None:
+            totals[(question, *parsed)] += count
+    return [key for key, _ in totals.most_common(top_n)]
+
+
+async def warm_answers(chat_manager, top_n: int, requests_per_minute: int) -> dict[str, int]:
+    """Warm the cache with answers to the ``top_n`` most-asked questions."""
+    counts = dict.fromkeys(OUTCOMES, 0)
+    cache = chat_manager.cache_manager
+    if cache is None or top_n <= 0 or not cache.is_available():
+        return counts
+    top_n = min(top_n, cache.max_cached_items)
+
+    entries = await asyncio.to_thread(cache.get_top_entries)
+    if entries:
+        await asyncio.to_thread(cache.save_warm_set, entries)
+    else:
+        entries = await asyncio.to_thread(cache.get_warm_set)
+    plan = plan_warmup(entries, top_n)
+    logger.info(f"Answer warming: {len(plan)} question(s) to check")
+
+    interval = 60.0 / requests_per_minute if requests_per_minute > 0 else 0.0
+    next_call = 0.0
+    for question, vector_store, transformation, provider in plan:
+        if provider and not await asyncio.to_thread(
+            chat_manager.model_manager.has_provider, provider
+        ):
+            outcome = "skipped"
+        else:
+            namespace = chat_manager.query_engine.cache_namespace(
+                transformation, vector_store, provider
+            )
+            if await asyncio.to_thread(cache.has_response, question, namespace):
+                outcome = "cached"
+            else:
+                delay = next_call - time.monotonic()
+                if delay > 0:
+                    await asyncio.sleep(delay)
+                next_call = time.monotonic() + interval
+                async for _chunk in chat_manager.query(
+                    question=question,
+                    chat=Chat(chat_manager.settings.chat_size),
+                    query_transformation=transformation,
+                    choice_of_vector_store=vector_store,
+                    model_provider=provider,
+                ):
+                    pass
+                # Errors, timeouts and "busy" answers are never cached.
+                warmed = await asyncio.to_thread(cache.has_response, question, namespace)
+                outcome = "warmed" if warmed else "failed"
+        counts[outcome] += 1
+        metrics.ANSWERS_WARMED.labels(outcome=outcome).inc()
+
+    logger.info(
+        "Answer warming finished: " + ", ".join(f"{n} {outcome}" for outcome, n in counts.items())
+    )
+    return counts
@@ -0,0 +1,81 @@
+"""Circuit breaker for an optional dependency on the query hot path.
+
+The answer cache is an optimization, so when Redis is slow or down the right
+move is to stop talking to it, not to stack a timeout onto every query. The
+breaker counts consecutive failures of real commands (no health-check PING per
+call); after ``failure_threshold`` of them it opens and callers skip the
+dependency entirely. While open, a daemon thread runs ``probe`` every
+``probe_interval`` seconds and closes the breaker once it succeeds.
+"""
+
+import logging
+import threading
+from collections.abc import Callable
+
+logger = logging.getLogger(__name__)
+
+
+class CircuitBreaker:
+    def __init__(
+        self,
+        probe: Callable[[], bool],
+        failure_threshold: int = 3,
+        probe_interval: float = 5.0,
+        on_open: Callable[[], None] | None = None,
+        on_close: Callable[[], None] | None = None,
+        name: str = "dependency",
+    ) -> None:
+        self.probe = probe
+        self.failure_threshold = max(1, failure_threshold)
+        self.probe_interval = probe_interval
+        self.on_open = on_open
+        self.on_close = on_close
+        self.name = name
+        self._failures = 0
+        self._open = False
+        self._lock = threading.Lock()
+        self._stopped = threading.Event()
+
+    @property
+    def is_open(self) -> bool:
+        return self._open
+
+    def record_success(self) -> None:
+        self._failures = 0
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self._failures += 1
+            if self._open or self._failures < self.failure_threshold:
+                return
+        self.trip()
+
+    def trip(self) -> None:
+        """Open the breaker now and start probing for recovery."""
+        with self._lock:
+            if self._open or self._stopped.is_set():
+                return
+            self._open = True
+        logger.warning(f"{self.name} circuit opened; probing every {self.probe_interval}s")
+        if self.on_open:
+            self.on_open()
+        threading.Thread(target=self._probe_until_healthy, daemon=True).start()
+
+    def stop(self) -> None:
+        """Stop any background probing. Idempotent."""
+        self._stopped.set()
+
+    def _probe_until_healthy(self) -> None:
+        while not self._stopped.wait(self.probe_interval):
+            try:
+                healthy = self.probe()
+            except Exception:
+                healthy = False
+            if healthy:
+                with self._lock:
+                    self._open = False
+                    self._failures = 0
+                logger.info(f"{self.name} circuit closed")
+                if self.on_close:
+                    self.on_close()
+                return
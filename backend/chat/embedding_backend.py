@@ -0,0 +1,102 @@
+"""Embedding model construction, with an optional ONNX Runtime backend.
+
+bge-base through torch is the default: it is what the indices were built with
+and needs nothing beyond the base dependencies. On a small CPU-only container
+torch is also the heaviest thing in the process and query embedding sits
+before the first streamed token, so ``EMBEDDING_BACKEND`` can select:
+
+  torch      full-precision sentence-transformers (default)
+  onnx       the same weights through ONNX Runtime
+  onnx-int8  ONNX Runtime with int8 dynamic quantization. The quantized model
+             is exported once into ``embedding_onnx_dir`` and reused on later
+             boots.
+
+Both ONNX backends need ``optimum[onnxruntime]`` (see the Dockerfile's
+``EMBEDDING_EXTRAS`` build arg). If the selected backend cannot be loaded the
+error is logged and the torch model is used, so a bad setting degrades speed,
+not availability. ``benchmarks/embedding_backends.py`` compares latency, RSS
+and retrieval agreement between backends.
+"""
+
+import logging
+from pathlib import Path
+
+from llama_index.core.base.embeddings.base import BaseEmbedding
+from llama_index.embeddings.huggingface import HuggingFaceEmbedding
+from llama_index.embeddings.huggingface.utils import (
+    get_query_instruct_for_model_name,
+    get_text_instruct_for_model_name,
+)
+
+logger = logging.getLogger(__name__)
+
+EMBEDDING_BACKENDS = ("torch", "onnx", "onnx-int8")
+QUANTIZATION_CONFIGS = ("arm64", "avx2", "avx512", "avx512_vnni")
+
+
+def cache_model_name(model_name: str, backend: str) -> str:
+    """Embedding-cache identity: vectors from different backends never mix."""
+    return model_name if backend == "torch" else f"{model_name}[{backend}]"
+
+
+def load_embedding_model(settings) -> tuple[BaseEmbedding, str]:
+    """Build the configured embedding model; returns (model, backend actually used)."""
+    backend = settings.embedding_backend.lower()
+    if backend not in EMBEDDING_BACKENDS:
+        raise ValueError(
+            f"Unsupported embedding_backend {backend!r}. "
+            f"Expected one of: {', '.join(EMBEDDING_BACKENDS)}"
+        )
+    if backend != "torch":
+        try:
+            return _load_onnx(settings, quantized=backend == "onnx-int8"), backend
+        except Exception as e:
+            logger.error(
+                f"Embedding backend {backend} unavailable ({e}); falling back to torch",
+                exc_info=True,
+            )
+    return HuggingFaceEmbedding(model_name=settings.embedding_model), "torch"
+
+
+def _load_onnx(settings, quantized: bool) -> HuggingFaceEmbedding:
+    model_name = settings.embedding_model
+    if not quantized:
+        return HuggingFaceEmbedding(model_name=model_name, backend="onnx")
+
+    model_dir = Path(settings.embedding_onnx_dir) / model_name.replace("/", "__")
+    file_name = quantized_model_file(model_dir, settings.embedding_onnx_quantization)
+    if file_name is None:
+        export_quantized_model(model_name, model_dir, settings.embedding_onnx_quantization)
+        file_name = quantized_model_file(model_dir, settings.embedding_onnx_quantization)
+        if file_name is None:
+            raise RuntimeError(f"quantized export wrote no model into {model_dir}")
+    # The local directory name says nothing about the model family, so pass the
+    # bge query/passage instructions for the original name explicitly.
+    return HuggingFaceEmbedding(
+        model_name=str(model_dir),
+        backend="onnx",
+        model_kwargs={"file_name": file_name},
+        query_instruction=get_query_instruct_for_model_name(model_name),
+        text_instruction=get_text_instruct_for_model_name(model_name),
+    )
+
+
+def quantized_model_file(model_dir: Path, quantization: str) -> str | None:
+    """Path (relative to ``model_dir``) of an exported int8 model, if any."""
+    matches = sorted(model_dir.glob(f"onnx/model_*_{quantization}.onnx"))
+    return matches[0].relative_to(model_dir).as_posix() if matches else None
+
+
+def export_quantized_model(model_name: str, model_dir: Path, quantization: str) -> None:
+    """One-off: save ``model_name`` as ONNX and add its int8 dynamic quantization."""
+    if quantization not in QUANTIZATION_CONFIGS:
+        raise ValueError(
+            f"Unsupported embedding_onnx_quantization {quantization!r}. "
+            f"Expected one of: {', '.join(QUANTIZATION_CONFIGS)}"
+        )
+    from sentence_transformers import SentenceTransformer, export_dynamic_quantized_onnx_model
+
+    logger.info(f"Exporting int8 ({quantization}) ONNX model for {model_name} to {model_dir}")
+    model = SentenceTransformer(model_name, backend="onnx")
+    model.save(str(model_dir))
+    export_dynamic_quantized_onnx_model(model, quantization, str(model_dir))
@@ -0,0 +1,151 @@
+"""Micro-batching of query embeddings across concurrent requests.
+
+Every retrieval (vector, KG entity embeddings, a HyDE document) embeds its
+query on its own pool worker, so a burst of visitors used to run one
+batch-size-1 forward pass each, all competing for the same couple of CPUs. ``BatchingEmbedding`` wraps the real model and routes query
+embeddings through one dispatcher thread instead: it takes the first waiting
+query, collects more for up to ``window_seconds`` (or until
+``max_batch_size``), embeds them in a single forward pass and resolves each
+caller's future. Queries that arrive while a batch is running wait for the
+next one, so under load batches fill without the window adding anything.
+
+Text embeddings (index builds, and the semantic cache's question vectors) go
+straight to the wrapped model; index builds are batched by LlamaIndex already. Batch sizes and the time each query waited
+before its forward pass are exported as histograms, to tune the window.
+"""
+
+import asyncio
+import logging
+import queue
+import threading
+import time
+from concurrent.futures import Future
+
+from llama_index.core.base.embeddings.base import BaseEmbedding
+from pydantic import PrivateAttr
+
+from . import metrics
+
+logger = logging.getLogger(__name__)
+
+
+class BatchingEmbedding(BaseEmbedding):
+    """Embedding model wrapper that embeds concurrent queries in one batch."""
+
+    _inner: BaseEmbedding = PrivateAttr()
+    _window: float = PrivateAttr()
+    _max_batch: int = PrivateAttr()
+    _queue: queue.SimpleQueue = PrivateAttr()
+    _lock: threading.Lock = PrivateAttr()
+    _closed: bool = PrivateAttr(default=False)
+    _thread: threading.Thread = PrivateAttr()
+
+    def __init__(
+        self, inner: BaseEmbedding, window_seconds: float = 0.005, max_batch_size: int = 16
+    ) -> None:
+        super().__init__(
+            model_name=getattr(inner, "model_name", "unknown"),
+            embed_batch_size=getattr(inner, "embed_batch_size", 10),
+        )
+        self._inner = inner
+        self._window = window_seconds
+        self._max_batch = max(1, max_batch_size)
+        self._queue = queue.SimpleQueue()
+        self._lock = threading.Lock()
+        self._thread = threading.Thread(target=self._run, name="embed-batcher", daemon=True)
+        self._thread.start()
+
+    @classmethod
+    def class_name(cls) -> str:
+        return "BatchingEmbedding"
+
+    @property
+    def inner(self) -> BaseEmbedding:
+        return self._inner
+
+    def submit(self, query: str) -> Future:
+        """Queue ``query`` for the next batch; the future resolves to its vector."""
+        future: Future = Future()
+        with self._lock:
+            if not self._closed:
+                self._queue.put((query, future, time.monotonic()))
+                return future
+        # Closed: nobody is left to dispatch, so embed on the caller's thread.
+        try:
+            future.set_result(self._inner._get_query_embedding(query))
+        except Exception as e:
+            future.set_exception(e)
+        return future
+
+    def close(self) -> None:
+        """Stop the dispatcher once the queries already queued are embedded."""
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+            self._queue.put(None)
+        self._thread.join(timeout=5)
+
+    def _get_query_embedding(self, query: str) -> list[float]:
+        return self.submit(query).result()
+
+    async def _aget_query_embedding(self, query: str) -> list[float]:
+        return await asyncio.wrap_future(self.submit(query))
+
+    def _get_text_embedding(self, text: str) -> list[float]:
+        return self._inner._get_text_embedding(text)
+
+    async def _aget_text_embedding(self, text: str) -> list[float]:
+        return await self._inner._aget_text_embedding(text)
+
+    def _get_text_embeddings(self, texts: list[str]) -> list[list[float]]:
+        return self._inner._get_text_embeddings(texts)
+
+    async def _aget_text_embeddings(self, texts: list[str]) -> list[list[float]]:
+        return await self._inner._aget_text_embeddings(texts)
+
+    def _run(self) -> None:
+        stopping = False
+        while not stopping:
+            item = self._queue.get()
+            if item is None:
+                break
+            batch = [item]
+            deadline = item[2] + self._window
+            while len(batch) < self._max_batch:
+                try:
+                    # Whatever queued up during the last forward pass is taken
+                    # at once; beyond that, wait out the rest of the window.
+                    item = self._queue.get(timeout=max(0.0, deadline - time.monotonic()))
+                except queue.Empty:
+                    break
+                if item is None:
+                    stopping = True
+                    break
+                batch.append(item)
+            self._embed_batch(batch)
+
+    def _embed_batch(self, batch: list[tuple[str, Future, float]]) -> None:
+        started = time.monotonic()
+        metrics.EMBEDDING_BATCH_SIZE.observe(len(batch))
+        for _query, _future, enqueued in batch:
+            metrics.EMBEDDING_QUEUE_WAIT.observe(started - enqueued)
+        queries = [query for query, _future, _enqueued in batch]
+        try:
+            vectors = self._embed_queries(queries)
+        except Exception as e:
+            logger.warning(f"Batched query embedding failed ({len(batch)} queries): {e}")
+            for _query, future, _enqueued in batch:
+                future.set_exception(e)
+            return
+        for (_query, future, _enqueued), vector in zip(batch, vectors, strict=True):
+            future.set_result(vector)
+
+    def _embed_queries(self, queries: list[str]) -> list[list[float]]:
+        # HuggingFaceEmbedding (torch and ONNX) embeds a list in one forward
+        # pass, with the query instruction, through _embed; LlamaIndex has no
+        # batched query method to call on other models.
+        embed = getattr(self._inner, "_embed", None)
+        if embed is not None and len(queries) > 1:
+            return embed(queries, prompt_name="query")
+        return [self._inner._get_query_embedding(query) for query in queries]
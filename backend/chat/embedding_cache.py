@@ -0,0 +1,231 @@
+"""Persistent, content-addressed embedding cache.
+
+Embedding on CPU is the dominant cost of an index rebuild, and on the query
+path every question (and every HyDE hypothetical document) used to be embedded
+from scratch, repeats included. ``CachedEmbedding`` wraps the real model and
+routes every embedding through an ``EmbeddingStore`` keyed on
+sha256(model name, query-or-text, text), so anything embedded once, by either
+the index build or a query, is a lookup afterwards.
+
+The store keeps vectors as packed float32 BLOBs in SQLite (one file, safe
+against a crash mid-write, shared by the build and serve threads) with a
+bounded LRU of decoded vectors in front. Query and text embeddings are keyed
+separately because bge-style models embed them with different instructions.
+
+Every question is a new query key, so the file is capped at ``max_rows``:
+each row records when it was last written or read, and once the table
+outgrows the cap the least recently used rows are deleted down to ``PRUNE_TO``
+of it, so the next prune is a good many writes away. Reads served from the
+in-memory LRU count too, or the hottest vectors, which never reach SQLite
+again, would look the stalest; their ``used`` is written back at most once
+per ``TOUCH_INTERVAL`` per key, batched with the lookup's other updates.
+"""
+
+import hashlib
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+
+import numpy as np
+from llama_index.core.base.embeddings.base import BaseEmbedding
+from pydantic import PrivateAttr
+
+from . import metrics
+
+# Fraction of max_rows left after a prune.
+PRUNE_TO = 0.9
+# Seconds between ``used`` write-backs for a key read from the in-memory LRU.
+TOUCH_INTERVAL = 60.0
+
+
+class EmbeddingStore:
+    """float32 vectors by content key: SQLite on disk, a bounded LRU in memory.
+
+    ``max_rows`` caps the SQLite table (0 = unbounded).
+    """
+
+    def __init__(self, path: str, max_items: int = 4096, max_rows: int = 0) -> None:
+        self.path = path
+        self.max_items = max_items
+        self.max_rows = max_rows
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self._db = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS embeddings (key BLOB PRIMARY KEY, vector BLOB NOT NULL)"
+        )
+        columns = {row[1] for row in self._db.execute("PRAGMA table_info(embeddings)")}
+        if "used" not in columns:  # files written before the row cap
+            self._db.execute("ALTER TABLE embeddings ADD COLUMN used REAL NOT NULL DEFAULT 0")
+        self._db.execute("CREATE INDEX IF NOT EXISTS embeddings_used ON embeddings (used)")
+        self._lru: OrderedDict[bytes, np.ndarray] = OrderedDict()
+        # When each LRU key's ``used`` was last written to SQLite.
+        self._touched: dict[bytes, float] = {}
+        self._lock = threading.Lock()
+        # Upper bound on the row count (replaced keys are counted as new), so
+        # the exact COUNT(*) is only taken when a prune may be due.
+        self._rows = self._db.execute("SELECT COUNT(*) FROM embeddings").fetchone()[0]
+        with self._lock:
+            self._prune()
+
+    @staticmethod
+    def key(model_name: str, kind: str, text: str) -> bytes:
+        return hashlib.sha256(f"{model_name}\0{kind}\0{text}".encode()).digest()
+
+    def get_many(self, keys: list[bytes]) -> dict[bytes, np.ndarray]:
+        found: dict[bytes, np.ndarray] = {}
+        now = time.time()
+        touched: list[bytes] = []
+        with self._lock:
+            for key in keys:
+                vector = self._lru.get(key)
+                if vector is not None:
+                    self._lru.move_to_end(key)
+                    found[key] = vector
+                    if now - self._touched.get(key, 0.0) >= TOUCH_INTERVAL:
+                        self._touched[key] = now
+                        touched.append(key)
+            missing = [key for key in dict.fromkeys(keys) if key not in found]
+            if missing:
+                placeholders = ",".join("?" * len(missing))
+                rows = self._db.execute(
+                    f"SELECT key, vector FROM embeddings WHERE key IN ({placeholders})", missing
+                ).fetchall()
+                for key, blob in rows:
+                    vector = np.frombuffer(blob, dtype=np.float32)
+                    found[key] = vector
+                    self._remember(key, vector, now)
+                    touched.append(key)
+            if touched and self.max_rows > 0:
+                self._db.executemany(
+                    "UPDATE embeddings SET used = ? WHERE key = ?",
+                    [(now, key) for key in touched],
+                )
+        return found
+
+    def put_many(self, items: dict[bytes, np.ndarray]) -> None:
+        now = time.time()
+        with self._lock:
+            self._db.executemany(
+                "INSERT OR REPLACE INTO embeddings (key, vector, used) VALUES (?, ?, ?)",
+                [(key, vector.tobytes(), now) for key, vector in items.items()],
+            )
+            for key, vector in items.items():
+                self._remember(key, vector, now)
+            self._rows += len(items)
+            self._prune()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._db.execute("SELECT COUNT(*) FROM embeddings").fetchone()[0]
+
+    def close(self) -> None:
+        with self._lock:
+            self._db.close()
+
+    def _prune(self) -> None:
+        if self.max_rows <= 0 or self._rows <= self.max_rows:
+            return
+        self._rows = self._db.execute("SELECT COUNT(*) FROM embeddings").fetchone()[0]
+        excess = self._rows - int(self.max_rows * PRUNE_TO)
+        if self._rows > self.max_rows and excess > 0:
+            self._db.execute(
+                "DELETE FROM embeddings WHERE key IN "
+                "(SELECT key FROM embeddings ORDER BY used LIMIT ?)",
+                (excess,),
+            )
+            self._rows -= excess
+            metrics.EMBEDDING_CACHE_PRUNED.inc(excess)
+
+    def _remember(self, key: bytes, vector: np.ndarray, used: float) -> None:
+        if self.max_items <= 0:
+            return
+        self._lru[key] = vector
+        self._lru.move_to_end(key)
+        self._touched[key] = used
+        while len(self._lru) > self.max_items:
+            evicted, _vector = self._lru.popitem(last=False)
+            self._touched.pop(evicted, None)
+
+
+class CachedEmbedding(BaseEmbedding):
+    """Embedding model wrapper that serves repeats from an ``EmbeddingStore``."""
+
+    _inner: BaseEmbedding = PrivateAttr()
+    _store: EmbeddingStore = PrivateAttr()
+
+    def __init__(
+        self, inner: BaseEmbedding, store: EmbeddingStore, model_name: str | None = None
+    ) -> None:
+        # model_name is the cache identity; it defaults to the inner model's.
+        super().__init__(
+            model_name=model_name or getattr(inner, "model_name", "unknown"),
+            embed_batch_size=getattr(inner, "embed_batch_size", 10),
+        )
+        self._inner = inner
+        self._store = store
+
+    @classmethod
+    def class_name(cls) -> str:
+        return "CachedEmbedding"
+
+    @property
+    def inner(self) -> BaseEmbedding:
+        return self._inner
+
+    @property
+    def store(self) -> EmbeddingStore:
+        return self._store
+
+    def _lookup(self, kind: str, texts: list[str]):
+        keys = [EmbeddingStore.key(self.model_name, kind, text) for text in texts]
+        found = self._store.get_many(keys)
+        missing = list(dict.fromkeys(t for t, k in zip(texts, keys, strict=True) if k not in found))
+        metrics.EMBEDDING_CACHE.labels(result="hit").inc(len(texts) - len(missing))
+        metrics.EMBEDDING_CACHE.labels(result="miss").inc(len(missing))
+        return keys, found, missing
+
+    def _merge(self, kind, texts, keys, found, missing, computed) -> list[list[float]]:
+        fresh = {
+            EmbeddingStore.key(self.model_name, kind, text): np.asarray(vector, dtype=np.float32)
+            for text, vector in zip(missing, computed, strict=True)
+        }
+        if fresh:
+            self._store.put_many(fresh)
+            found.update(fresh)
+        return [found[key].tolist() for key in keys]
+
+    def _cached(self, kind: str, texts: list[str], compute) -> list[list[float]]:
+        keys, found, missing = self._lookup(kind, texts)
+        computed = compute(missing) if missing else []
+        return self._merge(kind, texts, keys, found, missing, computed)
+
+    async def _acached(self, kind: str, texts: list[str], compute) -> list[list[float]]:
+        keys, found, missing = self._lookup(kind, texts)
+        computed = await compute(missing) if missing else []
+        return self._merge(kind, texts, keys, found, missing, computed)
+
+    def _get_query_embedding(self, query: str) -> list[float]:
+        return self._cached(
+            "query", [query], lambda m: [self._inner._get_query_embedding(q) for q in m]
+        )[0]
+
+    async def _aget_query_embedding(self, query: str) -> list[float]:
+        async def compute(missing):
+            return [await self._inner._aget_query_embedding(q) for q in missing]
+
+        return (await self._acached("query", [query], compute))[0]
+
+    def _get_text_embedding(self, text: str) -> list[float]:
+        return self._get_text_embeddings([text])[0]
+
+    async def _aget_text_embedding(self, text: str) -> list[float]:
+        return (await self._aget_text_embeddings([text]))[0]
+
+    def _get_text_embeddings(self, texts: list[str]) -> list[list[float]]:
+        return self._cached("text", texts, self._inner._get_text_embeddings)
+
+    async def _aget_text_embeddings(self, texts: list[str]) -> list[list[float]]:
+        return await self._acached("text", texts, self._inner._aget_text_embeddings)
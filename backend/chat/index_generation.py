@@ -0,0 +1,164 @@
+"""Index generations: blue/green reloads of the RAG indices.
+
+A generation is one complete build of both indices, over its own storage
+directory and Chroma collection, plus the QueryEngine serving them. ChatManager
+serves exactly one *active* generation. A reload builds the next one in the
+background while the active one keeps answering, then swaps it in with a single
+reference assignment. Queries already streaming finish on the generation they
+started on; a retired generation is released (collection dropped, index files
+deleted) once its last query, and any stream abandoned mid-answer, completes.
+
+A new generation starts from a copy of the active one, so the incremental sync
+in ``VectorStoreManager`` only embeds/extracts what changed in the documents.
+
+Layout under ``settings.storage_dir``::
+
+    <index files>          the original generation (id None), as laid out by
+                           deploys that predate reloads
+    generations/<id>/      every later generation's storage
+    ACTIVE_GENERATION      id of the generation to load at boot
+"""
+
+import asyncio
+import dataclasses
+import logging
+import os
+import shutil
+import time
+import uuid
+from contextlib import suppress
+from pathlib import Path
+
+from .ChromaClient import ChromaStoreManager
+from .query_engine import QueryEngine
+from .startup import StartupProgress
+from .vector_store_manager import VectorStoreManager
+
+logger = logging.getLogger(__name__)
+
+GENERATIONS_SUBDIR = "generations"
+ACTIVE_POINTER = "ACTIVE_GENERATION"
+
+
+def active_generation_id(storage_dir: str) -> str | None:
+    """Id recorded by the last reload, or None for the original generation."""
+    pointer = Path(storage_dir) / ACTIVE_POINTER
+    if not pointer.exists():
+        return None
+    generation_id = pointer.read_text(encoding="utf-8").strip()
+    if not (Path(storage_dir) / GENERATIONS_SUBDIR / generation_id).is_dir():
+        logger.warning(f"Active generation {generation_id!r} has no storage; using the original")
+        return None
+    return generation_id
+
+
+def write_active_generation_id(storage_dir: str, generation_id: str | None) -> None:
+    pointer = Path(storage_dir) / ACTIVE_POINTER
+    if generation_id is None:
+        pointer.unlink(missing_ok=True)
+        return
+    tmp = pointer.with_suffix(".tmp")
+    tmp.write_text(generation_id, encoding="utf-8")
+    os.replace(tmp, pointer)
+
+
+def new_generation_id() -> str:
+    return f"{time.strftime('%Y%m%d%H%M%S')}-{uuid.uuid4().hex[:6]}"
+
+
+@dataclasses.dataclass
+class IndexGeneration:
+    id: str | None
+    settings: object
+    chroma_store_manager: ChromaStoreManager
+    vector_store_manager: VectorStoreManager
+    query_engine: QueryEngine
+    # Queries currently streaming from this generation. Only touched on the
+    # event loop (ChatManager.query / activate_generation), so no lock.
+    in_flight: int = 0
+    retired: bool = False
+    released: bool = False
+
+    @classmethod
+    def create(
+        cls, settings, generation_id, model_manager, cache_manager, executor
+    ) -> "IndexGeneration":
+        chroma = ChromaStoreManager(settings)
+        if generation_id is not None:
+            storage_dir = Path(settings.storage_dir) / GENERATIONS_SUBDIR / generation_id
+            settings = dataclasses.replace(settings, storage_dir=str(storage_dir))
+            chroma = ChromaStoreManager(
+                settings, f"{ChromaStoreManager.COLLECTION_NAME}-{generation_id}"
+            )
+        vector_store_manager = VectorStoreManager(settings, model_manager, chroma)
+        query_engine = QueryEngine(vector_store_manager, cache_manager, executor=executor)
+        return cls(generation_id, settings, chroma, vector_store_manager, query_engine)
+
+    def build(
+        self, seed: "IndexGeneration | None" = None, progress: StartupProgress | None = None
+    ) -> bool:
+        """Load or build both indices and their engines. Blocking.
+
+        With ``seed`` (the active generation) the new one starts from a copy of
+        its storage and collection, provided the seed can be synced
+        incrementally; otherwise everything is built from the documents.
+        """
+        progress = progress or StartupProgress()
+        Path(self.settings.storage_dir).mkdir(parents=True, exist_ok=True)
+        with progress.track("chroma"):
+            if not self.chroma_store_manager.initialize():
+                return False
+            if seed is not None and seed.vector_store_manager.has_manifests():
+                logger.info(f"Seeding generation {self.id} from generation {seed.id}")
+                self._copy_storage(seed, Path(self.settings.storage_dir))
+                self.chroma_store_manager.copy_from(seed.chroma_store_manager)
+        with progress.track("indices"):
+            if not self.vector_store_manager.run():
+                return False
+        with progress.track("engines"):
+            return self.query_engine.initialize()
+
+    @staticmethod
+    def _copy_storage(seed: "IndexGeneration", target: Path) -> None:
+        source = Path(seed.settings.storage_dir)
+        for path in seed.vector_store_manager.index_files():
+            destination = target / path.relative_to(source)
+            destination.parent.mkdir(parents=True, exist_ok=True)
+            shutil.copy2(path, destination)
+
+    async def release_when_idle(self) -> None:
+        """Release once the query engine has no flight or retrieval left running.
+
+        ``in_flight`` only counts subscribed callers; a stream abandoned by all
+        of them can still be reading the indices. Call on the event loop.
+        """
+        await self.query_engine.wait_idle()
+        await asyncio.to_thread(self.release)
+
+    def release(self) -> None:
+        """Drop this generation's Chroma collection and index files. Idempotent.
+
+        Only the files the index persisted are deleted (then its directories,
+        if that left them empty), so nothing else kept in storage_dir is lost.
+        """
+        if self.released:
+            return
+        self.released = True
+        try:
+            self.chroma_store_manager.drop()
+        except Exception as e:
+            logger.error(f"Error dropping collection of generation {self.id}: {e}")
+
+        storage = Path(self.settings.storage_dir)
+        for path in self.vector_store_manager.index_files():
+            try:
+                path.unlink(missing_ok=True)
+            except Exception as e:
+                logger.error(f"Error removing {path}: {e}")
+        directories = [storage / VectorStoreManager.VECTOR_SUBDIR]
+        if self.id is not None:
+            directories.append(storage)
+        for directory in directories:
+            with suppress(OSError):  # missing, or holds something not ours
+                directory.rmdir()
+        logger.info(f"Released index generation {self.id or 'original'}")
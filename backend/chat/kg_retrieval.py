@@ -0,0 +1,155 @@
+"""LLM-free retrieval over the knowledge graph.
+
+PropertyGraphIndex's default KG retriever starts with ``LLMSynonymRetriever``:
+an LLM call that expands the question into keywords before the graph is
+touched. That put a blocking round trip in front of every KG answer and spent
+two provider requests per question. ``KG_RETRIEVAL_MODE=entity`` swaps it for
+retrievers that need no LLM:
+
+  - ``EntityMatchRetriever``: question n-grams looked up in an alias index of
+    the graph's entity names, built once per index generation;
+  - LlamaIndex's ``VectorContextRetriever``: the query embedding against the
+    entity embeddings the KG build already stored in Chroma.
+
+Matched entities are expanded to their relations and joined with their
+source chunks exactly as the synonym retriever's are, so synthesis sees the
+same kind of nodes. ``benchmarks/kg_retrieval.py`` compares the two modes.
+
+In "llm" mode the default retrievers are still built here
+(``synonym_sub_retrievers``) rather than by ``PropertyGraphIndex``: the index
+would give the synonym step its own LLM, i.e. the default provider's, even in
+an engine answering with another provider.
+"""
+
+import re
+
+from llama_index.core.graph_stores.types import KG_SOURCE_REL, EntityNode
+from llama_index.core.indices.property_graph import LLMSynonymRetriever, VectorContextRetriever
+from llama_index.core.indices.property_graph.sub_retrievers.base import BasePGRetriever
+from llama_index.core.schema import NodeWithScore, QueryBundle
+
+from .prompt import CURRENT_QUESTION
+
+KG_RETRIEVAL_MODES = ("llm", "entity")
+
+_WORD = re.compile(r"[a-z0-9][a-z0-9+#]*")
+# Entity names made only of these would match nearly every question.
+# fmt: off
+_STOPWORDS = frozenset({
+    "a", "an", "and", "are", "as", "at", "be", "by", "did", "do", "does", "for",
+    "from", "had", "has", "have", "how", "i", "in", "is", "it", "me", "my", "of",
+    "on", "or", "that", "the", "their", "this", "to", "was", "we", "were", "what",
+    "when", "where", "which", "who", "why", "with", "you", "your",
+})
+# fmt: on
+
+
+def _tokens(text: str) -> list[str]:
+    # A crude plural fold, applied to names and questions alike.
+    return [
+        w[:-1] if len(w) > 3 and w.endswith("s") and not w.endswith("ss") else w
+        for w in _WORD.findall(text.lower())
+    ]
+
+
+def question_text(query_str: str) -> str:
+    """The current question out of a full query context (prompt + history)."""
+    _context, marker, question = query_str.rpartition(CURRENT_QUESTION)
+    return question if marker else query_str
+
+
+def build_alias_index(graph_store) -> dict[str, list[str]]:
+    """Normalized entity name -> ids of the entities it names."""
+    aliases: dict[str, list[str]] = {}
+    for node in graph_store.get():
+        if not isinstance(node, EntityNode):
+            continue
+        tokens = _tokens(node.name)
+        if tokens and not all(t in _STOPWORDS for t in tokens):
+            ids = aliases.setdefault(" ".join(tokens), [])
+            if node.id not in ids:
+                ids.append(node.id)
+    return aliases
+
+
+class EntityMatchRetriever(BasePGRetriever):
+    """Graph retrieval seeded by entities named in the question."""
+
+    def __init__(
+        self,
+        graph_store,
+        aliases: dict[str, list[str]],
+        include_text: bool = True,
+        path_depth: int = 1,
+        limit: int = 30,
+        **kwargs,
+    ) -> None:
+        self._aliases = aliases
+        self._max_words = max((alias.count(" ") + 1 for alias in aliases), default=0)
+        self._path_depth = path_depth
+        self._limit = limit
+        super().__init__(graph_store=graph_store, include_text=include_text, **kwargs)
+
+    def match(self, query_str: str) -> list[str]:
+        """Ids of entities named in the question, longest names first."""
+        words = _tokens(question_text(query_str))
+        matches: list[str] = []
+        for n in range(min(self._max_words, len(words)), 0, -1):
+            for start in range(len(words) - n + 1):
+                for entity_id in self._aliases.get(" ".join(words[start : start + n]), ()):
+                    if entity_id not in matches:
+                        matches.append(entity_id)
+        return matches
+
+    def retrieve_from_graph(
+        self, query_bundle: QueryBundle, limit: int | None = None
+    ) -> list[NodeWithScore]:
+        matches = self.match(query_bundle.query_str)
+        if not matches:
+            return []
+        triplets = self._graph_store.get_rel_map(
+            self._graph_store.get(ids=matches),
+            depth=self._path_depth,
+            limit=limit or self._limit,
+            ignore_rels=[KG_SOURCE_REL],
+        )
+        return self._get_nodes_with_score(triplets)
+
+    async def aretrieve_from_graph(
+        self, query_bundle: QueryBundle, limit: int | None = None
+    ) -> list[NodeWithScore]:
+        # Dict lookups and an in-memory graph walk: nothing to await.
+        return self.retrieve_from_graph(query_bundle, limit)
+
+
+def _vector_context_retrievers(index, embed_model, similarity_top_k: int) -> list[BasePGRetriever]:
+    graph_store = index.property_graph_store
+    if embed_model is None or (
+        index.vector_store is None and not graph_store.supports_vector_queries
+    ):
+        return []
+    return [
+        VectorContextRetriever(
+            graph_store=graph_store,
+            vector_store=index.vector_store,
+            embed_model=embed_model,
+            similarity_top_k=similarity_top_k,
+        )
+    ]
+
+
+def entity_sub_retrievers(index, embed_model, similarity_top_k: int) -> list[BasePGRetriever]:
+    """Sub-retrievers for ``KG_RETRIEVAL_MODE=entity`` over a PropertyGraphIndex."""
+    graph_store = index.property_graph_store
+    return [
+        EntityMatchRetriever(graph_store, build_alias_index(graph_store)),
+        *_vector_context_retrievers(index, embed_model, similarity_top_k),
+    ]
+
+
+def synonym_sub_retrievers(index, embed_model, llm, similarity_top_k: int) -> list[BasePGRetriever]:
+    """LlamaIndex's default (``KG_RETRIEVAL_MODE=llm``) sub-retrievers, expanding with ``llm``."""
+    return [
+        LLMSynonymRetriever(index.property_graph_store, include_text=True, llm=llm),
+        *_vector_context_retrievers(index, embed_model, similarity_top_k),
+    ]
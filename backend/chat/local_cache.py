@@ -0,0 +1,81 @@
+"""Bounded in-process L1 cache for hot answers.
+
+Sits in front of the Redis cache (L2) so a repeat question is served from
+process memory without a thread hop or a network round trip. Entries expire
+after ``ttl_seconds``, which also bounds how stale an entry can get if an
+invalidation message from Redis is ever missed. When full, the least
+frequently used entry is evicted (ties broken by age), mirroring the
+frequency-based eviction the Redis tier does with its sorted set.
+
+Thread-safe: hits are served from the event loop while stores happen on a
+worker thread and invalidations arrive on the Redis pub/sub thread.
+"""
+
+import threading
+import time
+
+
+class _Entry:
+    __slots__ = ("expires", "hits", "value")
+
+    def __init__(self, value: str, expires: float) -> None:
+        self.value = value
+        self.expires = expires
+        self.hits = 1
+
+
+class LocalCache:
+    def __init__(self, max_items: int = 256, ttl_seconds: float = 300.0) -> None:
+        self.max_items = max_items
+        self.ttl_seconds = ttl_seconds
+        self._entries: dict[str, _Entry] = {}
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: str) -> str | None:
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if entry.expires <= now:
+                del self._entries[key]
+                return None
+            entry.hits += 1
+            return entry.value
+
+    def set(self, key: str, value: str) -> None:
+        if self.max_items <= 0:
+            return
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                entry.value = value
+                entry.expires = now + self.ttl_seconds
+                return
+            if len(self._entries) >= self.max_items:
+                self._evict(now)
+            self._entries[key] = _Entry(value, now + self.ttl_seconds)
+
+    def delete(self, keys) -> None:
+        with self._lock:
+            for key in keys:
+                self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def _evict(self, now: float) -> None:
+        """Drop expired entries; if none were, drop the least frequently used one."""
+        expired = [k for k, e in self._entries.items() if e.expires <= now]
+        for key in expired:
+            del self._entries[key]
+        if expired:
+            return
+        # dicts keep insertion order, so min() returns the oldest among equals.
+        victim = min(self._entries, key=lambda k: self._entries[k].hits)
+        del self._entries[victim]
@@ -15,10 +15,24 @@ QUERIES = Counter(
     ["engine", "transformation", "cache"],
 )
 
+# Cache misses that attached to an identical question's in-flight stream
+# instead of making their own LLM call.
+COALESCED = Counter(
+    "inpersona_coalesced_queries_total",
+    "Queries served by joining an identical in-flight stream.",
+)
+
+# Upstream streams torn down early because every listener disconnected or
+# timed out, i.e. tokens no longer being generated (and billed) for nobody.
+CANCELLED = Counter(
+    "inpersona_cancelled_streams_total",
+    "Upstream LLM streams cancelled after every listener left.",
+)
+
 ERRORS = Counter(
     "inpersona_errors_total",
     "Query failures, by stage.",
-    ["stage"],  # "stream" | "timeout" | "internal"
+    ["stage"],  # "stream" | "timeout" | "busy" | "internal"
 )
 
 LATENCY = Histogram(
@@ -33,6 +47,110 @@ TTFB = Histogram(
     buckets=(0.05, 0.1, 0.25, 0.5, 1, 2, 5, 10),
 )
 
+# Which cache tier answered: the in-process L1, Redis (exact key), or the
+# semantic tier (nearest cached paraphrase).
+CACHE_HITS = Counter(
+    "inpersona_cache_hits_total",
+    "Answer-cache hits, by tier.",
+    ["tier"],  # "local" | "redis" | "semantic"
+)
+
+CACHE_CIRCUIT_OPEN = Gauge(
+    "inpersona_cache_circuit_open",
+    "1 while the Redis cache circuit breaker is open (cache bypassed).",
+)
+
+# Best cosine similarity seen by the semantic cache tier on an exact-key miss.
+# Use it to tune SEMANTIC_CACHE_THRESHOLD: paraphrase hits cluster near the top.
+SEMANTIC_SIMILARITY = Histogram(
+    "inpersona_semantic_cache_similarity",
+    "Nearest cached-question similarity on a semantic cache lookup.",
+    buckets=(0.5, 0.6, 0.7, 0.8, 0.85, 0.9, 0.925, 0.95, 0.975, 1.0),
+)
+
+# Blocking LLM streams run on a bounded worker pool (chat/worker_pool.py).
+# Sustained "queued" means the pool is undersized for the provider's rate limit.
+WORKERS = Gauge(
+    "inpersona_llm_workers",
+    "LLM stream workers, by state.",
+    ["state"],  # "in_use" | "queued"
+)
+
+WORKERS_REJECTED = Counter(
+    "inpersona_llm_workers_rejected_total",
+    "Queries turned away with a busy reply because the worker pool was full.",
+)
+
+# Retrieved-node lookups in QueryEngine's per-generation retrieval cache
+# (chat/query_engine.py), keyed on question, engine and index version.
+RETRIEVAL_CACHE = Counter(
+    "inpersona_retrieval_cache_total",
+    "Retrievals looked up in the retrieval cache, by result.",
+    ["result"],  # "hit" | "miss"
+)
+
+HYDE_DOCUMENTS = Counter(
+    "inpersona_hyde_documents_total",
+    "HyDE hypothetical documents, by how the query got (or went without) one.",
+    ["outcome"],  # "cached" | "generated" | "timeout" | "failed" | "skipped"
+)
+
+# Embedding lookups through the content-addressed cache (chat/embedding_cache.py),
+# from index builds and queries alike.
+EMBEDDING_CACHE = Counter(
+    "inpersona_embedding_cache_total",
+    "Texts looked up in the embedding cache, by result.",
+    ["result"],  # "hit" | "miss"
+)
+
+EMBEDDING_CACHE_PRUNED = Counter(
+    "inpersona_embedding_cache_pruned_total",
+    "Least recently used vectors deleted to keep the cache under EMBEDDING_CACHE_MAX_ROWS.",
+)
+
+# Query embeddings through the micro-batcher (chat/embedding_batcher.py). Mostly
+# 1s with a long wait tail means the window is too short to catch a burst; a
+# wait near the window with no batching means it only adds latency.
+EMBEDDING_BATCH_SIZE = Histogram(
+    "inpersona_query_embedding_batch_size",
+    "Queries embedded per forward pass.",
+    buckets=(1, 2, 3, 4, 6, 8, 12, 16, 24, 32),
+)
+
+EMBEDDING_QUEUE_WAIT = Histogram(
+    "inpersona_query_embedding_queue_wait_seconds",
+    "Time a query waited for its batch's forward pass to start.",
+    buckets=(0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1),
+)
+
+# Chunks through LLM triplet extraction (chat/kg_extraction.py). Its rate
+# during a build or reload is the KG extraction throughput.
+KG_CHUNKS_EXTRACTED = Counter(
+    "inpersona_kg_chunks_extracted_total",
+    "Chunks processed by knowledge-graph triplet extraction.",
+)
+
+# Most-asked questions re-answered into the cache (chat/answer_warming.py).
+ANSWERS_WARMED = Counter(
+    "inpersona_answers_warmed_total",
+    "Questions handled by answer warming, by outcome.",
+    ["outcome"],  # "warmed" | "cached" | "failed" | "skipped"
+)
+
+# Admin-triggered blue/green index reloads (POST /admin/reload).
+RELOADS = Counter(
+    "inpersona_index_reloads_total",
+    "Index generation reloads, by outcome.",
+    ["outcome"],  # "ok" | "failed"
+)
+
+# Duration of each startup stage of the last (re)start; see chat/startup.py.
+STARTUP_STAGE_SECONDS = Gauge(
+    "inpersona_startup_stage_seconds",
+    "Seconds spent in each stage of bringing the RAG stack up.",
+    ["stage"],  # "imports" | "models" | "chroma" | "indices" | "engines"
+)
+
 ACTIVE_CONNECTIONS = Gauge(
     "inpersona_active_connections",
     "Currently open chat WebSocket connections.",
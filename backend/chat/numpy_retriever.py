@@ -0,0 +1,118 @@
+"""Brute-force vector retrieval from one in-memory NumPy matrix.
+
+The knowledge base is a handful of documents, so Chroma's HNSW graph and
+SQLite reads buy nothing at query time. With ``VECTOR_RETRIEVER=numpy`` the
+vector engine instead loads every chunk embedding from the Chroma collection
+once, when the query engines are built, into a contiguous, L2-normalized
+matrix. A query is then one matrix-vector product plus ``argpartition`` for
+the top k: exact results, no approximate-index recall loss.
+
+Chroma stays the store of record (index builds, incremental sync, the KG's
+entity embeddings); only vector-mode queries bypass it. KG entity embeddings
+share the collection and are left out of the matrix, so vector mode answers
+from document chunks only. ``float16`` halves the matrix's memory but is
+upcast to float32 block by block on every query, so it is slower to score.
+``benchmarks/vector_retrieval.py`` compares both dtypes with Chroma at
+1k-100k chunks.
+"""
+
+import numpy as np
+from llama_index.core.graph_stores.types import VECTOR_SOURCE_KEY
+from llama_index.core.retrievers import BaseRetriever
+from llama_index.core.schema import NodeWithScore, QueryBundle
+from llama_index.core.vector_stores.utils import metadata_dict_to_node
+
+VECTOR_RETRIEVERS = ("chroma", "numpy")
+DTYPES = ("float32", "float16")
+
+# Rows upcast to float32 at a time when scoring a float16 matrix.
+_BLOCK_ROWS = 8192
+
+
+class NumpyVectorRetriever(BaseRetriever):
+    def __init__(
+        self, nodes, embeddings, embed_model, similarity_top_k: int, dtype: str = "float32"
+    ):
+        if dtype not in DTYPES:
+            raise ValueError(f"Unknown NUMPY_RETRIEVER_DTYPE {dtype!r}; expected one of {DTYPES}")
+        matrix = np.asarray(embeddings, dtype=np.float32).reshape(len(nodes), -1 if nodes else 0)
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        matrix = matrix / np.where(norms == 0, 1.0, norms)
+        self._matrix = np.ascontiguousarray(matrix, dtype=dtype)
+        self._nodes = list(nodes)
+        self._embed_model = embed_model
+        self._similarity_top_k = similarity_top_k
+        super().__init__()
+
+    @classmethod
+    def from_collection(
+        cls,
+        collection,
+        embed_model,
+        similarity_top_k: int,
+        dtype: str = "float32",
+        batch_size: int = 1000,
+    ) -> "NumpyVectorRetriever":
+        """Load every document chunk (not KG entity) embedding from a Chroma collection."""
+        nodes, blocks = [], []
+        offset = 0
+        while True:
+            rows = collection.get(
+                include=["embeddings", "documents", "metadatas"], limit=batch_size, offset=offset
+            )
+            if not rows["ids"]:
+                break
+            keep = []
+            for i, (text, metadata) in enumerate(
+                zip(rows["documents"], rows["metadatas"], strict=True)
+            ):
+                if VECTOR_SOURCE_KEY not in (metadata or {}):
+                    nodes.append(metadata_dict_to_node(metadata, text=text))
+                    keep.append(i)
+            # Converted a batch at a time: a list of Python floats per row
+            # would briefly cost several times the matrix itself.
+            blocks.append(np.asarray(rows["embeddings"], dtype=np.float32)[keep])
+            offset += len(rows["ids"])
+        embeddings = np.concatenate(blocks) if nodes else []
+        return cls(nodes, embeddings, embed_model, similarity_top_k, dtype)
+
+    def __len__(self) -> int:
+        return len(self._nodes)
+
+    @property
+    def nbytes(self) -> int:
+        return self._matrix.nbytes
+
+    def scores(self, query_embedding) -> np.ndarray:
+        """Cosine similarity of every chunk to ``query_embedding``."""
+        query = np.asarray(query_embedding, dtype=np.float32)
+        query = query / (np.linalg.norm(query) or 1.0)
+        if self._matrix.dtype == np.float32:
+            return self._matrix @ query
+        scores = np.empty(len(self._matrix), dtype=np.float32)
+        for start in range(0, len(self._matrix), _BLOCK_ROWS):
+            block = self._matrix[start : start + _BLOCK_ROWS]
+            scores[start : start + _BLOCK_ROWS] = block.astype(np.float32) @ query
+        return scores
+
+    def top_k(self, query_embedding, k: int | None = None) -> tuple[np.ndarray, np.ndarray]:
+        """(row indices, scores) of the ``k`` best chunks, best first."""
+        k = min(k or self._similarity_top_k, len(self._nodes))
+        if k <= 0:
+            return np.empty(0, dtype=np.intp), np.empty(0, dtype=np.float32)
+        scores = self.scores(query_embedding)
+        best = np.argpartition(-scores, k - 1)[:k]
+        best = best[np.argsort(-scores[best])]
+        return best, scores[best]
+
+    def _retrieve(self, query_bundle: QueryBundle) -> list[NodeWithScore]:
+        embedding = query_bundle.embedding
+        if embedding is None:
+            embedding = self._embed_model.get_agg_embedding_from_queries(
+                query_bundle.embedding_strs
+            )
+        rows, scores = self.top_k(embedding)
+        return [
+            NodeWithScore(node=self._nodes[row], score=float(score))
+            for row, score in zip(rows, scores, strict=True)
+        ]
@@ -6,9 +6,10 @@ module is the second layer: it scrubs contact-info patterns from the model's
 response even if they somehow appear, before anything reaches the client.
 
 ``StreamRedactor`` makes this work over a token stream: a pattern can straddle
-two chunks, so it redacts the whole accumulated buffer each step and only
-emits text outside a trailing hold-back window, keeping any in-progress match
-buffered until it is complete.
+two chunks, so it only emits text outside a trailing hold-back window, keeping
+any in-progress match buffered until it is complete. Raw text whose redaction
+can no longer change is dropped from the buffer, so each chunk costs time
+proportional to the window plus the chunk, not to the whole response.
 """
 
 import re
@@ -30,30 +31,96 @@ def redact_text(text: str) -> str:
     return _PHONE.sub(_REPLACEMENT, _EMAIL.sub(_REPLACEMENT, text))
 
 
+def _match_spans(text: str) -> list[tuple[int, int]]:
+    """Raw-text spans ``redact_text`` would replace, in order.
+
+    Phones are matched between email spans: the placeholder can never be part
+    of a phone match, so this is exactly what ``redact_text``'s second pass
+    sees.
+    """
+    spans: list[tuple[int, int]] = []
+    pos = 0
+    for email in _EMAIL.finditer(text):
+        spans.extend(m.span() for m in _PHONE.finditer(text, pos, email.start()))
+        spans.append(email.span())
+        pos = email.end()
+    spans.extend(m.span() for m in _PHONE.finditer(text, pos))
+    return spans
+
+
 class StreamRedactor:
     """Streaming-safe redactor.
 
     Feed chunks in order; each ``feed`` returns the next slice of redacted text
     that is safe to emit (everything except a trailing hold-back window). Call
-    ``flush`` once at the end to drain the remainder.
+    ``flush`` once at the end to drain the remainder; ``text`` is then the
+    whole redacted response, equal to ``redact_text`` of everything fed.
+
+    Only the unsettled tail of the raw text is kept and rescanned. Everything
+    before a cut point that has been emitted and is not inside a match is
+    final (no match is longer than the hold-back window), so it is dropped.
     """
 
     def __init__(self) -> None:
-        self._raw = ""
+        self._tail = ""  # raw text not yet settled
+        self._base = 0  # redacted length of the settled (dropped) raw prefix
         self._sent = 0  # chars already emitted, in redacted-string coordinates
+        self._parts: list[str] = []
+
+    @property
+    def text(self) -> str:
+        """Everything emitted so far."""
+        return "".join(self._parts)
 
     def feed(self, chunk: str) -> str:
-        self._raw += chunk
-        redacted = redact_text(self._raw)
-        safe_upto = max(0, len(redacted) - _HOLDBACK)
+        self._tail += chunk
+        spans = _match_spans(self._tail)
+        redacted = self._redact(spans)
+        safe_upto = max(0, self._base + len(redacted) - _HOLDBACK)
         if safe_upto <= self._sent:
             return ""
-        out = redacted[self._sent : safe_upto]
+        out = redacted[self._sent - self._base : safe_upto - self._base]
         self._sent = safe_upto
+        self._parts.append(out)
+        self._settle(spans)
         return out
 
     def flush(self) -> str:
-        redacted = redact_text(self._raw)
-        out = redacted[self._sent :]
-        self._sent = len(redacted)
+        redacted = self._redact(_match_spans(self._tail))
+        out = redacted[self._sent - self._base :]
+        self._sent = self._base + len(redacted)
+        self._parts.append(out)
         return out
+
+    def pending(self) -> str:
+        """What ``flush`` would return now, without ending the stream."""
+        return self._redact(_match_spans(self._tail))[self._sent - self._base :]
+
+    def _redact(self, spans: list[tuple[int, int]]) -> str:
+        pieces = []
+        pos = 0
+        for start, end in spans:
+            pieces.append(self._tail[pos:start])
+            pieces.append(_REPLACEMENT)
+            pos = end
+        pieces.append(self._tail[pos:])
+        return "".join(pieces)
+
+    def _settle(self, spans: list[tuple[int, int]]) -> None:
+        """Drop the longest already-emitted raw prefix that ends outside a match."""
+        budget = self._sent - self._base  # emitted chars of the tail's redaction
+        raw = red = 0
+        for start, end in spans:
+            if red + (start - raw) >= budget:
+                break
+            red += start - raw
+            raw = start
+            if red + len(_REPLACEMENT) > budget:
+                break
+            red += len(_REPLACEMENT)
+            raw = end
+        else:
+            start = len(self._tail)
+        cut = min(raw + (budget - red), start) if red < budget else raw
+        self._tail = self._tail[cut:]
+        self._base += red + (cut - raw)
@@ -106,3 +106,7 @@ Answer queries about my professional background conversationally while maintaini
 ❌ Markdown code blocks (```html) surrounding HTML content  
 ❌ Unnecessarily detailed responses for simple questions
 """
+
+# Labels the question in the query context QueryEngine builds (prompt +
+# history + question); KG entity matching reads only what follows it.
+CURRENT_QUESTION = "Current question:"
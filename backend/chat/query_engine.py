@@ -1,18 +1,27 @@
 import asyncio
+import hashlib
+import json
 import logging
 import threading
 import time
 from collections.abc import AsyncIterator, Iterator
+from contextlib import closing, suppress
 
 from llama_index.core.indices.query.query_transform import HyDEQueryTransform
-from llama_index.core.query_engine import TransformQueryEngine
+from llama_index.core.query_engine import RetrieverQueryEngine, TransformQueryEngine
+from llama_index.core.schema import NodeWithScore, QueryBundle
+from llama_index.core.storage.docstore.utils import doc_to_json, json_to_doc
 
 from . import metrics
 from .CacheManager import CacheManager
 from .chatdata import Chat
-from .output_filter import StreamRedactor, redact_text
-from .prompt import contextualized_query
-from .retry import call_with_retry
+from .kg_retrieval import KG_RETRIEVAL_MODES, entity_sub_retrievers, synonym_sub_retrievers
+from .local_cache import LocalCache
+from .numpy_retriever import VECTOR_RETRIEVERS, NumpyVectorRetriever
+from .output_filter import StreamRedactor
+from .prompt import CURRENT_QUESTION, contextualized_query
+from .retry import acall_with_retry, call_with_retry
+from .worker_pool import BoundedExecutor
 
 logger = logging.getLogger(__name__)
 
@@ -20,7 +29,9 @@ logger = logging.getLogger(__name__)
 # server-side with a traceback.
 GENERIC_ERROR = "Sorry, something went wrong on my end. Please try again."
 GENERIC_TIMEOUT = "Sorry, that took too long. Please try asking again."
+GENERIC_BUSY = "I'm answering a lot of questions right now. Please try again in a moment."
 _FALLBACK = "I apologize, but I couldn't generate a response to your question."
+_NO_CONTEXT = "I apologize, but I couldn't find any relevant information in the documents."
 
 
 def _load_system_prompt(settings) -> str:
@@ -46,54 +57,362 @@ def _load_system_prompt(settings) -> str:
     return text
 
 
+def _dump_nodes(nodes: list[NodeWithScore]) -> str:
+    return json.dumps([{"score": n.score, "node": doc_to_json(n.node)} for n in nodes])
+
+
+def _load_nodes(raw: str) -> list[NodeWithScore]:
+    return [NodeWithScore(node=json_to_doc(e["node"]), score=e["score"]) for e in json.loads(raw)]
+
+
+def _merge_nodes(first: list[NodeWithScore], second: list[NodeWithScore]) -> list[NodeWithScore]:
+    """Union of two candidate sets, best score per node, no larger than the larger set."""
+    best: dict[str, NodeWithScore] = {}
+    for candidate in (*first, *second):
+        kept = best.get(candidate.node.node_id)
+        if kept is None or (candidate.score or 0.0) > (kept.score or 0.0):
+            best[candidate.node.node_id] = candidate
+    # sorted() is stable, so ties keep ``first``'s candidates ahead.
+    merged = sorted(best.values(), key=lambda n: n.score or 0.0, reverse=True)
+    return merged[: max(len(first), len(second))]
+
+
+class _Flight:
+    """One upstream LLM stream shared by every concurrent identical question.
+
+    Subscribers that join late are replayed the chunks produced so far. When
+    the last subscriber leaves (disconnect / timeout) the stream is abandoned:
+    ``stop`` is set so a producer thread exits at its next chunk, and an async
+    ``pump`` is cancelled outright, closing the provider's HTTP stream.
+
+    Contact PII is redacted here, once per stream, as a backstop: chunks are
+    fed through a ``StreamRedactor`` and only its output is kept, replayed and
+    sent, so a phone/email split across chunks is still caught and the
+    cached answer is exactly what subscribers were shown.
+    """
+
+    def __init__(self) -> None:
+        self.chunks: list[str] = []
+        self.redactor = StreamRedactor()
+        self._drained = False
+        self.subscribers: list[asyncio.Queue] = []
+        self.stop = threading.Event()
+        self.task: asyncio.Task | None = None
+        self.pump: asyncio.Future | None = None
+
+    def subscribe(self) -> asyncio.Queue:
+        queue: asyncio.Queue = asyncio.Queue()
+        for chunk in self.chunks:
+            queue.put_nowait(("chunk", chunk))
+        self.subscribers.append(queue)
+        return queue
+
+    def unsubscribe(self, queue: asyncio.Queue) -> None:
+        self.subscribers.remove(queue)
+        if not self.subscribers and not self.stop.is_set():
+            self.stop.set()
+            if self.pump is not None and not self.pump.done():
+                metrics.CANCELLED.inc()
+                self.pump.cancel()
+
+    @property
+    def text(self) -> str:
+        """The redacted answer so far (all of it once drained)."""
+        return self.redactor.text
+
+    def drain(self) -> None:
+        """Send the redactor's held-back tail. Idempotent; the stream must be over."""
+        if self._drained:
+            return
+        self._drained = True
+        self._send("chunk", self.redactor.flush())
+
+    def publish(self, msg_type: str, content: str | None) -> None:
+        if msg_type == "chunk":
+            self._send("chunk", self.redactor.feed(content))
+        else:
+            self.drain()
+            self._send(msg_type, content)
+
+    def _send(self, msg_type: str, content: str | None) -> None:
+        if msg_type == "chunk":
+            if not content:
+                return
+            self.chunks.append(content)
+        for queue in self.subscribers:
+            queue.put_nowait((msg_type, content))
+
+
+class _EngineSet:
+    """The query engines (plain and HyDE, over KG and vector) bound to one LLM."""
+
+    def __init__(self, kg, vector, hyde_kg, hyde_vector, hyde_transform) -> None:
+        self.kg = kg
+        self.vector = vector
+        self.hyde_kg = hyde_kg
+        self.hyde_vector = hyde_vector
+        self.hyde_transform = hyde_transform
+
+
 class QueryEngine:
     """Manages query processing and streaming responses."""
 
-    def __init__(self, graph_manager, cache_manager: CacheManager | None = None):
+    def __init__(
+        self,
+        graph_manager,
+        cache_manager: CacheManager | None = None,
+        executor: BoundedExecutor | None = None,
+    ):
         self.graph_manager = graph_manager
         self.cache_manager = cache_manager
+        # Bounded pool for the blocking LLM streams (owned by ChatManager).
+        self.executor = executor or BoundedExecutor()
         self.system_prompt = _load_system_prompt(graph_manager.settings)
+        # Folded into every cache namespace: a prompt change or a re-index moves
+        # all lookups to fresh keys instead of serving stale answers.
+        self.fingerprint = self._fingerprint()
+        # Retrieved nodes (ids, scores and text) by retrieval key, so a question
+        # asked again in another conversation or of another provider skips
+        # HyDE, embedding and the index lookup. Each generation has its own.
+        settings = graph_manager.settings
+        self.retrieval_cache = LocalCache(
+            settings.retrieval_cache_size, settings.retrieval_cache_ttl_seconds
+        )
+        # HyDE hypothetical documents by question, so a repeat HyDE question
+        # whose nodes aren't cached (other engine, expired) skips the LLM call.
+        self.hyde_cache = LocalCache(settings.hyde_cache_size, settings.hyde_cache_ttl_seconds)
         self.query_engine_KG = None
         self.query_engine_vector = None
         self.hyde_engine_KG = None
         self.hyde_engine_vector = None
+        self.hyde_transform = None
+        # KG sub-retrievers for KG_RETRIEVAL_MODE=entity. They hold no LLM, so
+        # every provider shares them; None = "llm" mode, whose synonym
+        # retrievers are built per provider in _build_engines.
+        self._kg_sub_retrievers = None
+        # In-memory brute-force retriever for VECTOR_RETRIEVER=numpy (None =
+        # query Chroma); shared by every provider like the KG sub-retrievers.
+        self._vector_retriever = None
+        # Engines for non-default providers, built on first use. The indices
+        # (and the embedding model) are shared; only the LLM differs.
+        self._provider_engines: dict[str, _EngineSet] = {}
+        # Single-flight registry: cache key -> the upstream stream answering it.
+        # Only touched from the event loop, so no lock is needed.
+        self._inflight: dict[str, _Flight] = {}
+        # Every flight's delivery task, plus async-path retrievals, until they
+        # finish: abandoned flights leave _inflight but may still be reading
+        # the indices (see wait_idle). Event loop only.
+        self._running: set[asyncio.Future] = set()
 
     def initialize(self) -> bool:
         """Initialize query engines after indexes are ready."""
         try:
-            # similarity_top_k must be passed here — setting it on the global
-            # LlamaIndex Settings does NOT propagate to as_query_engine(), which
-            # otherwise silently defaults to top_k=2.
-            top_k = self.graph_manager.settings.similarity_top_k
-            self.query_engine_KG = self.graph_manager.index_KG.as_query_engine(
-                include_text=True,
-                streaming=True,
-                similarity_top_k=top_k,
+            self._kg_sub_retrievers = self._kg_retrievers()
+            self._vector_retriever = self._numpy_retriever()
+            engines = self._build_engines(self._llm_for(None))
+            self.query_engine_KG = engines.kg
+            self.query_engine_vector = engines.vector
+            self.hyde_engine_KG = engines.hyde_kg
+            self.hyde_engine_vector = engines.hyde_vector
+            self.hyde_transform = engines.hyde_transform
+            self._provider_engines.clear()
+            self.fingerprint = self._fingerprint()
+            self.retrieval_cache.clear()
+            self.hyde_cache.clear()
+            return True
+        except Exception as e:
+            logger.error(f"Error setting up query engine: {e}", exc_info=True)
+            return False
+
+    async def wait_idle(self) -> None:
+        """Return once no flight or retrieval started so far is still running.
+
+        A retired index generation waits on this before it is released, so a
+        producer thread or retrieval outliving its subscribers never reads a
+        dropped collection.
+        """
+        while self._running:
+            await asyncio.wait(set(self._running))
+
+    def _track(self, future: asyncio.Future) -> None:
+        self._running.add(future)
+        future.add_done_callback(self._running.discard)
+
+    def _kg_retrievers(self) -> list | None:
+        settings = self.graph_manager.settings
+        mode = settings.kg_retrieval_mode
+        if mode not in KG_RETRIEVAL_MODES:
+            raise ValueError(
+                f"Unknown KG_RETRIEVAL_MODE {mode!r}; expected one of {KG_RETRIEVAL_MODES}"
+            )
+        if mode == "llm":
+            return None
+        model_manager = getattr(self.graph_manager, "model_manager", None)
+        return entity_sub_retrievers(
+            self.graph_manager.index_KG,
+            getattr(model_manager, "embed_model", None),
+            settings.similarity_top_k,
+        )
+
+    def _numpy_retriever(self) -> NumpyVectorRetriever | None:
+        settings = self.graph_manager.settings
+        if settings.vector_retriever not in VECTOR_RETRIEVERS:
+            raise ValueError(
+                f"Unknown VECTOR_RETRIEVER {settings.vector_retriever!r}; "
+                f"expected one of {VECTOR_RETRIEVERS}"
             )
-            self.query_engine_vector = self.graph_manager.index_vector.as_query_engine(
+        if settings.vector_retriever == "chroma":
+            return None
+        retriever = NumpyVectorRetriever.from_collection(
+            self.graph_manager.chroma_store_manager.collection,
+            self.graph_manager.model_manager.embed_model,
+            settings.similarity_top_k,
+            settings.numpy_retriever_dtype,
+        )
+        logger.info(
+            "Loaded %d chunk embeddings into memory (%.1f MB, %s)",
+            len(retriever),
+            retriever.nbytes / 1e6,
+            settings.numpy_retriever_dtype,
+        )
+        return retriever
+
+    def _build_engines(self, llm) -> _EngineSet:
+        # The LLM is bound per engine set rather than read from LlamaIndex's
+        # global Settings, so engines for different providers coexist. That
+        # includes the KG retriever's keyword-synonym step, which the index
+        # would otherwise run on its own, default LLM (KG_RETRIEVAL_MODE=entity
+        # replaces that step; see chat/kg_retrieval.py).
+        # similarity_top_k must be passed here — setting it on the global
+        # LlamaIndex Settings does NOT propagate to as_query_engine(), which
+        # otherwise silently defaults to top_k=2.
+        top_k = self.graph_manager.settings.similarity_top_k
+        sub_retrievers = self._kg_sub_retrievers
+        if sub_retrievers is None:
+            model_manager = getattr(self.graph_manager, "model_manager", None)
+            sub_retrievers = synonym_sub_retrievers(
+                self.graph_manager.index_KG,
+                getattr(model_manager, "embed_model", None),
+                llm,
+                top_k,
+            )
+        kg = self.graph_manager.index_KG.as_query_engine(
+            llm=llm,
+            include_text=True,
+            streaming=True,
+            similarity_top_k=top_k,
+            sub_retrievers=sub_retrievers,
+        )
+        if self._vector_retriever is not None:
+            vector = RetrieverQueryEngine.from_args(self._vector_retriever, llm=llm, streaming=True)
+        else:
+            vector = self.graph_manager.index_vector.as_query_engine(
+                llm=llm,
                 include_text=True,
                 streaming=True,
                 similarity_top_k=top_k,
             )
-
-            hyde = HyDEQueryTransform()
-            self.hyde_engine_KG = TransformQueryEngine(self.query_engine_KG, query_transform=hyde)
-            self.hyde_engine_vector = TransformQueryEngine(
-                self.query_engine_vector, query_transform=hyde
+        hyde = HyDEQueryTransform(llm=llm)
+        return _EngineSet(
+            kg,
+            vector,
+            TransformQueryEngine(kg, query_transform=hyde),
+            TransformQueryEngine(vector, query_transform=hyde),
+            hyde,
+        )
+
+    def _default_provider(self) -> str | None:
+        model_manager = getattr(self.graph_manager, "model_manager", None)
+        return getattr(model_manager, "model_provider", None)
+
+    def _llm_for(self, provider: str | None):
+        model_manager = getattr(self.graph_manager, "model_manager", None)
+        get_llm = getattr(model_manager, "get_llm", None)
+        return get_llm(provider) if get_llm is not None else None
+
+    def _engines_for(self, provider: str | None) -> _EngineSet:
+        """Engines for ``provider``; the default provider's are built at startup."""
+        if provider is None or provider == self._default_provider():
+            return _EngineSet(
+                self.query_engine_KG,
+                self.query_engine_vector,
+                self.hyde_engine_KG,
+                self.hyde_engine_vector,
+                self.hyde_transform,
             )
-            return True
-        except Exception as e:
-            logger.error(f"Error setting up query engine: {e}", exc_info=True)
-            return False
+        engines = self._provider_engines.get(provider)
+        if engines is None:
+            logger.info("Building query engines for provider %s", provider)
+            engines = self._build_engines(self._llm_for(provider))
+            self._provider_engines[provider] = engines
+        return engines
+
+    def _fingerprint(self) -> str:
+        digest = hashlib.sha256(self.system_prompt.encode("utf-8"))
+        index_fingerprint = getattr(self.graph_manager, "index_fingerprint", None)
+        if index_fingerprint is not None:
+            digest.update(index_fingerprint().encode("utf-8"))
+        return digest.hexdigest()[:12]
+
+    def cache_namespace(
+        self,
+        query_transformation: str | None,
+        vector_store: str | None,
+        model_provider: str | None = None,
+    ) -> str:
+        """Everything an answer depends on besides the question itself."""
+        engine = "kg" if vector_store == "KG" else "vector"
+        transformation = "hyde" if query_transformation == "HyDE" else "none"
+        provider = model_provider or self._default_provider() or "default"
+        return f"{engine}:{transformation}:{provider}:{self.fingerprint}"
+
+    @staticmethod
+    def parse_namespace(namespace: str) -> tuple[str, str | None, str | None] | None:
+        """Inverse of ``cache_namespace`` minus the fingerprint.
+
+        Returns ``(vector_store, query_transformation, model_provider)`` as
+        ``process_query`` takes them, or None for a namespace it didn't build.
+        """
+        parts = namespace.split(":")
+        if len(parts) != 4 or parts[0] not in ("kg", "vector") or parts[1] not in ("hyde", "none"):
+            return None
+        engine, transformation, provider, _fingerprint = parts
+        return (
+            "KG" if engine == "kg" else "vector",
+            "HyDE" if transformation == "hyde" else None,
+            None if provider == "default" else provider,
+        )
+
+    def _retrieval_key(
+        self, question: str, query_transformation: str | None, vector_store: str | None
+    ) -> str:
+        """What retrieval depends on: engine, HyDE, index version and the question.
+
+        The provider is left out (retrieval uses only the shared indices and
+        embedding model; HyDE's hypothetical document is an embedding aid, not
+        part of the answer) and so is the conversation history: synthesis
+        still sees the full history, only the nodes are reused.
+        """
+        engine = "kg" if vector_store == "KG" else "vector"
+        transformation = "hyde" if query_transformation == "HyDE" else "none"
+        question = CacheManager.normalize_question(question)
+        return f"{engine}:{transformation}:{self.fingerprint}|{question}"
+
+    def _local_cache_lookup(self, question: str, namespace: str) -> str | None:
+        if self.cache_manager:
+            return self.cache_manager.get_local_response(question, namespace)
+        return None
 
-    def _cache_lookup(self, question: str) -> str | None:
+    # is_available() only reads the cache's circuit breaker (no PING), so a
+    # down or slow Redis is skipped without any I/O on the query path.
+    def _cache_lookup(self, question: str, namespace: str) -> str | None:
         if self.cache_manager and self.cache_manager.is_available():
-            return self.cache_manager.get_cached_response(question)
+            return self.cache_manager.get_cached_response(question, namespace)
         return None
 
-    def _cache_store(self, question: str, response: str) -> None:
+    def _cache_store(self, question: str, response: str, namespace: str) -> None:
         if self.cache_manager and self.cache_manager.is_available():
-            self.cache_manager.cache_response(question, response)
+            self.cache_manager.cache_response(question, response, namespace)
 
     async def process_query(
         self,
@@ -101,24 +420,36 @@ class QueryEngine:
         chat: Chat,
         query_transformation: str | None = None,
         vector_store: str | None = None,
+        model_provider: str | None = None,
     ) -> AsyncIterator[str]:
         """Process a query and yield streaming response chunks.
 
-        Async-native: the blocking LlamaIndex stream runs on a worker thread and
-        feeds an asyncio.Queue via ``call_soon_threadsafe``, so the event loop is
-        never blocked and concurrent connections stream independently. A watchdog
+        Async-native: with a provider that supports it the answer streams from
+        the LLM client's async API on the loop; otherwise the blocking
+        LlamaIndex stream runs on a bounded worker pool and feeds an
+        asyncio.Queue via ``call_soon_threadsafe``. Either way the event loop is
+        never blocked and concurrent connections stream independently.
+        Concurrent cache misses for the same cache key coalesce onto a single
+        upstream stream (see ``_start_flight``); when the pool is saturated a
+        new stream is refused with ``GENERIC_BUSY``. A watchdog
         (``query_timeout_seconds``) frees the connection if a chunk never arrives.
 
         ``chat`` is the per-connection conversation history, passed in by the
         caller, so one visitor's turns never leak into another's prompt.
+        ``model_provider`` picks the LLM for this request only (None = the
+        default provider); concurrent requests may use different providers.
         """
         engine_label = "kg" if vector_store == "KG" else "vector"
         transform_label = "hyde" if query_transformation == "HyDE" else "none"
+        namespace = self.cache_namespace(query_transformation, vector_store, model_provider)
         start = time.monotonic()
 
         try:
-            # Cache lookup off the event loop (Redis is a network call).
-            cached = await asyncio.to_thread(self._cache_lookup, question)
+            # The in-process L1 is a dict lookup, so it runs inline; only an L1
+            # miss pays for the thread hop to Redis (a network call).
+            cached = self._local_cache_lookup(question, namespace)
+            if cached is None:
+                cached = await asyncio.to_thread(self._cache_lookup, question, namespace)
             if cached is not None:
                 chat.append({"role": "user", "content": question})
                 chat.append({"role": "assistant", "content": cached})
@@ -141,35 +472,39 @@ class QueryEngine:
                 + "\n".join(
                     f"{msg['role'].capitalize()}: {msg['content']}" for msg in recent_history
                 )
-                + f"\nCurrent question: {question}\n"
+                + f"\n{CURRENT_QUESTION} {question}\n"
             )
 
-            # Run the blocking LlamaIndex stream on a worker thread; bridge chunks
-            # back to the loop through an asyncio.Queue.
-            loop = asyncio.get_running_loop()
-            queue: asyncio.Queue = asyncio.Queue()
-            response_text: list[str] = []
-            stop = threading.Event()
-
-            def produce() -> None:
-                try:
-                    for chunk in self._stream_chunks(
-                        query_context, query_transformation, vector_store
-                    ):
-                        if stop.is_set():
-                            break
-                        loop.call_soon_threadsafe(queue.put_nowait, ("chunk", chunk))
-                except Exception as e:
-                    loop.call_soon_threadsafe(queue.put_nowait, ("error", str(e)))
-                finally:
-                    loop.call_soon_threadsafe(queue.put_nowait, ("done", None))
-
-            threading.Thread(target=produce, daemon=True).start()
+            # Identical questions already being answered share one upstream
+            # stream instead of each paying for (and rate-limiting on) an LLM call.
+            flight_key = f"{namespace}|{CacheManager.normalize_question(question)}"
+            flight = self._inflight.get(flight_key)
+            if flight is None or flight.stop.is_set():
+                flight = self._start_flight(
+                    flight_key,
+                    question,
+                    namespace,
+                    query_context,
+                    query_transformation,
+                    vector_store,
+                    model_provider,
+                )
+                if flight is None:
+                    # Admission control: the worker pool and its queue are
+                    # full, so answer now instead of queueing into a timeout.
+                    logger.warning("LLM worker pool saturated; rejecting query")
+                    metrics.ERRORS.labels(stage="busy").inc()
+                    chat.append({"role": "assistant", "content": GENERIC_BUSY})
+                    metrics.LATENCY.observe(time.monotonic() - start)
+                    yield GENERIC_BUSY
+                    return
+            else:
+                logger.info("Joining in-flight stream for an identical question")
+                metrics.COALESCED.inc()
+            queue = flight.subscribe()
 
-            # Redact contact PII from the stream as a backstop, holding back a
-            # trailing window so a phone/email split across chunks is still caught.
-            redactor = StreamRedactor()
-            errored = False
+            # Chunks arrive already redacted (see _Flight).
+            received: list[str] = []
             timed_out = False
             first_chunk = True
             timeout = self.graph_manager.settings.query_timeout_seconds
@@ -182,7 +517,9 @@ class QueryEngine:
                         timed_out = True
                         logger.warning("Query timed out after %ss", timeout)
                         metrics.ERRORS.labels(stage="timeout").inc()
-                        tail = redactor.flush()
+                        # This visitor gives up, the stream may not: show the
+                        # held-back text without ending it for the others.
+                        tail = flight.redactor.pending()
                         if tail:
                             yield tail
                         yield GENERIC_TIMEOUT
@@ -192,35 +529,24 @@ class QueryEngine:
                         if first_chunk:
                             metrics.TTFB.observe(time.monotonic() - start)
                             first_chunk = False
-                        response_text.append(content)
-                        safe = redactor.feed(content)
-                        if safe:
-                            yield safe
+                        received.append(content)
+                        yield content
                     elif msg_type == "error":
                         logger.error("Streaming error from query engine: %s", content)
                         metrics.ERRORS.labels(stage="stream").inc()
-                        tail = redactor.flush()
-                        if tail:
-                            yield tail
-                        errored = True
                         yield GENERIC_ERROR
                         break
                     else:  # "done"
-                        tail = redactor.flush()
-                        if tail:
-                            yield tail
                         break
             finally:
-                stop.set()  # let the producer thread exit promptly
+                # The last subscriber to leave stops the producer thread.
+                flight.unsubscribe(queue)
 
             if timed_out:
                 chat.append({"role": "assistant", "content": GENERIC_TIMEOUT})
             else:
-                complete_response = redact_text("".join(response_text)) or _FALLBACK
+                complete_response = "".join(received) or _FALLBACK
                 chat.append({"role": "assistant", "content": complete_response})
-                # Never cache a failed/partial response.
-                if not errored:
-                    await asyncio.to_thread(self._cache_store, question, complete_response)
 
             metrics.QUERIES.labels(
                 engine=engine_label, transformation=transform_label, cache="miss"
@@ -233,35 +559,341 @@ class QueryEngine:
             chat.append({"role": "assistant", "content": GENERIC_ERROR})
             yield GENERIC_ERROR
 
+    def _start_flight(
+        self,
+        flight_key: str,
+        question: str,
+        namespace: str,
+        query_context: str,
+        query_transformation: str | None,
+        vector_store: str | None,
+        model_provider: str | None = None,
+    ) -> _Flight | None:
+        """Start a new upstream stream and register it.
+
+        Providers with native async streaming retrieve on a pool worker and
+        then stream on the loop (``_pump_async``). Otherwise the blocking
+        LlamaIndex stream runs on a pool worker and publishes each chunk onto
+        the loop via ``call_soon_threadsafe``. Returns None, without registering
+        anything, when the pool refuses the work.
+        """
+        loop = asyncio.get_running_loop()
+        flight = _Flight()
+        engines = self._engines_for(model_provider)
+        engine = engines.kg if vector_store == "KG" else engines.vector
+        retrieval_key = self._retrieval_key(question, query_transformation, vector_store)
+
+        if self._streams_async(engine, model_provider):
+            # The answer holds an admission slot until its stream ends, like a
+            # thread-path answer, but only retrieval (HyDE + embedding +
+            # vector/graph lookup, all blocking) runs on a pool thread, plus a
+            # second one while a HyDE document is generated; the token stream
+            # itself runs on the event loop, so a long answer holds no thread.
+            release = self.executor.try_reserve()
+            if release is None:
+                return None
+            use_hyde = query_transformation == "HyDE"
+            try:
+                retrieved = self.executor.submit(
+                    self._retrieve,
+                    engine,
+                    engines.hyde_transform if use_hyde else None,
+                    query_context,
+                    flight.stop,
+                    retrieval_key,
+                )
+            except RuntimeError:  # pool already shut down
+                release()
+                return None
+            # Tracked on its own: cancelling the pump does not stop a
+            # retrieval that is already running on its thread.
+            self._track(asyncio.wrap_future(retrieved))
+            finished = asyncio.ensure_future(
+                self._pump_async(flight, engine, asyncio.wrap_future(retrieved), release)
+            )
+            # A pump cancelled before its first step never reaches its finally.
+            finished.add_done_callback(lambda _finished: release())
+            flight.pump = finished
+        else:
+            finished = loop.create_future()
+
+            def produce() -> None:
+                outcome: tuple[str, str | None] = ("done", None)
+                try:
+                    # Every subscriber may have left while this sat in the queue.
+                    if not flight.stop.is_set():
+                        # closing() closes the provider stream as soon as the
+                        # flight is abandoned instead of reading it to the end.
+                        with closing(
+                            self._stream_chunks(
+                                query_context,
+                                query_transformation,
+                                vector_store,
+                                engines,
+                                retrieval_key,
+                            )
+                        ) as chunks:
+                            for chunk in chunks:
+                                if flight.stop.is_set():
+                                    metrics.CANCELLED.inc()
+                                    break
+                                loop.call_soon_threadsafe(flight.publish, "chunk", chunk)
+                except Exception as e:
+                    outcome = ("error", str(e))
+                finally:
+                    loop.call_soon_threadsafe(finished.set_result, outcome)
+
+            if self.executor.try_submit(produce) is None:
+                return None
+
+        self._inflight[flight_key] = flight
+        flight.task = asyncio.create_task(
+            self._run_flight(flight_key, flight, finished, question, namespace)
+        )
+        # Until finished resolves, i.e. the producer thread or pump has exited.
+        self._track(flight.task)
+        return flight
+
+    async def _run_flight(
+        self,
+        flight_key: str,
+        flight: _Flight,
+        finished: asyncio.Future,
+        question: str,
+        namespace: str,
+    ) -> None:
+        """Wait for one upstream stream and deliver its terminal message.
+
+        A successful, complete answer is cached once, *before* subscribers see
+        "done" and before the flight is retired, so a request arriving in
+        between hits the cache instead of starting a second upstream call.
+        """
+        try:
+            await asyncio.wait([finished])
+            if finished.cancelled():  # abandoned by every subscriber
+                return
+            msg_type, content = finished.result()
+            # Never cache a failed/partial response (errored, or every
+            # subscriber left before the stream completed).
+            if msg_type == "done" and not flight.stop.is_set():
+                # The flight's redactor has already produced the redacted answer.
+                flight.drain()
+                complete_response = flight.text or _FALLBACK
+                await asyncio.to_thread(self._cache_store, question, complete_response, namespace)
+            flight.publish(msg_type, content)
+        finally:
+            if self._inflight.get(flight_key) is flight:
+                del self._inflight[flight_key]
+
+    def _streams_async(self, engine, model_provider: str | None) -> bool:
+        """True if this query can stream over asyncio instead of a worker thread."""
+        model_manager = getattr(self.graph_manager, "model_manager", None)
+        supports = getattr(model_manager, "supports_async_streaming", None)
+        if supports is None or not supports(model_provider):
+            return False
+        return callable(getattr(engine, "retrieve", None)) and callable(
+            getattr(engine, "asynthesize", None)
+        )
+
+    def _retrieve(
+        self,
+        engine,
+        hyde_transform,
+        query_context: str,
+        stop: threading.Event,
+        retrieval_key: str | None = None,
+    ):
+        """Blocking half of the async path: HyDE transform plus node retrieval."""
+        if stop.is_set():
+            return None, []
+        logger.info("Streaming async%s", " with HyDE" if hyde_transform else "")
+        return self._retrieve_nodes(engine, hyde_transform, query_context, retrieval_key)
+
+    def _retrieve_nodes(
+        self, engine, hyde_transform, query_context: str, retrieval_key: str | None
+    ) -> tuple[QueryBundle, list[NodeWithScore]]:
+        """HyDE transform plus node retrieval, served from the retrieval cache when it can be.
+
+        Synthesis reads only ``query_str`` from the bundle, which HyDE leaves as
+        ``query_context``, so every path hands back a plain bundle; a cache hit
+        skips the HyDE LLM call as well as the lookup.
+        """
+        if retrieval_key is not None:
+            cached = self.retrieval_cache.get(retrieval_key)
+            metrics.RETRIEVAL_CACHE.labels(result="miss" if cached is None else "hit").inc()
+            if cached is not None:
+                return QueryBundle(query_context), _load_nodes(cached)
+
+        if hyde_transform is None:
+            max_retries = self.graph_manager.settings.llm_max_retries
+            nodes = call_with_retry(
+                engine.retrieve, QueryBundle(query_context), max_attempts=max_retries
+            )
+            complete = True
+        else:
+            # The HyDE key is the retrieval key minus engine and transformation:
+            # the document depends only on the prompt and the question.
+            hyde_key = retrieval_key.split(":", 2)[2] if retrieval_key is not None else None
+            nodes, complete = self._retrieve_with_hyde(
+                engine, hyde_transform, query_context, hyde_key
+            )
+        # Without its HyDE half the result is a stand-in; don't pin it in the cache.
+        if retrieval_key is not None and complete:
+            self.retrieval_cache.set(retrieval_key, _dump_nodes(nodes))
+        return QueryBundle(query_context), nodes
+
+    def _retrieve_with_hyde(
+        self, engine, hyde_transform, query_context: str, hyde_key: str | None
+    ) -> tuple[list[NodeWithScore], bool]:
+        """HyDE retrieval that waits on the HyDE LLM call for at most ``hyde_budget_seconds``.
+
+        With no cached document, the document is generated on another pool
+        worker while plain retrieval runs here. If it arrives within the
+        budget, its candidates are merged with the plain ones; otherwise the
+        plain candidates are used alone (``complete`` is False) and a late
+        document is still cached for the next time the question is asked.
+        """
+        settings = self.graph_manager.settings
+        max_retries = settings.llm_max_retries
+        document = self.hyde_cache.get(hyde_key) if hyde_key is not None else None
+        if document is not None:
+            metrics.HYDE_DOCUMENTS.labels(outcome="cached").inc()
+            bundle = QueryBundle(query_context, custom_embedding_strs=[document, query_context])
+            return call_with_retry(engine.retrieve, bundle, max_attempts=max_retries), True
+
+        deadline = time.monotonic() + settings.hyde_budget_seconds
+        pending = self.executor.try_submit(
+            self._hyde_document, hyde_transform, query_context, hyde_key
+        )
+        plain = call_with_retry(
+            engine.retrieve, QueryBundle(query_context), max_attempts=max_retries
+        )
+        if pending is None:
+            outcome = "skipped"  # pool saturated: no worker to spare for HyDE
+        else:
+            try:
+                document = pending.result(timeout=max(0.0, deadline - time.monotonic()))
+                outcome = "generated"
+            except TimeoutError:
+                outcome = "timeout"
+            except Exception as e:
+                logger.warning("HyDE generation failed, using plain retrieval: %s", e)
+                outcome = "failed"
+        metrics.HYDE_DOCUMENTS.labels(outcome=outcome).inc()
+        if document is None:
+            return plain, False
+        bundle = QueryBundle(query_context, custom_embedding_strs=[document, query_context])
+        hyde = call_with_retry(engine.retrieve, bundle, max_attempts=max_retries)
+        return _merge_nodes(hyde, plain), True
+
+    def _hyde_document(self, hyde_transform, query_context: str, hyde_key: str | None) -> str:
+        """Generate (and cache) the hypothetical answer HyDE retrieves with."""
+        max_retries = self.graph_manager.settings.llm_max_retries
+        bundle = call_with_retry(
+            hyde_transform.run, QueryBundle(query_context), max_attempts=max_retries
+        )
+        document = bundle.custom_embedding_strs[0]
+        if hyde_key is not None:
+            self.hyde_cache.set(hyde_key, document)
+        return document
+
+    async def _pump_async(
+        self, flight: _Flight, engine, retrieved: asyncio.Future, release
+    ) -> tuple[str, str | None]:
+        """Synthesize over the retrieved nodes and publish chunks as they stream.
+
+        Cancelled by ``_Flight.unsubscribe`` once nobody is listening; the
+        generator is closed on the way out so the provider connection is torn
+        down rather than left generating tokens, and the admission slot
+        (``release``) is given back.
+        """
+        response_gen = None
+        try:
+            query_bundle, nodes = await retrieved
+            if flight.stop.is_set():
+                return ("done", None)
+            max_retries = self.graph_manager.settings.llm_max_retries
+            response = await acall_with_retry(
+                engine.asynthesize, query_bundle, nodes, max_attempts=max_retries
+            )
+            response_gen = getattr(response, "response_gen", None)
+            if not response or response_gen is None:
+                logger.warning("Received empty response from query engine")
+                flight.publish("chunk", _NO_CONTEXT)
+                return ("done", None)
+            async for chunk in response_gen:
+                if flight.stop.is_set():
+                    break
+                if chunk and chunk.strip():
+                    flight.publish("chunk", chunk)
+        except Exception as e:
+            return ("error", str(e))
+        finally:
+            try:
+                aclose = getattr(response_gen, "aclose", None)
+                if aclose is not None:
+                    with suppress(Exception):
+                        await aclose()
+            finally:
+                release()
+        return ("done", None)
+
     def _stream_chunks(
         self,
         query_context: str,
         transformation: str | None,
         vector_store: str | None,
+        engines: _EngineSet | None = None,
+        retrieval_key: str | None = None,
     ) -> Iterator[str]:
-        """Pick the right engine and yield non-empty response chunks."""
-        if not self.query_engine_KG or not self.query_engine_vector:
+        """Pick the right engine and yield non-empty response chunks.
+
+        Engines that split retrieval from synthesis (every RetrieverQueryEngine)
+        go through ``_retrieve_nodes`` so they share the retrieval cache with
+        the async path; anything else is queried in one call.
+        """
+        engines = engines or self._engines_for(None)
+        if not engines.kg or not engines.vector:
             raise RuntimeError("Query engines not initialized. Call initialize() first.")
 
         use_hyde = transformation == "HyDE"
         use_kg = vector_store == "KG"
-
-        if use_kg:
-            engine = self.hyde_engine_KG if use_hyde else self.query_engine_KG
-            logger.info("Using KG query engine%s", " with HyDE" if use_hyde else "")
-        else:
-            engine = self.hyde_engine_vector if use_hyde else self.query_engine_vector
-            logger.info("Using vector query engine%s", " with HyDE" if use_hyde else "")
+        base = engines.kg if use_kg else engines.vector
+        logger.info(
+            "Using %s query engine%s",
+            "KG" if use_kg else "vector",
+            " with HyDE" if use_hyde else "",
+        )
 
         # Retry transient provider failures (429 / 5xx) with backoff. This is
         # the synchronous, in-thread call where rate-limit errors surface.
         max_retries = self.graph_manager.settings.llm_max_retries
-        response = call_with_retry(engine.query, query_context, max_attempts=max_retries)
+        if callable(getattr(base, "retrieve", None)) and callable(
+            getattr(base, "synthesize", None)
+        ):
+            hyde_transform = engines.hyde_transform if use_hyde else None
+            query_bundle, nodes = self._retrieve_nodes(
+                base, hyde_transform, query_context, retrieval_key
+            )
+            response = call_with_retry(
+                base.synthesize, query_bundle, nodes, max_attempts=max_retries
+            )
+        else:
+            if use_kg:
+                engine = engines.hyde_kg if use_hyde else engines.kg
+            else:
+                engine = engines.hyde_vector if use_hyde else engines.vector
+            response = call_with_retry(engine.query, query_context, max_attempts=max_retries)
         if not response or not response.response_gen:
             logger.warning("Received empty response from query engine")
-            yield "I apologize, but I couldn't find any relevant information in the documents."
+            yield _NO_CONTEXT
             return
 
-        for chunk in response.response_gen:
-            if chunk and chunk.strip():
-                yield chunk
+        try:
+            for chunk in response.response_gen:
+                if chunk and chunk.strip():
+                    yield chunk
+        finally:
+            close = getattr(response.response_gen, "close", None)
+            if close is not None:
+                close()
@@ -42,6 +42,16 @@ def is_transient(exc: BaseException) -> bool:
     return any(s in msg for s in _RETRYABLE_SUBSTRINGS)
 
 
+def _policy(max_attempts: int):
+    return retry(
+        retry=retry_if_exception(is_transient),
+        wait=wait_random_exponential(multiplier=1, max=15),
+        stop=stop_after_attempt(max_attempts),
+        reraise=True,
+        before_sleep=before_sleep_log(logger, logging.WARNING),
+    )
+
+
 def call_with_retry(fn, *args, max_attempts: int = 4, **kwargs):
     """Call ``fn(*args, **kwargs)``, retrying transient LLM errors with backoff.
 
@@ -49,14 +59,21 @@ def call_with_retry(fn, *args, max_attempts: int = 4, **kwargs):
     surfaces a clean message and the real error is logged.
     """
 
-    @retry(
-        retry=retry_if_exception(is_transient),
-        wait=wait_random_exponential(multiplier=1, max=15),
-        stop=stop_after_attempt(max_attempts),
-        reraise=True,
-        before_sleep=before_sleep_log(logger, logging.WARNING),
-    )
+    @_policy(max_attempts)
     def _attempt():
         return fn(*args, **kwargs)
 
     return _attempt()
+
+
+async def acall_with_retry(fn, *args, max_attempts: int = 4, **kwargs):
+    """Async counterpart of ``call_with_retry``: awaits ``fn(*args, **kwargs)``.
+
+    Backoff sleeps are ``asyncio.sleep``, so a retry never blocks the loop.
+    """
+
+    @_policy(max_attempts)
+    async def _attempt():
+        return await fn(*args, **kwargs)
+
+    return await _attempt()
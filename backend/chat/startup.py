@@ -0,0 +1,54 @@
+"""Startup progress: which stage of bringing the RAG stack up we're in.
+
+The stack comes up in stages (deferred imports, models, Chroma, indices,
+query engines). ``StartupProgress`` times each one, so ``/ready`` can say how
+far a background warmup has got and ``benchmarks/startup.py`` can break a cold
+start down without a profiler. Stage durations are also exported as the
+``inpersona_startup_stage_seconds`` gauge.
+
+Written by the warmup thread and read by request handlers. Every update is a
+single attribute or dict-item assignment and ``snapshot`` copies, so no lock.
+"""
+
+import time
+from collections.abc import Iterator
+from contextlib import contextmanager
+
+from . import metrics
+
+STAGES = ("imports", "models", "chroma", "indices", "engines")
+
+
+class StartupProgress:
+    def __init__(self) -> None:
+        self.started = time.monotonic()
+        self.stage: str | None = None
+        self.completed: dict[str, float] = {}
+        self.error: str | None = None
+        self.ready = False
+
+    @contextmanager
+    def track(self, stage: str) -> Iterator[None]:
+        """Time ``stage``; it stays current until it finishes or raises."""
+        self.stage = stage
+        start = time.monotonic()
+        yield
+        seconds = time.monotonic() - start
+        self.completed[stage] = seconds
+        metrics.STARTUP_STAGE_SECONDS.labels(stage=stage).set(seconds)
+
+    def finish(self) -> None:
+        self.stage = None
+        self.ready = True
+
+    def fail(self, error: BaseException | str) -> None:
+        # Kept for logs and the caller; /ready is public, so snapshot() omits it.
+        self.error = str(error)
+
+    def snapshot(self) -> dict:
+        return {
+            "stage": self.stage,
+            "completed": {stage: round(s, 2) for stage, s in dict(self.completed).items()},
+            "pending": [s for s in STAGES if s not in self.completed and s != self.stage],
+            "elapsed_seconds": round(time.monotonic() - self.started, 2),
+        }
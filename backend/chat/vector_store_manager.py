@@ -1,11 +1,31 @@
+import hashlib
+import json
 import logging
 import os
-import pickle
+from collections import Counter
 from pathlib import Path
 from threading import Thread
 
-from llama_index.core import PropertyGraphIndex, SimpleDirectoryReader, VectorStoreIndex
+from llama_index.core import (
+    PropertyGraphIndex,
+    SimpleDirectoryReader,
+    StorageContext,
+    VectorStoreIndex,
+    load_index_from_storage,
+)
 from llama_index.core.graph_stores import SimplePropertyGraphStore
+from llama_index.core.graph_stores.types import (
+    TRIPLET_SOURCE_KEY,
+    VECTOR_SOURCE_KEY,
+    ChunkNode,
+)
+from llama_index.core.indices.property_graph import ImplicitPathExtractor
+from llama_index.core.ingestion import run_transformations
+from llama_index.core.node_parser import SentenceSplitter
+from llama_index.core.schema import NodeRelationship
+from llama_index.core.storage.docstore import SimpleDocumentStore
+
+from .kg_extraction import BatchedLLMPathExtractor
 
 logger = logging.getLogger(__name__)
 
@@ -15,9 +35,37 @@ class VectorStoreManager:
 
     Both indices share the underlying Chroma collection but are persisted separately:
       - PropertyGraphIndex: ./storage/{docstore,graph_store}.json + ./kg.html viz
-      - VectorStoreIndex:   ./storage/vector_store.pkl
+      - VectorStoreIndex:   ./storage/vector/{docstore,index_store}.json
+
+    The vector index persists only its metadata; the embeddings live in Chroma
+    and are rehydrated from the shared collection on load. (Older builds
+    pickled the whole index to ./storage/vector_store.pkl; that file is never
+    unpickled, only migrated away from — see ``load_existing_vector_store``.)
+
+    Chunks get content-derived ids (``<source file>#<sha256 of text>``) and each
+    index records the ids it holds per source file in a ``manifest.json`` next
+    to its metadata. On boot a loaded index is synced against the current
+    documents: only chunks whose text is new are embedded (and, for the KG,
+    sent through LLM triplet extraction); chunks that disappeared are deleted
+    from Chroma and the graph store. Editing one paragraph of resume.txt no
+    longer re-extracts the whole corpus.
     """
 
+    VECTOR_SUBDIR = "vector"
+    LEGACY_VECTOR_PICKLE = "vector_store.pkl"
+    MANIFEST = "manifest.json"
+    # What StorageContext.persist writes, plus our manifest and the legacy
+    # pickle; anything else in storage_dir is not the index's.
+    INDEX_FILES = (
+        "docstore.json",
+        "index_store.json",
+        "graph_store.json",
+        "property_graph_store.json",
+        "*__vector_store.json",
+        MANIFEST,
+        LEGACY_VECTOR_PICKLE,
+    )
+
     def __init__(self, settings, model_manager, chroma_store_manager):
         self.settings = settings
         self.model_manager = model_manager
@@ -38,26 +86,148 @@ class VectorStoreManager:
             if not os.path.exists(self.settings.pdf_directory):
                 raise FileNotFoundError(f"PDF directory not found: {self.settings.pdf_directory}")
 
-            self.documents = SimpleDirectoryReader(self.settings.pdf_directory).load_data()
+            # filename_as_id keeps document ids (and so chunks' SOURCE links)
+            # stable across boots.
+            self.documents = SimpleDirectoryReader(
+                self.settings.pdf_directory, filename_as_id=True
+            ).load_data()
             self._document_cache = self.documents
             return True
         except Exception as e:
             logger.error(f"Error loading documents: {e}", exc_info=True)
             return False
 
+    def _transformations(self) -> list:
+        """Chunking for both indices, passed explicitly (never via global Settings)."""
+        return [
+            SentenceSplitter(
+                chunk_size=self.settings.chunk_size,
+                chunk_overlap=self.settings.chunk_overlap,
+            )
+        ]
+
+    def _kg_extractors(self) -> list:
+        """LlamaIndex's default extractors, with LLM extraction batched and paced."""
+        return [
+            BatchedLLMPathExtractor(
+                llm=self.model_manager.llm,
+                batch_size=self.settings.kg_extraction_batch_size,
+                max_concurrency=self.settings.kg_extraction_concurrency,
+                requests_per_minute=self.settings.kg_extraction_requests_per_minute,
+                max_retries=self.settings.llm_max_retries,
+            ),
+            ImplicitPathExtractor(),
+        ]
+
+    def _source_key(self, document) -> str:
+        file_path = document.metadata.get("file_path")
+        if not file_path:
+            return document.doc_id
+        root = Path(self.settings.pdf_directory).resolve()
+        try:
+            return Path(file_path).resolve().relative_to(root).as_posix()
+        except ValueError:
+            return Path(file_path).name
+
+    def _chunk_documents(self) -> dict[str, list]:
+        """Chunk the loaded documents into nodes with content-derived ids.
+
+        Returns ``{source file: [nodes]}``. A chunk's id depends only on its
+        file and text, so an unchanged chunk keeps its id across rebuilds.
+        Every call returns fresh node objects; the two indices mutate the
+        nodes they insert.
+        """
+        by_source: dict[str, list] = {}
+        for document in self.documents:
+            by_source.setdefault(self._source_key(document), []).append(document)
+
+        chunks = {}
+        for source, documents in by_source.items():
+            nodes = run_transformations(documents, self._transformations())
+            seen: Counter = Counter()
+            renamed = {}
+            for node in nodes:
+                digest = hashlib.sha256(node.get_content().encode("utf-8")).hexdigest()[:16]
+                seen[digest] += 1
+                suffix = f"-{seen[digest]}" if seen[digest] > 1 else ""
+                renamed[node.id_] = node.id_ = f"{source}#{digest}{suffix}"
+            for node in nodes:
+                for kind in (NodeRelationship.PREVIOUS, NodeRelationship.NEXT):
+                    related = node.relationships.get(kind)
+                    if related is not None and related.node_id in renamed:
+                        related.node_id = renamed[related.node_id]
+            chunks[source] = nodes
+        return chunks
+
+    # ------------------------------------------------------------------ manifests
+
+    def _read_manifest(self, directory: Path) -> dict[str, list[str]] | None:
+        """``{source file: [chunk ids]}`` recorded for an index, or None if absent."""
+        path = directory / self.MANIFEST
+        if not path.exists():
+            return None
+        try:
+            return json.loads(path.read_text(encoding="utf-8"))["files"]
+        except Exception as e:
+            logger.error(f"Unreadable index manifest {path}: {e}")
+            return None
+
+    def _write_manifest(self, directory: Path, chunks: dict[str, list]) -> None:
+        files = {source: [node.id_ for node in nodes] for source, nodes in sorted(chunks.items())}
+        directory.mkdir(parents=True, exist_ok=True)
+        (directory / self.MANIFEST).write_text(
+            json.dumps({"files": files}, indent=1), encoding="utf-8"
+        )
+
+    def has_manifests(self) -> bool:
+        """True when both stored indices can be synced incrementally."""
+        storage = Path(self.settings.storage_dir)
+        return (storage / self.MANIFEST).exists() and (self._vector_dir() / self.MANIFEST).exists()
+
+    @staticmethod
+    def _diff(recorded: dict[str, list[str]], chunks: dict[str, list]) -> tuple[list, list[str]]:
+        """(nodes to insert, ids to delete) to bring an index from ``recorded`` to ``chunks``."""
+        current = {node.id_: node for nodes in chunks.values() for node in nodes}
+        known = {node_id for ids in recorded.values() for node_id in ids}
+        added = [node for node_id, node in current.items() if node_id not in known]
+        removed = sorted(known - current.keys())
+        return added, removed
+
+    def _changed_chunks(self, directory: Path, label: str):
+        """Chunks and diff for syncing one index, or None when there is nothing to do."""
+        recorded = self._read_manifest(directory)
+        if recorded is None:
+            logger.info(
+                f"No manifest for the {label} index; skipping incremental sync "
+                f"(clear storage once to rebuild with one)"
+            )
+            return None
+        if not self.load_documents():
+            logger.warning(f"Documents unavailable; serving the stored {label} index as-is")
+            return None
+        chunks = self._chunk_documents()
+        added, removed = self._diff(recorded, chunks)
+        if not added and not removed:
+            logger.info(f"{label} index is up to date with the documents")
+            return None
+        logger.info(f"Syncing {label} index: {len(added)} new chunk(s), {len(removed)} removed")
+        return chunks, added, removed
+
     # ------------------------------------------------------------------ knowledge graph
 
     def create_knowledge_graph(self) -> bool:
         try:
-            self.index_KG = PropertyGraphIndex.from_documents(
-                self.documents,
+            chunks = self._chunk_documents()
+            self.index_KG = PropertyGraphIndex(
+                nodes=[node for nodes in chunks.values() for node in nodes],
                 llm=self.model_manager.llm,
+                kg_extractors=self._kg_extractors(),
                 embed_model=self.model_manager.embed_model,
                 property_graph_store=SimplePropertyGraphStore(),
                 vector_store=self.chroma_store_manager.get_vector_store(),
             )
-            self.index_KG.property_graph_store.save_networkx_graph(name=self.settings.graph_file)
-            self.index_KG.storage_context.persist(persist_dir=self.settings.storage_dir)
+            self._persist_graph()
+            self._write_manifest(Path(self.settings.storage_dir), chunks)
             return True
         except Exception as e:
             logger.error(f"Error creating knowledge graph: {e}", exc_info=True)
@@ -65,10 +235,16 @@ class VectorStoreManager:
 
     def load_existing_graph(self) -> bool:
         try:
+            # The persisted docstore too, or the next persist would keep only
+            # the chunks inserted by this sync.
+            docstore = SimpleDocumentStore.from_persist_dir(self.settings.storage_dir)
             self.index_KG = PropertyGraphIndex.from_existing(
                 SimplePropertyGraphStore.from_persist_dir(self.settings.storage_dir),
                 vector_store=self.chroma_store_manager.get_vector_store(),
+                storage_context=StorageContext.from_defaults(docstore=docstore),
                 llm=self.model_manager.llm,
+                kg_extractors=self._kg_extractors(),
+                embed_model=self.model_manager.embed_model,
             )
             return True
         except UnicodeDecodeError as e:
@@ -79,6 +255,65 @@ class VectorStoreManager:
             logger.error(f"Error loading existing graph: {e}", exc_info=True)
             return False
 
+    def sync_knowledge_graph(self) -> bool:
+        """Bring a loaded KG in line with the documents, extracting only new chunks."""
+        try:
+            changes = self._changed_chunks(Path(self.settings.storage_dir), "knowledge graph")
+            if changes is None:
+                return True
+            chunks, added, removed = changes
+            if removed:
+                self._prune_graph(removed)
+            if added:
+                self.index_KG.insert_nodes(added)
+            self._persist_graph()
+            self._write_manifest(Path(self.settings.storage_dir), chunks)
+            return True
+        except Exception as e:
+            logger.error(f"Error syncing knowledge graph: {e}", exc_info=True)
+            return False
+
+    def _prune_graph(self, chunk_ids: list[str]) -> None:
+        """Delete chunks and everything extracted only from them.
+
+        Relations sourced from (or touching) a removed chunk go; an entity goes
+        once no remaining relation references it, so entities also mentioned
+        by a surviving chunk are kept. Pruned entities' embeddings are deleted
+        from Chroma, and the chunks from the index's docstore.
+        """
+        graph = self.index_KG.property_graph_store.graph
+        removed = set(chunk_ids)
+        for key, relation in list(graph.relations.items()):
+            if (
+                relation.properties.get(TRIPLET_SOURCE_KEY) in removed
+                or relation.source_id in removed
+                or relation.target_id in removed
+            ):
+                del graph.relations[key]
+                graph.triplets.discard((relation.source_id, relation.id, relation.target_id))
+
+        linked = {node_id for triplet in graph.triplets for node_id in (triplet[0], triplet[2])}
+        pruned = []
+        for node_id, node in list(graph.nodes.items()):
+            if node_id in removed:
+                del graph.nodes[node_id]
+            elif not isinstance(node, ChunkNode) and node_id not in linked:
+                source = node.properties.get(TRIPLET_SOURCE_KEY)
+                if source is None or source in removed:
+                    del graph.nodes[node_id]
+                    pruned.append(node_id)
+
+        if pruned and self.index_KG.vector_store is not None:
+            # ChromaVectorStore.delete_nodes can't delete by filter alone.
+            self.index_KG.vector_store.client.delete(where={VECTOR_SOURCE_KEY: {"$in": pruned}})
+        for chunk_id in chunk_ids:
+            # Also drops a source file's ref-doc entry once its last chunk goes.
+            self.index_KG.docstore.delete_document(chunk_id, raise_error=False)
+
+    def _persist_graph(self) -> None:
+        self.index_KG.property_graph_store.save_networkx_graph(name=self.settings.graph_file)
+        self.index_KG.storage_context.persist(persist_dir=self.settings.storage_dir)
+
     def can_load_existing_graph(self) -> bool:
         try:
             storage_path = Path(self.settings.storage_dir)
@@ -104,50 +339,121 @@ class VectorStoreManager:
 
     # ------------------------------------------------------------------ vector store
 
+    def _vector_dir(self) -> Path:
+        return Path(self.settings.storage_dir) / self.VECTOR_SUBDIR
+
     def create_vector_store(self) -> bool:
         try:
             if not self.documents:
                 logger.error("No documents loaded to create vector store from")
                 return False
 
-            self.index_vector = VectorStoreIndex.from_documents(
-                self.documents,
+            chunks = self._chunk_documents()
+            storage_context = StorageContext.from_defaults(
+                vector_store=self.chroma_store_manager.get_vector_store()
+            )
+            self.index_vector = VectorStoreIndex(
+                nodes=[node for nodes in chunks.values() for node in nodes],
                 embed_model=self.model_manager.embed_model,
-                vector_store=self.chroma_store_manager.get_vector_store(),
+                storage_context=storage_context,
             )
-
-            vector_file = os.path.join(self.settings.storage_dir, "vector_store.pkl")
-            with open(vector_file, "wb") as f:
-                pickle.dump(self.index_vector, f)
-            logger.info(f"Saved vector index to {vector_file}")
+            self.index_vector.storage_context.persist(persist_dir=str(self._vector_dir()))
+            self._write_manifest(self._vector_dir(), chunks)
+            logger.info(f"Saved vector index metadata to {self._vector_dir()}")
             return True
         except Exception as e:
             logger.error(f"Error creating vector store: {e}", exc_info=True)
             return False
 
     def load_existing_vector_store(self) -> bool:
+        """Rehydrate the vector index from its persisted metadata plus Chroma.
+
+        A deploy that still has only the legacy pickle is migrated without
+        unpickling it: the vectors are already in Chroma, so the index is
+        rebuilt over the collection, its metadata persisted, and the pickle
+        deleted.
+        """
         try:
-            vector_file = os.path.join(self.settings.storage_dir, "vector_store.pkl")
-            if not os.path.exists(vector_file):
-                return False
-            with open(vector_file, "rb") as f:
-                self.index_vector = pickle.load(f)
-            logger.info(f"Loaded vector index from {vector_file}")
+            vector_store = self.chroma_store_manager.get_vector_store()
+            if self._has_vector_metadata():
+                storage_context = StorageContext.from_defaults(
+                    persist_dir=str(self._vector_dir()), vector_store=vector_store
+                )
+                self.index_vector = load_index_from_storage(
+                    storage_context, embed_model=self.model_manager.embed_model
+                )
+                logger.info(f"Loaded vector index from {self._vector_dir()}")
+                return True
+
+            self.index_vector = VectorStoreIndex.from_vector_store(
+                vector_store, embed_model=self.model_manager.embed_model
+            )
+            self.index_vector.storage_context.persist(persist_dir=str(self._vector_dir()))
+            Path(self.settings.storage_dir, self.LEGACY_VECTOR_PICKLE).unlink(missing_ok=True)
+            logger.info("Migrated legacy pickled vector index to StorageContext metadata")
             return True
         except Exception as e:
             logger.error(f"Error loading vector store: {e}", exc_info=True)
             return False
 
+    def sync_vector_store(self) -> bool:
+        """Bring a loaded vector index in line with the documents, embedding only new chunks."""
+        try:
+            changes = self._changed_chunks(self._vector_dir(), "vector")
+            if changes is None:
+                return True
+            chunks, added, removed = changes
+            if removed:
+                self.index_vector.delete_nodes(removed, delete_from_docstore=True)
+            if added:
+                self.index_vector.insert_nodes(added)
+            self.index_vector.storage_context.persist(persist_dir=str(self._vector_dir()))
+            self._write_manifest(self._vector_dir(), chunks)
+            return True
+        except Exception as e:
+            logger.error(f"Error syncing vector store: {e}", exc_info=True)
+            return False
+
+    def _has_vector_metadata(self) -> bool:
+        return (self._vector_dir() / "index_store.json").exists()
+
     def can_load_existing_vector_store(self) -> bool:
-        vector_file = os.path.join(self.settings.storage_dir, "vector_store.pkl")
-        return os.path.exists(vector_file)
+        legacy = Path(self.settings.storage_dir) / self.LEGACY_VECTOR_PICKLE
+        return self._has_vector_metadata() or legacy.exists()
+
+    # ------------------------------------------------------------------ versioning
+
+    def index_files(self) -> list[Path]:
+        """The files this index build persisted, in a stable order."""
+        files = []
+        for directory in (Path(self.settings.storage_dir), self._vector_dir()):
+            for pattern in self.INDEX_FILES:
+                files.extend(path for path in directory.glob(pattern) if path.is_file())
+        return sorted(set(files))
+
+    def index_fingerprint(self) -> str:
+        """Content hash of this build's persisted index files.
+
+        Chunk ids are content hashes, so re-indexing unchanged documents can
+        leave it the same; any change to what the indices hold changes it,
+        which is exactly when cached answers must stop being served. Only
+        ``index_files`` are hashed: other generations' storage and the
+        ACTIVE_GENERATION pointer under the original generation's storage_dir
+        are not part of this index.
+        """
+        digest = hashlib.sha256()
+        storage_path = Path(self.settings.storage_dir)
+        for path in self.index_files():
+            digest.update(path.relative_to(storage_path).as_posix().encode("utf-8"))
+            digest.update(path.read_bytes())
+        return digest.hexdigest()[:12]
 
     # ------------------------------------------------------------------ orchestration
 
     def _load_or_create_vector_store(self) -> bool:
         if self.can_load_existing_vector_store():
             logger.info("Found existing vector store. Loading from storage...")
-            return self.load_existing_vector_store()
+            return self.load_existing_vector_store() and self.sync_vector_store()
         logger.info("No existing vector store found. Creating new one...")
         if not self.load_documents():
             return False
@@ -157,7 +463,7 @@ class VectorStoreManager:
         if self.can_load_existing_graph():
             logger.info("Found existing property graph. Loading from storage...")
             if self.load_existing_graph():
-                return True
+                return self.sync_knowledge_graph()
             logger.info("Failed to load existing graph. Creating new one...")
         else:
             logger.info("No existing property graph found. Creating new one...")
@@ -0,0 +1,97 @@
+"""Bounded, instrumented thread pool and admission control for LLM streams.
+
+Answers from providers without async streaming run LlamaIndex's blocking
+stream on a pool thread, which waits on the provider for the whole answer.
+Starting a raw thread per query lets a burst spawn unbounded threads that all
+block on the same rate-limited provider. This pool caps concurrency at
+``max_workers`` and the backlog at ``max_queue``; beyond that ``try_submit``
+refuses immediately so the caller can send a fast "busy" reply instead of
+queueing a visitor behind work that will time out anyway.
+
+Async-streamed answers hold no thread while tokens arrive, but they load the
+provider just the same, so they are admitted through the same slots:
+``try_reserve`` takes one for the whole answer (its blocking retrieval runs
+under it via ``submit``) and the caller releases it when the stream ends.
+In-use / queued slots are exported as gauges.
+"""
+
+import threading
+from collections.abc import Callable
+from concurrent.futures import Future, ThreadPoolExecutor
+
+from . import metrics
+
+
+class BoundedExecutor:
+    def __init__(self, max_workers: int = 8, max_queue: int = 32, name: str = "llm") -> None:
+        self.max_workers = max_workers
+        self.max_queue = max_queue
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix=name)
+        self._slots = threading.BoundedSemaphore(max_workers + max_queue)
+        self._lock = threading.Lock()
+        self._in_use = 0
+        self._queued = 0
+
+    def try_submit(self, fn, *args, **kwargs) -> Future | None:
+        """Run ``fn`` on the pool, or return None at once if the pool is saturated."""
+        if not self._slots.acquire(blocking=False):
+            metrics.WORKERS_REJECTED.inc()
+            return None
+        self._update(queued=1)
+
+        def run():
+            self._update(queued=-1, in_use=1)
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                self._update(in_use=-1)
+                self._slots.release()
+
+        try:
+            return self._pool.submit(run)
+        except RuntimeError:  # pool already shut down
+            self._update(queued=-1)
+            self._slots.release()
+            return None
+
+    def try_reserve(self) -> Callable[[], None] | None:
+        """Admit work that runs off the pool, or return None if saturated.
+
+        Returns the function that gives the slot back; calling it more than
+        once is harmless.
+        """
+        if not self._slots.acquire(blocking=False):
+            metrics.WORKERS_REJECTED.inc()
+            return None
+        self._update(in_use=1)
+        lock = threading.Lock()
+        released = False
+
+        def release() -> None:
+            nonlocal released
+            with lock:
+                if released:
+                    return
+                released = True
+            self._update(in_use=-1)
+            self._slots.release()
+
+        return release
+
+    def submit(self, fn, *args, **kwargs) -> Future:
+        """Run ``fn`` on the pool under a slot the caller already reserved.
+
+        Raises RuntimeError once the pool is shut down.
+        """
+        return self._pool.submit(fn, *args, **kwargs)
+
+    def shutdown(self, wait: bool = False) -> None:
+        """Stop accepting work. Already-submitted streams run to completion."""
+        self._pool.shutdown(wait=wait)
+
+    def _update(self, queued: int = 0, in_use: int = 0) -> None:
+        with self._lock:
+            self._queued += queued
+            self._in_use += in_use
+            metrics.WORKERS.labels(state="queued").set(self._queued)
+            metrics.WORKERS.labels(state="in_use").set(self._in_use)
@@ -1,22 +1,33 @@
+import asyncio
+import hmac
 import json
 import logging
+import signal
 import ssl
-import threading
+import sys
 from contextlib import asynccontextmanager, suppress
+from typing import TYPE_CHECKING, Any
 
 from dotenv import load_dotenv
-from fastapi import FastAPI, Response, WebSocket, WebSocketDisconnect
+from fastapi import FastAPI, Header, Response, WebSocket, WebSocketDisconnect
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import JSONResponse
 from pydantic import ValidationError
 
 from chat import metrics
 from chat.chatdata import Chat
-from chat.ChatManager import ChatManager
 from chat.rate_limiter import RateLimiter
 from chat.schemas import ChatRequest
+from chat.startup import StartupProgress
 from settings import PropertyGraphSettings
 
+if TYPE_CHECKING:
+    # Imported for real in _build_chat_manager: it pulls in torch, chromadb and
+    # LlamaIndex, which must not delay the first /health response.
+    import uvicorn
+
+    from chat.ChatManager import ChatManager
+
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
@@ -39,27 +50,75 @@ def _client_key(websocket: WebSocket) -> str:
     return client.host if client else "unknown"
 
 
-# --- chat manager (singleton, swappable on provider change) ----------------
+# --- chat manager (singleton; serves every configured provider) ------------
 
-chat_manager: ChatManager
-_chat_manager_lock = threading.Lock()
+# None until the RAG stack is warm (see STARTUP_MODE).
+chat_manager: "ChatManager | None" = None
+startup = StartupProgress()
+_warmup_task: asyncio.Task | None = None
+# What serve() exits with after a failed background startup: uvicorn's own
+# code for a failed lifespan startup, i.e. what a blocking start returns.
+STARTUP_FAILURE_EXIT_CODE = 3
+_startup_failed = False
+# The uvicorn server serve() runs, so a failed warm-up can stop it directly.
+_server: "uvicorn.Server | None" = None
 
 
-def _build_chat_manager(provider: str) -> ChatManager:
+def _build_chat_manager(provider: str, progress: StartupProgress | None = None) -> "ChatManager":
+    progress = progress or StartupProgress()
+    with progress.track("imports"):
+        from chat.ChatManager import ChatManager
     cm = ChatManager(settings=SETTINGS, model_provider=provider)
-    if not cm.initialize_system():
+    if not cm.initialize_system(progress):
         raise RuntimeError(f"Failed to initialize ChatManager with provider={provider}")
+    progress.finish()
     return cm
 
 
+async def _warm_up() -> None:
+    """Build the RAG stack off the event loop while /health already answers."""
+    global chat_manager, _startup_failed
+    try:
+        chat_manager = await asyncio.to_thread(
+            _build_chat_manager, SETTINGS.default_model_provider, startup
+        )
+    except Exception as e:
+        logger.error(f"Background startup failed: {e}", exc_info=True)
+        startup.fail(e)
+        # Shut down gracefully: serve() then exits with
+        # STARTUP_FAILURE_EXIT_CODE so the restart policy sees a failure. Under
+        # a bare `uvicorn server:app` SIGTERM is the only way to stop the
+        # server, and the process ends by that signal, still nonzero.
+        _startup_failed = True
+        if _server is not None:
+            _server.should_exit = True
+        else:
+            signal.raise_signal(signal.SIGTERM)
+        return
+    logger.info(f"RAG stack ready in {startup.snapshot()['elapsed_seconds']}s")
+    _start_answer_warming(automatic=True)
+
+
 @asynccontextmanager
 async def lifespan(app: FastAPI):
-    global chat_manager
-    chat_manager = _build_chat_manager(SETTINGS.default_model_provider)
+    global chat_manager, _warmup_task
+    if SETTINGS.startup_mode == "blocking":
+        chat_manager = _build_chat_manager(SETTINGS.default_model_provider, startup)
+        _start_answer_warming(automatic=True)
+    else:
+        _warmup_task = asyncio.create_task(_warm_up())
     try:
         yield
     finally:
-        chat_manager.cleanup()
+        # A build still running on its thread finishes there; its result is
+        # dropped rather than assigned after cleanup.
+        for task in (_warmup_task, _warm_task):
+            if task is not None and not task.done():
+                task.cancel()
+                with suppress(asyncio.CancelledError):
+                    await task
+        if chat_manager is not None:
+            chat_manager.cleanup()
 
 
 app = FastAPI(lifespan=lifespan)
@@ -84,11 +143,16 @@ def health() -> dict:
 
 @app.get("/ready")
 def ready() -> Response:
-    """Readiness: the RAG stack is built and serving. 503 until warm."""
+    """Readiness: the RAG stack is built and serving. 503 until warm.
+
+    While warming up, the body reports the current startup stage and how long
+    each finished stage took.
+    """
     cm = globals().get("chat_manager")
     engine = getattr(cm, "query_engine", None) if cm is not None else None
     if engine is None or getattr(engine, "query_engine_KG", None) is None:
-        return JSONResponse({"status": "initializing"}, status_code=503)
+        status = "failed" if startup.error else "initializing"
+        return JSONResponse({"status": status, **startup.snapshot()}, status_code=503)
     return JSONResponse({"status": "ready"})
 
 
@@ -97,12 +161,190 @@ def prometheus_metrics() -> Response:
     return Response(content=metrics.render(), media_type=metrics.CONTENT_TYPE)
 
 
+# --- admin ------------------------------------------------------------------
+
+# The one background reload allowed at a time, and what the last one did.
+_reload_task: asyncio.Task | None = None
+_reload_status = "idle"  # "idle" | "reloading" | "failed"
+
+
+def _reload_state() -> dict:
+    generation = getattr(globals().get("chat_manager"), "generation", None)
+    return {"status": _reload_status, "generation": getattr(generation, "id", None)}
+
+
+def _authorized(authorization: str | None) -> bool:
+    expected = f"Bearer {SETTINGS.admin_token}"
+    return authorization is not None and hmac.compare_digest(authorization, expected)
+
+
+async def _reload_generation() -> None:
+    global _reload_status
+    # Built off the event loop so the active generation keeps answering.
+    generation = await asyncio.to_thread(chat_manager.build_generation)
+    if generation is None:
+        _reload_status = "failed"
+        return
+    try:
+        await chat_manager.activate_generation(generation)
+    except Exception as e:
+        logger.error(f"Error activating index generation: {e}", exc_info=True)
+        await asyncio.to_thread(generation.release)
+        _reload_status = "failed"
+        return
+    _reload_status = "idle"
+    # The new generation's fingerprint moved every answer to fresh cache keys.
+    _start_answer_warming(automatic=True)
+
+
+@app.post("/admin/reload")
+async def reload_indices(authorization: str | None = Header(default=None)) -> Response:
+    """Rebuild the indices from the current documents and swap them in.
+
+    Returns 202 at once; the new generation is built in the background and
+    replaces the active one only when it is fully warm, so no connection is
+    dropped and /ready stays 200 throughout. Poll GET /admin/reload for status.
+    """
+    global _reload_task, _reload_status
+    if not SETTINGS.admin_token:
+        return JSONResponse({"detail": "Not Found"}, status_code=404)
+    if not _authorized(authorization):
+        return JSONResponse({"error": "unauthorized"}, status_code=401)
+    if chat_manager is None:
+        return JSONResponse({"status": "initializing"}, status_code=503)
+    if _reload_task is not None and not _reload_task.done():
+        return JSONResponse(_reload_state(), status_code=409)
+    _reload_status = "reloading"
+    _reload_task = asyncio.create_task(_reload_generation())
+    return JSONResponse(_reload_state(), status_code=202)
+
+
+@app.get("/admin/reload")
+def reload_status(authorization: str | None = Header(default=None)) -> Response:
+    if not SETTINGS.admin_token:
+        return JSONResponse({"detail": "Not Found"}, status_code=404)
+    if not _authorized(authorization):
+        return JSONResponse({"error": "unauthorized"}, status_code=401)
+    return JSONResponse(_reload_state())
+
+
+# The one answer-warming run allowed at a time, and what the last one did.
+_warm_task: asyncio.Task | None = None
+_warm_result: dict | None = None
+
+
+async def _warm_answers(top_n: int) -> None:
+    global _warm_result
+    from chat.answer_warming import warm_answers
+
+    try:
+        _warm_result = await warm_answers(
+            chat_manager, top_n, SETTINGS.answer_warming_requests_per_minute
+        )
+    except Exception as e:
+        logger.error(f"Answer warming failed: {e}", exc_info=True)
+
+
+def _start_answer_warming(automatic: bool = False, top_n: int | None = None) -> bool:
+    """Start warming unless a run is in progress (or automatic warming is off)."""
+    global _warm_task
+    top_n = SETTINGS.answer_warming_top_n if top_n is None else top_n
+    if automatic and top_n <= 0:
+        return False
+    if _warm_task is not None and not _warm_task.done():
+        return False
+    _warm_task = asyncio.create_task(_warm_answers(top_n))
+    return True
+
+
+def _warm_state() -> dict:
+    running = _warm_task is not None and not _warm_task.done()
+    return {"status": "warming" if running else "idle", "last": _warm_result}
+
+
+@app.post("/admin/warm")
+async def warm_cache(
+    top_n: int | None = None, authorization: str | None = Header(default=None)
+) -> Response:
+    """Re-answer the most-asked questions into the cache, in the background.
+
+    ``top_n`` overrides ANSWER_WARMING_TOP_N for this run. Returns 202 at once;
+    poll GET /admin/warm for the outcome counts.
+    """
+    if not SETTINGS.admin_token:
+        return JSONResponse({"detail": "Not Found"}, status_code=404)
+    if not _authorized(authorization):
+        return JSONResponse({"error": "unauthorized"}, status_code=401)
+    if chat_manager is None:
+        return JSONResponse({"status": "initializing"}, status_code=503)
+    if not _start_answer_warming(top_n=top_n):
+        return JSONResponse(_warm_state(), status_code=409)
+    return JSONResponse(_warm_state(), status_code=202)
+
+
+@app.get("/admin/warm")
+def warm_status(authorization: str | None = Header(default=None)) -> Response:
+    if not SETTINGS.admin_token:
+        return JSONResponse({"detail": "Not Found"}, status_code=404)
+    if not _authorized(authorization):
+        return JSONResponse({"error": "unauthorized"}, status_code=401)
+    return JSONResponse(_warm_state())
+
+
 # --- websocket --------------------------------------------------------------
 
 
+def _frame_text(message: dict) -> str:
+    """Text of a received ASGI WebSocket message; raises on a disconnect."""
+    if message["type"] == "websocket.disconnect":
+        raise WebSocketDisconnect(message.get("code", 1000))
+    return message.get("text") or ""
+
+
+async def _stream_answer(websocket: WebSocket, chunks, listener: asyncio.Task) -> None:
+    """Send an answer while ``listener`` watches the socket for a disconnect.
+
+    Starlette only notices a closed socket on the next send, so without this a
+    visitor who closes the tab mid-answer keeps the provider generating tokens
+    until the answer finishes. Cancelling the send task cancels the query
+    generator, which abandons the upstream stream (see ``QueryEngine``). A
+    frame that arrives mid-answer is left in ``listener`` for the main loop.
+    """
+
+    async def send() -> None:
+        try:
+            async for chunk in chunks:
+                await websocket.send_text(json.dumps({"type": "chunk", "content": chunk}))
+            await websocket.send_text(json.dumps({"type": "complete"}))
+        except Exception as e:
+            logger.error(f"Error processing query: {e}", exc_info=True)
+            await websocket.send_text(
+                json.dumps({"error": "Sorry, something went wrong. Please try again."})
+            )
+
+    sender = asyncio.create_task(send())
+    await asyncio.wait({sender, listener}, return_when=asyncio.FIRST_COMPLETED)
+    if not sender.done() and not _is_frame(listener):
+        # Disconnected, or the receive failed (socket error, cancellation):
+        # either way nobody will read the rest. The main loop re-raises a
+        # failed receive when it awaits the listener.
+        logger.info("Client gone mid-answer; cancelling upstream stream")
+        sender.cancel()
+        with suppress(asyncio.CancelledError):
+            await sender
+        return
+    await sender
+
+
+def _is_frame(listener: asyncio.Task) -> bool:
+    """Whether a finished receive task holds a frame rather than a disconnect or error."""
+    if listener.cancelled() or listener.exception() is not None:
+        return False
+    return listener.result()["type"] != "websocket.disconnect"
+
+
 @app.websocket(SETTINGS.websocket_path)
 async def websocket_endpoint(websocket: WebSocket):
-    global chat_manager
     await websocket.accept()
     metrics.ACTIVE_CONNECTIONS.inc()
 
@@ -110,10 +352,17 @@ async def websocket_endpoint(websocket: WebSocket):
     # visitor's turns can never leak into another visitor's prompt.
     chat = Chat(SETTINGS.chat_size)
     client_key = _client_key(websocket)
+    # Pending receive. Kept across iterations so the socket can be watched for
+    # a disconnect while an answer streams (see _stream_answer).
+    listener: asyncio.Task | None = None
 
     try:
         while True:
-            data = await websocket.receive_text()
+            if listener is None:
+                listener = asyncio.create_task(websocket.receive())
+            message = await listener
+            listener = None
+            data = _frame_text(message)
 
             # A malformed frame must not kill the session — reply and continue.
             try:
@@ -153,57 +402,46 @@ async def websocket_endpoint(websocket: WebSocket):
                 )
                 continue
 
-            # If the client asked for a different provider, swap the singleton
-            # under a lock so concurrent clients can't tear it down mid-query.
-            if (
-                requested_provider
-                and requested_provider.lower() != chat_manager.model_manager.model_provider
+            if chat_manager is None:
+                await websocket.send_text(
+                    json.dumps({"error": "I'm still starting up. Please try again in a minute."})
+                )
+                continue
+
+            # The provider is chosen per request and its client is reused once
+            # built, so visitors on different providers are served side by side.
+            # The first request for a provider builds its client (SDK import
+            # included), so the check runs off the event loop.
+            provider = requested_provider.lower() if requested_provider else None
+            if provider and not await asyncio.to_thread(
+                chat_manager.model_manager.has_provider, provider
             ):
-                new_provider = requested_provider.lower()
-                swap_error: str | None = None
-                with _chat_manager_lock:
-                    if new_provider != chat_manager.model_manager.model_provider:
-                        logger.info(
-                            f"Switching model provider from "
-                            f"{chat_manager.model_manager.model_provider} to {new_provider}"
-                        )
-                        old = chat_manager
-                        try:
-                            chat_manager = _build_chat_manager(new_provider)
-                        except RuntimeError as e:
-                            # Keep `old` live so other clients aren't broken.
-                            swap_error = str(e)
-                        else:
-                            old.cleanup()
-                if swap_error:
-                    logger.error(f"Provider swap failed: {swap_error}")
-                    await websocket.send_text(
-                        json.dumps({"error": "Couldn't switch model. Please try again."})
-                    )
-                    continue
+                logger.warning(f"Requested unavailable model provider {provider}")
+                await websocket.send_text(
+                    json.dumps({"error": "Couldn't switch model. Please try again."})
+                )
+                continue
 
-            try:
-                async for chunk in chat_manager.query(
+            listener = asyncio.create_task(websocket.receive())
+            await _stream_answer(
+                websocket,
+                chat_manager.query(
                     question=question,
                     chat=chat,
                     query_transformation=query_transformation,
                     choice_of_vector_store=vector_store,
-                ):
-                    await websocket.send_text(json.dumps({"type": "chunk", "content": chunk}))
-
-                await websocket.send_text(json.dumps({"type": "complete"}))
-
-            except Exception as e:
-                logger.error(f"Error processing query: {e}", exc_info=True)
-                await websocket.send_text(
-                    json.dumps({"error": "Sorry, something went wrong. Please try again."})
-                )
+                    model_provider=provider,
+                ),
+                listener,
+            )
 
     except WebSocketDisconnect:
         logger.info("WebSocket client disconnected")
     except Exception as e:
         logger.error(f"WebSocket error: {e}", exc_info=True)
     finally:
+        if listener is not None:
+            listener.cancel()
         metrics.ACTIVE_CONNECTIONS.dec()
         # Already closed, or hit the uvicorn/websockets legacy-protocol mismatch
         # on disconnect (uvicorn calls a method removed in websockets >= 14).
@@ -213,9 +451,25 @@ async def websocket_endpoint(websocket: WebSocket):
 
 # --- entrypoint -------------------------------------------------------------
 
-if __name__ == "__main__":
+
+def serve(**config: Any) -> None:
+    """Run the app under uvicorn (``config`` as for ``uvicorn.Config``).
+
+    Exits with STARTUP_FAILURE_EXIT_CODE once uvicorn has shut down, if the
+    background startup failed.
+    """
+    global _server
     import uvicorn
 
+    config.setdefault("host", SETTINGS.host)
+    config.setdefault("port", SETTINGS.port)
+    _server = uvicorn.Server(uvicorn.Config(app, **config))
+    _server.run()
+    if _startup_failed:
+        sys.exit(STARTUP_FAILURE_EXIT_CODE)
+
+
+if __name__ == "__main__":
     # Probe the certs early so we fail fast with a clear message.
     ctx = ssl.SSLContext(ssl.PROTOCOL_TLS_SERVER)
     try:
@@ -224,10 +478,4 @@ if __name__ == "__main__":
         logger.error(f"Failed to load SSL certificates: {e}")
         raise
 
-    uvicorn.run(
-        app,
-        host=SETTINGS.host,
-        port=SETTINGS.port,
-        ssl_keyfile=SETTINGS.ssl_key_path,
-        ssl_certfile=SETTINGS.ssl_cert_path,
-    )
+    serve(ssl_keyfile=SETTINGS.ssl_key_path, ssl_certfile=SETTINGS.ssl_cert_path)
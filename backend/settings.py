@@ -12,9 +12,29 @@ Optional env vars (override the defaults below):
   - OPENAI_API_KEY        — only required if DEFAULT_MODEL_PROVIDER=openai or a
                             client requests model_provider=openai at runtime
   - OPENAI_MODEL          — defaults to "gpt-4o-mini" when openai is selected
-  - REDIS_URL, DEFAULT_MODEL_PROVIDER, ALLOWED_ORIGINS (comma-separated),
+  - REDIS_URL, SEMANTIC_CACHE_THRESHOLD, LOCAL_CACHE_SIZE,
+    LOCAL_CACHE_TTL_SECONDS, CACHE_FAILURE_THRESHOLD,
+    CACHE_PROBE_INTERVAL_SECONDS, CACHE_SOCKET_TIMEOUT_SECONDS,
+    RETRIEVAL_CACHE_SIZE, RETRIEVAL_CACHE_TTL_SECONDS, HYDE_BUDGET_SECONDS, HYDE_CACHE_SIZE,
+    HYDE_CACHE_TTL_SECONDS, THREAD_POOL_SIZE, LLM_QUEUE_DEPTH,
+    KG_EXTRACTION_BATCH_SIZE, KG_EXTRACTION_CONCURRENCY,
+    KG_EXTRACTION_REQUESTS_PER_MINUTE,
+    DEFAULT_MODEL_PROVIDER, ALLOWED_ORIGINS (comma-separated),
   - HOST, PORT, WEBSOCKET_PATH, PDF_DIRECTORY,
-  - SSL_CERT_PATH, SSL_KEY_PATH, SSL_CA_PATH.
+  - STARTUP_MODE          — background (default) | blocking,
+  - KG_RETRIEVAL_MODE     — llm (default) | entity (no LLM call in KG retrieval),
+  - VECTOR_RETRIEVER      — chroma (default) | numpy (in-memory brute force),
+    NUMPY_RETRIEVER_DTYPE (float32 | float16),
+  - EMBEDDING_CACHE_PATH (set empty to disable), EMBEDDING_CACHE_SIZE,
+    EMBEDDING_CACHE_MAX_ROWS (0 = unbounded),
+  - EMBEDDING_BACKEND (torch | onnx | onnx-int8), EMBEDDING_ONNX_DIR,
+    EMBEDDING_ONNX_QUANTIZATION,
+  - QUERY_EMBEDDING_BATCH_SIZE (1 disables batching),
+    QUERY_EMBEDDING_BATCH_WINDOW_SECONDS,
+  - SSL_CERT_PATH, SSL_KEY_PATH, SSL_CA_PATH,
+  - ANSWER_WARMING_TOP_N, ANSWER_WARMING_REQUESTS_PER_MINUTE,
+  - ADMIN_TOKEN           — enables POST /admin/reload (blue/green index reload)
+                            and POST /admin/warm (answer warming).
 """
 
 from __future__ import annotations
@@ -51,10 +71,44 @@ class PropertyGraphSettings:
     chunk_size: int = 800
     chunk_overlap: int = 100
     embedding_model: str = "BAAI/bge-base-en-v1.5"
+    # Content-addressed embedding cache (float32 in SQLite + an in-memory LRU
+    # of embedding_cache_size vectors) shared by index builds and queries.
+    # Kept outside storage_dir so it never perturbs the index fingerprint and
+    # survives index reloads. None disables it. Every new question adds a
+    # query vector, so the file is capped at embedding_cache_max_rows, least
+    # recently used first (50k bge-base vectors is ~150 MB; 0 = unbounded).
+    embedding_cache_path: str | None = "./embedding_cache/embeddings.sqlite3"
+    embedding_cache_size: int = 4096
+    embedding_cache_max_rows: int = 50_000
+    # torch (default), onnx, or onnx-int8 via ONNX Runtime; see
+    # chat/embedding_backend.py. Switching backend does not re-embed chunks
+    # already indexed; benchmarks/embedding_backends.py measures the drift.
+    # The int8 export is written once under embedding_onnx_dir, which shares
+    # the embedding cache volume so it survives container rebuilds.
+    embedding_backend: str = "torch"
+    embedding_onnx_dir: str = "./embedding_cache/onnx"
+    embedding_onnx_quantization: str = "avx2"  # arm64 | avx2 | avx512 | avx512_vnni
+    # Concurrent query embeddings are run as one forward pass: the first query
+    # waits up to the window for others, up to the batch size; see
+    # chat/embedding_batcher.py. Tune with the inpersona_query_embedding_*
+    # histograms. batch size 1 embeds every query on its own thread.
+    query_embedding_batch_size: int = 16
+    query_embedding_batch_window_seconds: float = 0.005
     # top_k=4 — small KB; enough coverage without bloating the prompt. Higher
     # values (6+) measurably raise time-to-first-token by enlarging the context
     # the LLM must prefill before it can start streaming.
     similarity_top_k: int = 4
+    # How KG mode finds graph entities (chat/kg_retrieval.py). "llm" is
+    # LlamaIndex's default: an LLM call expands the question into keywords
+    # before the answer call. "entity" matches entity names from an in-memory
+    # alias index plus entity embeddings instead, with no LLM call.
+    kg_retrieval_mode: str = "llm"  # "llm" | "entity"
+    # How vector mode searches chunk embeddings. "chroma" queries the HNSW
+    # index; "numpy" loads every chunk embedding into one in-memory matrix at
+    # startup and scores them all per query (exact, and faster for a corpus
+    # this small; see chat/numpy_retriever.py). float16 halves its memory.
+    vector_retriever: str = "chroma"  # "chroma" | "numpy"
+    numpy_retriever_dtype: str = "float32"  # "float32" | "float16"
 
     # --- LLM providers ------------------------------------------------------
     default_model_provider: str = "groq"  # "groq" | "gemini" | "openai"
@@ -70,11 +124,48 @@ class PropertyGraphSettings:
 
     # --- chat state ---------------------------------------------------------
     chat_size: int = 10
-    thread_pool_size: int = field(default_factory=lambda: os.cpu_count() or 4)
 
     # --- cache --------------------------------------------------------------
     redis_url: str = "redis://localhost:6379"
     cache_size: int = 6
+    # Cosine similarity (symmetric bge text embeddings) above which a
+    # paraphrased question is served the cached answer of its nearest cached
+    # neighbour. Questions that differ only in an entity score high too, so
+    # keep it above their scores; benchmarks/semantic_cache.py measures both
+    # on a labelled set. Set to 1.0 to effectively restrict the cache to exact
+    # (normalized) matches.
+    semantic_cache_threshold: float = 0.95
+    # Per-process L1 in front of Redis: hot answers are served from memory.
+    # The TTL bounds staleness if a Redis invalidation message is missed.
+    local_cache_size: int = 256
+    local_cache_ttl_seconds: float = 300.0
+    # Per-process cache of retrieved nodes, keyed on the normalized question,
+    # engine, HyDE and index fingerprint (not provider or history), so asking
+    # again in another conversation or with another model skips straight to
+    # synthesis. A reload starts an empty one. 0 = disabled.
+    retrieval_cache_size: int = 512
+    retrieval_cache_ttl_seconds: float = 3600.0
+    # HyDE mode: plain retrieval runs while the hypothetical document is
+    # generated; the HyDE candidates are merged in only if the document is
+    # ready within the budget (0 = never wait, HyDE only fills its cache).
+    # Documents are cached per normalized question.
+    hyde_budget_seconds: float = 2.0
+    hyde_cache_size: int = 256
+    hyde_cache_ttl_seconds: float = 86400.0
+    # Cache circuit breaker: after this many consecutive Redis errors the cache
+    # is bypassed (no I/O on the query path) and probed in the background every
+    # cache_probe_interval_seconds. The socket timeout caps a slow Redis call
+    # before the breaker trips.
+    cache_failure_threshold: int = 3
+    cache_probe_interval_seconds: float = 5.0
+    cache_socket_timeout_seconds: float = 0.25
+    # Answer warming (chat/answer_warming.py): after startup, a reload, or
+    # POST /admin/warm, re-answer this many of the most-asked questions into
+    # the cache, one LLM call at a time at most this often. Capped at
+    # cache_size (warming more would evict its own answers). 0 = no automatic
+    # warming.
+    answer_warming_top_n: int = 6
+    answer_warming_requests_per_minute: int = 6
 
     # --- abuse / limits -----------------------------------------------------
     # Reject questions longer than this (cost amplification + Redis key bloat).
@@ -91,11 +182,36 @@ class PropertyGraphSettings:
     # Retry transient LLM failures (429 / 5xx / "overloaded") this many times
     # with exponential backoff before surfacing an error.
     llm_max_retries: int = 4
+    # Pool threads mostly wait on the provider (blocking streams, retrieval),
+    # so the pool is sized for concurrent upstream requests, not CPU cores.
+    # thread_pool_size + llm_queue_depth answers are admitted at once: a
+    # thread-path answer runs or waits for a thread, an async-streamed one
+    # streams on the event loop but holds its slot until it ends. Beyond that,
+    # new questions get an immediate "busy" reply instead of queueing into a
+    # timeout.
+    thread_pool_size: int = 8
+    llm_queue_depth: int = 32
+    # KG triplet extraction during an index build: chunks packed per LLM
+    # prompt, concurrent prompts, and a cap on prompts started per minute
+    # (Groq's free tier allows ~30 req/min; 0 = unpaced).
+    kg_extraction_batch_size: int = 4
+    kg_extraction_concurrency: int = 4
+    kg_extraction_requests_per_minute: int = 30
+
+    # --- admin ----------------------------------------------------------------
+    # Bearer token for the /admin endpoints (index reload). Unset disables them.
+    admin_token: str | None = None
 
     # --- HTTP / WebSocket server -------------------------------------------
     host: str = "0.0.0.0"
     port: int = 8000
     websocket_path: str = "/chat"
+    # "background": serve /health at once and build the RAG stack behind it,
+    # with /ready reporting progress (503 until warm). "blocking": finish the
+    # build before accepting connections. A failed build exits with status 3
+    # in either mode when started through server.serve() (as the Dockerfile
+    # does); a bare `uvicorn server:app` ends by SIGTERM instead.
+    startup_mode: str = "background"
     allowed_origins: list[str] = field(default_factory=lambda: ["*"])
 
     # --- SSL (used by the __main__ entrypoint in server.py) ----------------
@@ -130,21 +246,46 @@ class PropertyGraphSettings:
                 overrides[attr] = int(value)
 
         _str("PDF_DIRECTORY", "pdf_directory")
+        _str("EMBEDDING_CACHE_PATH", "embedding_cache_path")
+        if os.getenv("EMBEDDING_CACHE_PATH") == "":
+            overrides["embedding_cache_path"] = None  # set but empty: cache disabled
+        _str("EMBEDDING_BACKEND", "embedding_backend")
+        _str("EMBEDDING_ONNX_DIR", "embedding_onnx_dir")
+        _str("EMBEDDING_ONNX_QUANTIZATION", "embedding_onnx_quantization")
         _str("PROMPT_PATH", "prompt_path")
         _str("REDIS_URL", "redis_url")
         _str("DEFAULT_MODEL_PROVIDER", "default_model_provider")
         _str("HOST", "host")
         _int("PORT", "port")
         _str("WEBSOCKET_PATH", "websocket_path")
+        _str("STARTUP_MODE", "startup_mode")
+        _str("KG_RETRIEVAL_MODE", "kg_retrieval_mode")
+        _str("VECTOR_RETRIEVER", "vector_retriever")
+        _str("NUMPY_RETRIEVER_DTYPE", "numpy_retriever_dtype")
         _str("SSL_CERT_PATH", "ssl_cert_path")
         _str("SSL_KEY_PATH", "ssl_key_path")
         _str("SSL_CA_PATH", "ssl_ca_path")
         _str("OPENAI_API_KEY", "openai_api_key")
         _str("OPENAI_MODEL", "openai_model")
+        _str("ADMIN_TOKEN", "admin_token")
         _int("MAX_QUESTION_CHARS", "max_question_chars")
         _int("RATE_LIMIT_PER_MINUTE", "rate_limit_per_minute")
         _int("RATE_LIMIT_BURST", "rate_limit_burst")
         _int("LLM_MAX_RETRIES", "llm_max_retries")
+        _int("CACHE_FAILURE_THRESHOLD", "cache_failure_threshold")
+        _int("THREAD_POOL_SIZE", "thread_pool_size")
+        _int("LLM_QUEUE_DEPTH", "llm_queue_depth")
+        _int("KG_EXTRACTION_BATCH_SIZE", "kg_extraction_batch_size")
+        _int("KG_EXTRACTION_CONCURRENCY", "kg_extraction_concurrency")
+        _int("KG_EXTRACTION_REQUESTS_PER_MINUTE", "kg_extraction_requests_per_minute")
+        _int("LOCAL_CACHE_SIZE", "local_cache_size")
+        _int("RETRIEVAL_CACHE_SIZE", "retrieval_cache_size")
+        _int("HYDE_CACHE_SIZE", "hyde_cache_size")
+        _int("ANSWER_WARMING_TOP_N", "answer_warming_top_n")
+        _int("ANSWER_WARMING_REQUESTS_PER_MINUTE", "answer_warming_requests_per_minute")
+        _int("EMBEDDING_CACHE_SIZE", "embedding_cache_size")
+        _int("EMBEDDING_CACHE_MAX_ROWS", "embedding_cache_max_rows")
+        _int("QUERY_EMBEDDING_BATCH_SIZE", "query_embedding_batch_size")
 
         def _float(env: str, attr: str) -> None:
             value = os.getenv(env)
@@ -152,6 +293,14 @@ class PropertyGraphSettings:
                 overrides[attr] = float(value)
 
         _float("QUERY_TIMEOUT_SECONDS", "query_timeout_seconds")
+        _float("SEMANTIC_CACHE_THRESHOLD", "semantic_cache_threshold")
+        _float("LOCAL_CACHE_TTL_SECONDS", "local_cache_ttl_seconds")
+        _float("CACHE_PROBE_INTERVAL_SECONDS", "cache_probe_interval_seconds")
+        _float("CACHE_SOCKET_TIMEOUT_SECONDS", "cache_socket_timeout_seconds")
+        _float("RETRIEVAL_CACHE_TTL_SECONDS", "retrieval_cache_ttl_seconds")
+        _float("HYDE_BUDGET_SECONDS", "hyde_budget_seconds")
+        _float("HYDE_CACHE_TTL_SECONDS", "hyde_cache_ttl_seconds")
+        _float("QUERY_EMBEDDING_BATCH_WINDOW_SECONDS", "query_embedding_batch_window_seconds")
 
         origins_raw = os.getenv("ALLOWED_ORIGINS")
         if origins_raw:
@@ -0,0 +1,132 @@
+"""Answer warming: top questions re-answered into the cache, paced and deduped."""
+
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+from chat import answer_warming
+from chat.answer_warming import plan_warmup, warm_answers
+
+
+class FakeCache:
+    def __init__(self, entries, cached=(), warm_set=(), max_cached_items=6):
+        self.entries = list(entries)
+        self.cached = set(cached)
+        self.warm_set = list(warm_set)
+        self.max_cached_items = max_cached_items
+
+    def is_available(self):
+        return True
+
+    def get_top_entries(self, count=None):
+        return self.entries[:count]
+
+    def save_warm_set(self, entries):
+        self.warm_set = list(entries)
+
+    def get_warm_set(self):
+        return self.warm_set
+
+    def has_response(self, question, namespace):
+        return (namespace, question) in self.cached
+
+
+class FakeChatManager:
+    """Answers by caching under the current namespace, like QueryEngine does."""
+
+    def __init__(self, cache, providers=("groq",), failing=()):
+        self.cache_manager = cache
+        self.model_manager = SimpleNamespace(has_provider=lambda p: p in providers)
+        self.query_engine = SimpleNamespace(cache_namespace=self.namespace)
+        self.settings = SimpleNamespace(chat_size=10)
+        self.failing = set(failing)
+        self.asked = []
+
+    @staticmethod
+    def namespace(transformation, vector_store, provider=None):
+        engine = "kg" if vector_store == "KG" else "vector"
+        return f"{engine}:{'hyde' if transformation else 'none'}:{provider or 'groq'}:new"
+
+    async def query(
+        self, question, chat, query_transformation, choice_of_vector_store, model_provider
+    ):
+        self.asked.append((question, choice_of_vector_store, query_transformation, model_provider))
+        yield "answer"
+        if question not in self.failing:
+            namespace = self.namespace(query_transformation, choice_of_vector_store, model_provider)
+            self.cache_manager.cached.add((namespace, question))
+
+
+@pytest.fixture
+def sleeps(monkeypatch):
+    delays = []
+    real_sleep = asyncio.sleep
+
+    async def sleep(delay, *args, **kwargs):
+        delays.append(delay)
+        await real_sleep(0)
+
+    monkeypatch.setattr(answer_warming.asyncio, "sleep", sleep)
+    return delays
+
+
+def test_plan_sums_counts_across_fingerprints_and_keeps_engine_choice():
+    entries = [
+        ("kg:none:groq:old", "where did you study?", 3),
+        ("vector:hyde:gemini:old", "what do you build?", 4),
+        ("kg:none:groq:new", "where did you study?", 2),
+        ("default", "legacy entry", 50),  # not a QueryEngine namespace
+    ]
+    assert plan_warmup(entries, 5) == [
+        ("where did you study?", "KG", None, "groq"),
+        ("what do you build?", "vector", "HyDE", "gemini"),
+    ]
+
+
+async def test_warms_missing_answers_and_skips_cached_ones(sleeps):
+    cache = FakeCache(
+        [
+            ("kg:none:groq:old", "q1", 9),
+            ("kg:none:groq:old", "q2", 5),
+            ("kg:none:gemini:old", "q3", 4),  # provider not configured here
+            ("kg:none:groq:old", "q4", 3),
+        ],
+        cached={("kg:none:groq:new", "q2")},
+    )
+    manager = FakeChatManager(cache, failing={"q4"})
+
+    counts = await warm_answers(manager, top_n=6, requests_per_minute=60)
+
+    assert counts == {"warmed": 1, "cached": 1, "failed": 1, "skipped": 1}
+    assert [q for q, *_ in manager.asked] == ["q1", "q4"]
+    assert ("kg:none:groq:new", "q1") in cache.cached
+    # One LLM call per second at 60/min: the second call waited ~1s.
+    assert [pytest.approx(d, abs=0.1) for d in sleeps if d > 0] == [1.0]
+
+
+async def test_falls_back_to_last_warm_set_after_a_flush():
+    first = FakeCache([("vector:none:groq:old", "q1", 3)])
+    await warm_answers(FakeChatManager(first), top_n=6, requests_per_minute=0)
+
+    flushed = FakeCache([], warm_set=first.warm_set)
+    manager = FakeChatManager(flushed)
+    counts = await warm_answers(manager, top_n=6, requests_per_minute=0)
+
+    assert counts["warmed"] == 1
+    assert manager.asked == [("q1", "vector", None, "groq")]
+
+
+async def test_never_warms_more_than_the_cache_holds():
+    cache = FakeCache([("kg:none:groq:f", f"q{i}", 10 - i) for i in range(10)], max_cached_items=3)
+    manager = FakeChatManager(cache)
+
+    await warm_answers(manager, top_n=8, requests_per_minute=0)
+
+    assert [q for q, *_ in manager.asked] == ["q0", "q1", "q2"]
+
+
+async def test_nothing_to_do_without_a_cache():
+    manager = FakeChatManager(None)
+    counts = await warm_answers(manager, top_n=6, requests_per_minute=0)
+    assert counts == {"warmed": 0, "cached": 0, "failed": 0, "skipped": 0}
@@ -0,0 +1,591 @@
+"""CacheManager: L1 + exact + semantic tiers, namespaces + generations,
+eviction, invalidation and the circuit breaker.
+
+Redis is replaced with a small in-memory fake that implements just the
+commands CacheManager issues, so no server is needed.
+"""
+
+import threading
+import time
+
+import numpy as np
+import pytest
+import redis
+
+from chat import CacheManager as cache_module
+from chat.CacheManager import CacheManager
+
+# --- fakes ------------------------------------------------------------------
+
+
+class FakeRedis:
+    def __init__(self):
+        self.kv = {}
+        self.zsets = {}
+        self.hashes = {}
+        self.subscribers = {}
+        self.commands = []
+        self.round_trips = 0
+        self.transactions = []
+        self.down = False
+
+    def _log(self, name, pipelined=False):
+        self.commands.append(name)
+        if not pipelined:
+            self.round_trips += 1
+        if self.down:
+            raise redis.ConnectionError("Connection refused")
+
+    def pipeline(self, transaction=True):
+        self.transactions.append(transaction)
+        return FakePipeline(self)
+
+    def ping(self):
+        self._log("ping")
+        return True
+
+    def get(self, key):
+        self._log("get")
+        return self.kv.get(key)
+
+    def set(self, key, value):
+        self._log("set")
+        self.kv[key] = value.encode("utf-8") if isinstance(value, str) else value
+
+    def delete(self, *keys):
+        self._log("delete")
+        for key in keys:
+            self.kv.pop(key, None)
+            self.zsets.pop(key, None)
+            self.hashes.pop(key, None)
+
+    def zincrby(self, name, amount, member):
+        self._log("zincrby")
+        member = member.encode("utf-8") if isinstance(member, str) else member
+        zset = self.zsets.setdefault(name, {})
+        zset[member] = zset.get(member, 0) + amount
+
+    def zrange(self, name, start, end, desc=False, withscores=False):
+        self._log("zrange")
+        items = sorted(self.zsets.get(name, {}).items(), key=lambda kv: (kv[1], kv[0]))
+        if desc:
+            items.reverse()
+        end = len(items) if end == -1 else end + 1
+        items = items[start:end]
+        return items if withscores else [m for m, _ in items]
+
+    def exists(self, key):
+        self._log("exists")
+        return int(key in self.kv)
+
+    def getset(self, key, value):
+        self._log("getset")
+        previous = self.kv.get(key)
+        self.kv[key] = value.encode("utf-8")
+        return previous
+
+    def incr(self, key):
+        self._log("incr")
+        value = int(self.kv.get(key, 0)) + 1
+        self.kv[key] = str(value).encode("utf-8")
+        return value
+
+    def zcard(self, name):
+        self._log("zcard")
+        return len(self.zsets.get(name, {}))
+
+    def zadd(self, name, mapping, xx=False, incr=False):
+        self._log("zadd")
+        zset = self.zsets.setdefault(name, {})
+        for member, score in mapping.items():
+            member = member.encode("utf-8") if isinstance(member, str) else member
+            if xx and member not in zset:
+                continue
+            zset[member] = zset.get(member, 0) + score if incr else score
+
+    def zrem(self, name, *members):
+        self._log("zrem")
+        zset = self.zsets.get(name, {})
+        for m in members:
+            zset.pop(m.encode("utf-8") if isinstance(m, str) else m, None)
+
+    def hset(self, name, key, value):
+        self._log("hset")
+        self.hashes.setdefault(name, {})[key.encode("utf-8")] = value
+
+    def hgetall(self, name):
+        self._log("hgetall")
+        return dict(self.hashes.get(name, {}))
+
+    def hdel(self, name, *keys):
+        self._log("hdel")
+        h = self.hashes.get(name, {})
+        for k in keys:
+            h.pop(k.encode("utf-8") if isinstance(k, str) else k, None)
+
+    def publish(self, channel, data):
+        self._log("publish")
+        for handler in self.subscribers.get(channel, []):
+            handler({"type": "message", "channel": channel, "data": data})
+
+    def pubsub(self, **_kwargs):
+        return FakePubSub(self)
+
+
+class FakePipeline:
+    """Queues commands and replays them against the fake in one round trip."""
+
+    def __init__(self, redis):
+        self.redis = redis
+        self.queued = []
+
+    def __getattr__(self, name):
+        def queue(*args, **kwargs):
+            self.queued.append((name, args, kwargs))
+            return self
+
+        return queue
+
+    def execute(self):
+        self.redis.round_trips += 1
+        log = self.redis._log
+        self.redis._log = lambda name: log(name, pipelined=True)
+        try:
+            return [getattr(self.redis, n)(*a, **kw) for n, a, kw in self.queued]
+        finally:
+            del self.redis._log
+
+
+class FakePubSub:
+    def __init__(self, redis):
+        self.redis = redis
+
+    def subscribe(self, **handlers):
+        for channel, handler in handlers.items():
+            self.redis.subscribers.setdefault(channel, []).append(handler)
+
+    def run_in_thread(self, **_kwargs):
+        return self
+
+    def stop(self):
+        pass
+
+    def close(self):
+        pass
+
+
+# Known phrasings onto fixed (text-embedding) vectors; paraphrases share a
+# direction, and questions differing only in the entity sit close but apart.
+VECTORS = {
+    "what does yatharth do at moss?": [1.0, 0.0, 0.0, 0.0],
+    "what's yatharth's role at moss": [0.98, 0.2, 0.0, 0.0],
+    "where did you study?": [0.0, 1.0, 0.0, 0.0],
+    "did yatharth work at moss?": [0.0, 0.0, 1.0, 0.0],
+    "did yatharth work at google?": [0.0, 0.0, 0.93, 0.37],
+}
+
+
+class FakeEmbedModel:
+    model_name = "fake-embed"
+
+    def __init__(self):
+        self.calls = 0
+
+    def get_text_embedding(self, text):
+        self.calls += 1
+        return VECTORS.get(text.lower().strip(), [0.0, 0.0, 0.0, 1.0])
+
+    def get_query_embedding(self, text):
+        raise AssertionError("questions are compared by symmetric text embeddings")
+
+
+@pytest.fixture
+def fake_redis(monkeypatch):
+    fake = FakeRedis()
+    monkeypatch.setattr(cache_module.redis, "from_url", lambda _url, **_kw: fake)
+    return fake
+
+
+def make_cache(max_items=6, embed=True, **kwargs):
+    cache = CacheManager(max_cached_items=max_items, **kwargs)
+    if embed:
+        cache.attach_embed_model(FakeEmbedModel())
+    return cache
+
+
+# --- tests ------------------------------------------------------------------
+
+
+def test_exact_hit_is_case_and_whitespace_insensitive(fake_redis):
+    cache = make_cache(embed=False)
+    cache.cache_response("Where did you study?", "<p>IU Bloomington.</p>")
+
+    assert cache.get_cached_response("  where did YOU study?  ") == "<p>IU Bloomington.</p>"
+
+
+def test_semantic_hit_serves_paraphrase(fake_redis):
+    cache = make_cache()
+    cache.cache_response("What does Yatharth do at Moss?", "<p>Founding engineer.</p>")
+
+    assert cache.get_cached_response("what's yatharth's role at moss") == (
+        "<p>Founding engineer.</p>"
+    )
+
+
+def test_semantic_miss_below_threshold(fake_redis):
+    cache = make_cache()
+    cache.cache_response("What does Yatharth do at Moss?", "<p>Founding engineer.</p>")
+
+    assert cache.get_cached_response("Where did you study?") is None
+
+
+def test_semantic_near_miss_with_another_entity_is_not_served(fake_redis):
+    cache = make_cache()  # default threshold
+    cache.cache_response("Did Yatharth work at Moss?", "<p>Yes.</p>")
+
+    assert cache.get_cached_response("did yatharth work at google?") is None
+
+
+def test_semantic_tier_disabled_without_embed_model(fake_redis):
+    cache = make_cache(embed=False)
+    cache.cache_response("What does Yatharth do at Moss?", "<p>Founding engineer.</p>")
+
+    assert cache.get_cached_response("what's yatharth's role at moss") is None
+
+
+def test_semantic_index_rehydrates_from_redis(fake_redis):
+    make_cache().cache_response("What does Yatharth do at Moss?", "<p>Founding engineer.</p>")
+
+    restarted = make_cache()
+
+    assert restarted.get_cached_response("what's yatharth's role at moss") == (
+        "<p>Founding engineer.</p>"
+    )
+
+
+def test_prune_evicts_least_frequent_from_both_tiers(fake_redis):
+    cache = make_cache(max_items=1)
+    cache.cache_response("Where did you study?", "<p>IU.</p>")
+    cache.get_cached_response("Where did you study?")  # bump its frequency
+    cache.cache_response("What does Yatharth do at Moss?", "<p>Founding engineer.</p>")
+
+    assert cache.get_cached_response("Where did you study?") == "<p>IU.</p>"
+    assert cache.get_cached_response("what's yatharth's role at moss") is None
+    assert sum(len(i) for i in cache._semantic_indexes.values()) == 1
+
+
+def test_clear_cache_drops_everything(fake_redis):
+    cache = make_cache()
+    cache.cache_response("What does Yatharth do at Moss?", "<p>Founding engineer.</p>")
+
+    assert cache.clear_cache() is True
+    assert cache.get_cached_response("What does Yatharth do at Moss?") is None
+    assert cache.get_cached_response("what's yatharth's role at moss") is None
+
+
+def test_local_hit_makes_no_redis_calls(fake_redis):
+    cache = make_cache(embed=False)
+    cache.cache_response("Where did you study?", "<p>IU.</p>")
+    fake_redis.commands.clear()
+
+    assert cache.get_local_response("where did you study?") == "<p>IU.</p>"
+    assert fake_redis.commands == []
+
+
+def test_local_hits_are_folded_into_frequency(fake_redis):
+    cache = make_cache(max_items=1, embed=False)
+    cache.cache_response("Where did you study?", "<p>IU.</p>")
+    for _ in range(3):
+        cache.get_local_response("Where did you study?")
+    # The write flushes the L1 hit counts, so the hot question outranks the
+    # new one and survives pruning even though Redis never saw its reads.
+    cache.cache_response("What does Yatharth do at Moss?", "<p>Founding engineer.</p>")
+
+    assert cache.get_top_questions() == [("where did you study?", 4)]
+
+
+def test_clear_drops_pending_local_hits(fake_redis):
+    cache = make_cache(embed=False)
+    cache.cache_response("Where did you study?", "<p>IU.</p>")
+    for _ in range(3):
+        cache.get_local_response("Where did you study?")
+
+    cache.clear_cache()
+    cache.cache_response("Where did you study?", "<p>IU.</p>")
+
+    assert cache.get_top_questions() == [("where did you study?", 1)]
+
+
+def test_top_entries_keep_namespaces_and_warm_set_survives_a_clear(fake_redis):
+    cache = make_cache(embed=False)
+    cache.cache_response("Where did you study?", "<p>IU.</p>", namespace="kg:none:groq:a")
+    cache.cache_response("Where did you study?", "<p>IU.</p>", namespace="kg:none:groq:a")
+    cache.cache_response("Hobbies?", "<p>Climbing.</p>", namespace="vector:hyde:groq:a")
+
+    entries = cache.get_top_entries()
+    assert entries == [
+        ("kg:none:groq:a", "where did you study?", 2),
+        ("vector:hyde:groq:a", "hobbies?", 1),
+    ]
+    assert cache.get_top_entries(1) == entries[:1]
+    assert cache.has_response("where did you study?", "kg:none:groq:a")
+    assert not cache.has_response("where did you study?", "vector:hyde:groq:a")
+
+    cache.save_warm_set(entries)
+    cache.clear_cache()
+    assert cache.get_top_entries() == []
+    assert cache.get_warm_set() == entries
+
+
+def test_eviction_invalidates_other_processes_l1(fake_redis):
+    writer = make_cache(embed=False)
+    reader = make_cache(embed=False)
+    writer.cache_response("Where did you study?", "<p>IU.</p>")
+    assert reader.get_cached_response("Where did you study?") == "<p>IU.</p>"  # now in L1
+
+    writer.max_cached_items = 0  # shrink so the next prune evicts everything
+    writer._prune_cache()
+
+    assert reader.get_local_response("Where did you study?") is None
+
+
+def test_clear_invalidates_other_processes_l1(fake_redis):
+    writer = make_cache(embed=False)
+    reader = make_cache(embed=False)
+    writer.cache_response("Where did you study?", "<p>IU.</p>")
+    reader.get_cached_response("Where did you study?")
+
+    writer.clear_cache()
+
+    assert reader.get_local_response("Where did you study?") is None
+
+
+def test_commands_do_not_ping(fake_redis):
+    cache = make_cache()
+    fake_redis.commands.clear()
+
+    cache.cache_response("Where did you study?", "<p>IU.</p>")
+    cache.local_cache.clear()
+    cache.get_cached_response("Where did you study?")
+
+    assert "ping" not in fake_redis.commands
+
+
+def wait_until(predicate, timeout=2.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if predicate():
+            return True
+        time.sleep(0.01)
+    return False
+
+
+def test_breaker_opens_after_failures_and_skips_redis(fake_redis):
+    cache = make_cache(embed=False, failure_threshold=2, probe_interval_seconds=60)
+    fake_redis.down = True
+
+    assert cache.get_cached_response("q1") is None
+    assert cache.is_available() is True
+    assert cache.get_cached_response("q2") is None
+    assert cache.is_available() is False
+
+    fake_redis.commands.clear()
+    assert cache.get_cached_response("q3") is None
+    assert cache.cache_response("q3", "a") is False
+    assert fake_redis.commands == []  # open circuit: no I/O at all
+    cache.close()
+
+
+def test_probe_closes_breaker_once_redis_recovers(fake_redis):
+    cache = make_cache(embed=False, failure_threshold=1, probe_interval_seconds=0.01)
+    cache.cache_response("Where did you study?", "<p>IU.</p>")
+    fake_redis.down = True
+    cache.cache_response("q", "a")
+    assert cache.is_available() is False
+
+    fake_redis.down = False
+
+    assert wait_until(cache.is_available)
+    # L1 is dropped on recovery: invalidations may have been missed meanwhile.
+    assert len(cache.local_cache) == 0
+    cache.close()
+
+
+def test_redis_down_at_startup_attaches_once_it_recovers(fake_redis):
+    fake_redis.down = True
+    cache = make_cache(probe_interval_seconds=0.01)
+    assert cache.is_available() is False
+
+    fake_redis.down = False
+
+    assert wait_until(cache.is_available)
+    assert cache.cache_response("Where did you study?", "<p>IU.</p>") is True
+    cache.close()
+
+
+def test_prune_cost_does_not_grow_with_cache_size(fake_redis):
+    cache = make_cache(max_items=1000, embed=False)
+    for i in range(1000):
+        cache.cache_response(f"question {i}", "a")
+    fake_redis.round_trips = 0
+    fake_redis.commands.clear()
+
+    cache.cache_response("one more", "a")
+
+    # write pipeline + overflow ZRANGE + delete pipeline, regardless of N
+    assert fake_redis.round_trips == 3
+    assert "zrange" in fake_redis.commands
+    assert len(fake_redis.zsets[cache._frequency_key]) == 1000
+
+
+def test_prune_evicts_only_the_overflow_slice(fake_redis):
+    cache = make_cache(max_items=3, embed=False)
+    for i, hits in enumerate([5, 1, 3, 2]):
+        cache.cache_response(f"q{i}", f"a{i}")
+        for _ in range(hits):
+            cache.get_cached_response(f"q{i}")
+        cache.local_cache.clear()
+
+    cache.max_cached_items = 2
+    cache._prune_cache()
+
+    assert [q for q, _ in cache.get_top_questions(10)] == ["q0", "q2"]
+
+
+def test_clear_cache_deletes_in_one_round_trip(fake_redis):
+    cache = make_cache(embed=False)
+    for i in range(5):
+        cache.cache_response(f"question {i}", "a")
+    fake_redis.round_trips = 0
+
+    cache.clear_cache()
+
+    assert fake_redis.round_trips == 2  # ZRANGE for the keys + one pipeline
+    assert fake_redis.kv == {}
+    assert fake_redis.zsets == {}
+
+
+def test_clear_cache_batches_are_not_one_transaction(fake_redis):
+    cache = make_cache(max_items=1, embed=False)
+    cache.cache_response("question 0", "a")
+    cache.cache_response("question 1", "a")  # evicts question 0
+    assert True in fake_redis.transactions  # eviction stays atomic
+    fake_redis.transactions.clear()
+
+    cache.clear_cache()
+
+    assert fake_redis.transactions == [False]
+
+
+def test_namespaces_isolate_answers(fake_redis):
+    cache = make_cache()
+    cache.cache_response("Where did you study?", "<p>KG answer.</p>", namespace="kg:none:groq:abc")
+
+    assert cache.get_cached_response("Where did you study?", "vector:none:groq:abc") is None
+    assert cache.get_cached_response("Where did you study?", "kg:none:gemini:abc") is None
+    assert cache.get_cached_response("Where did you study?", "kg:none:groq:abc") == (
+        "<p>KG answer.</p>"
+    )
+
+
+def test_semantic_index_keys_stay_aligned_under_concurrent_writes():
+    index = cache_module._SemanticIndex()
+    vectors = {f"q{i}": np.eye(32, dtype=np.float32)[i] for i in range(32)}
+    keys = sorted(vectors)
+    errors = []
+    stop = threading.Event()
+
+    def write(keys):
+        try:
+            while not stop.is_set():
+                for key in keys:
+                    index.add(key, vectors[key])
+                index.remove(keys)
+        except Exception as e:
+            errors.append(e)
+
+    writers = [threading.Thread(target=write, args=(keys[i::4],)) for i in range(4)]
+    for t in writers:
+        t.start()
+    try:
+        for _ in range(300):
+            for key, vector in vectors.items():
+                match = index.nearest(vector)
+                # A match scoring 1.0 must be the queried key itself.
+                if match is not None and match[1] > 0.5 and match[0] != key:
+                    errors.append((key, match))
+    finally:
+        stop.set()
+        for t in writers:
+            t.join()
+    assert errors == []
+
+
+def test_semantic_match_stays_inside_namespace(fake_redis):
+    cache = make_cache()
+    cache.cache_response("What does Yatharth do at Moss?", "<p>KG.</p>", namespace="kg")
+
+    assert cache.get_cached_response("what's yatharth's role at moss", "vector") is None
+    assert cache.get_cached_response("what's yatharth's role at moss", "kg") == "<p>KG.</p>"
+
+
+def test_top_questions_sum_across_namespaces(fake_redis):
+    cache = make_cache(embed=False)
+    cache.cache_response("Where did you study?", "a", namespace="kg")
+    cache.cache_response("Where did you study?", "b", namespace="vector")
+    cache.cache_response("What does Yatharth do at Moss?", "c", namespace="kg")
+
+    assert cache.get_top_questions(1) == [("where did you study?", 2)]
+
+
+def test_bump_generation_invalidates_everything_in_o1(fake_redis):
+    cache = make_cache()
+    other = make_cache()
+    cache.cache_response("What does Yatharth do at Moss?", "<p>old</p>")
+    other.get_cached_response("What does Yatharth do at Moss?")  # warm its L1
+    fake_redis.round_trips = 0
+
+    assert cache.bump_generation() is True
+
+    assert fake_redis.round_trips == 2  # INCR + PUBLISH, independent of cache size
+    assert other.generation == cache.generation == 1
+    for c in (cache, other):
+        assert c.get_cached_response("What does Yatharth do at Moss?") is None
+        assert c.get_cached_response("what's yatharth's role at moss") is None
+
+
+def test_generation_survives_restart(fake_redis):
+    make_cache().bump_generation()
+    assert make_cache().generation == 1
+
+
+def test_new_fingerprint_starts_a_fresh_generation(fake_redis):
+    cache = make_cache(max_items=2)
+    assert cache.adopt_fingerprint("fp1") is False  # empty cache: nothing stale
+    for _ in range(3):
+        cache.cache_response("Where did you study?", "a", namespace="vector:none:groq:fp1")
+    cache.cache_response("What does Yatharth do at Moss?", "b", namespace="vector:none:groq:fp1")
+    assert cache.adopt_fingerprint("fp1") is False
+
+    assert cache.adopt_fingerprint("fp2") is True
+
+    # New answers are no longer pruned in favour of the stranded fp1 entries.
+    for question in ("Where did you study?", "What does Yatharth do at Moss?"):
+        cache.cache_response(question, "new", namespace="vector:none:groq:fp2")
+        assert cache.has_response(question, "vector:none:groq:fp2")
+    assert [e[1] for e in cache.get_warm_set()] == [
+        "where did you study?",
+        "what does yatharth do at moss?",
+    ]
+
+
+def test_unreachable_redis_degrades_to_no_cache(monkeypatch):
+    def boom(_url, **_kwargs):
+        raise ConnectionError("redis down")
+
+    monkeypatch.setattr(cache_module.redis, "from_url", boom)
+    cache = CacheManager()
+
+    assert cache.is_available() is False
+    assert cache.get_cached_response("anything") is None
+    assert cache.cache_response("anything", "x") is False
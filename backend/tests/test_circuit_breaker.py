@@ -0,0 +1,61 @@
+"""Circuit breaker: trips on consecutive failures, probes, and recovers."""
+
+import threading
+import time
+
+from chat.circuit_breaker import CircuitBreaker
+
+
+def test_opens_only_after_consecutive_failures():
+    breaker = CircuitBreaker(probe=lambda: False, failure_threshold=3, probe_interval=60)
+
+    breaker.record_failure()
+    breaker.record_failure()
+    breaker.record_success()  # a success resets the streak
+    breaker.record_failure()
+    breaker.record_failure()
+    assert breaker.is_open is False
+
+    breaker.record_failure()
+    assert breaker.is_open is True
+    breaker.stop()
+
+
+def test_probe_closes_breaker_and_fires_callbacks():
+    healthy = threading.Event()
+    closed = threading.Event()
+    opened = []
+    breaker = CircuitBreaker(
+        probe=healthy.is_set,
+        failure_threshold=1,
+        probe_interval=0.01,
+        on_open=lambda: opened.append(True),
+        on_close=closed.set,
+    )
+
+    breaker.record_failure()
+    assert breaker.is_open is True
+    assert opened == [True]
+
+    healthy.set()
+    assert closed.wait(2.0)
+    assert breaker.is_open is False
+
+
+def test_probe_exceptions_count_as_unhealthy():
+    def probe():
+        raise ConnectionError("still down")
+
+    breaker = CircuitBreaker(probe=probe, failure_threshold=1, probe_interval=0.01)
+    breaker.trip()
+    time.sleep(0.05)  # a few probe rounds
+
+    assert breaker.is_open is True
+    breaker.stop()
+
+
+def test_stopped_breaker_never_trips():
+    breaker = CircuitBreaker(probe=lambda: True, failure_threshold=1, probe_interval=60)
+    breaker.stop()
+    breaker.record_failure()
+    assert breaker.is_open is False
@@ -0,0 +1,78 @@
+"""Embedding backend selection: torch default, ONNX/int8 opt-in, torch fallback."""
+
+from types import SimpleNamespace
+
+import pytest
+
+from chat import embedding_backend
+from chat.embedding_backend import cache_model_name, load_embedding_model
+
+BGE = "BAAI/bge-base-en-v1.5"
+
+
+class FakeHF:
+    def __init__(self, **kwargs):
+        if kwargs.get("backend") == "onnx" and FakeHF.onnx_error:
+            raise FakeHF.onnx_error
+        self.kwargs = kwargs
+
+
+@pytest.fixture(autouse=True)
+def fake_hf(monkeypatch):
+    FakeHF.onnx_error = None
+    monkeypatch.setattr(embedding_backend, "HuggingFaceEmbedding", FakeHF)
+
+
+def make_settings(tmp_path, backend):
+    return SimpleNamespace(
+        embedding_model=BGE,
+        embedding_backend=backend,
+        embedding_onnx_dir=str(tmp_path / "onnx"),
+        embedding_onnx_quantization="avx2",
+    )
+
+
+def test_torch_is_the_default_backend(tmp_path):
+    model, backend = load_embedding_model(make_settings(tmp_path, "torch"))
+    assert backend == "torch"
+    assert model.kwargs == {"model_name": BGE}
+
+
+def test_onnx_int8_exports_once_then_reuses_the_export(tmp_path, monkeypatch):
+    exports = []
+
+    def export(model_name, model_dir, quantization):
+        exports.append(model_name)
+        (model_dir / "onnx").mkdir(parents=True)
+        (model_dir / "onnx" / f"model_qint8_{quantization}.onnx").write_bytes(b"")
+
+    monkeypatch.setattr(embedding_backend, "export_quantized_model", export)
+    settings = make_settings(tmp_path, "onnx-int8")
+
+    first, backend = load_embedding_model(settings)
+    second, _ = load_embedding_model(settings)
+
+    assert backend == "onnx-int8"
+    assert exports == [BGE]
+    assert second.kwargs == first.kwargs
+    assert first.kwargs["model_name"] == str(tmp_path / "onnx" / "BAAI__bge-base-en-v1.5")
+    assert first.kwargs["model_kwargs"] == {"file_name": "onnx/model_qint8_avx2.onnx"}
+    # The local path hides the model family; bge's query instruction must survive.
+    assert first.kwargs["query_instruction"].startswith("Represent this question")
+
+
+def test_unavailable_onnx_runtime_falls_back_to_torch(tmp_path):
+    FakeHF.onnx_error = ImportError("optimum is not installed")
+    model, backend = load_embedding_model(make_settings(tmp_path, "onnx"))
+    assert backend == "torch"
+    assert model.kwargs == {"model_name": BGE}
+
+
+def test_unknown_backend_is_rejected(tmp_path):
+    with pytest.raises(ValueError):
+        load_embedding_model(make_settings(tmp_path, "tensorrt"))
+
+
+def test_cache_identity_keeps_torch_vectors_and_separates_others():
+    assert cache_model_name(BGE, "torch") == BGE
+    assert cache_model_name(BGE, "onnx-int8") != cache_model_name(BGE, "onnx") != BGE
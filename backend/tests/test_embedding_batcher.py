@@ -0,0 +1,110 @@
+"""Query-embedding micro-batcher: concurrent queries share one forward pass."""
+
+import threading
+
+import pytest
+from llama_index.core.embeddings import MockEmbedding
+from pydantic import Field
+
+from chat.embedding_batcher import BatchingEmbedding
+
+
+class BatchRecordingEmbedding(MockEmbedding):
+    """HuggingFaceEmbedding-shaped: ``_embed`` embeds a list in one call.
+
+    Each forward pass blocks until ``release`` is set, so a test can queue
+    queries behind one that is "running".
+    """
+
+    batches: list = Field(default_factory=list)
+    entered: threading.Event = Field(default_factory=threading.Event)
+    release: threading.Event = Field(default_factory=threading.Event)
+    fail: bool = False
+
+    def _vector(self, text):
+        return [float(len(text)), float(sum(map(ord, text)) % 97)]
+
+    def _embed(self, inputs, prompt_name=None):
+        self.entered.set()
+        self.release.wait(5)
+        self.batches.append((prompt_name, list(inputs)))
+        if self.fail:
+            raise RuntimeError("model crashed")
+        return [self._vector(text) for text in inputs]
+
+    def _get_query_embedding(self, query):
+        return self._embed([query], prompt_name="query")[0]
+
+    def _get_text_embeddings(self, texts):
+        return self._embed(texts, prompt_name="text")
+
+
+@pytest.fixture
+def inner():
+    return BatchRecordingEmbedding(embed_dim=2)
+
+
+def queue_behind_a_running_batch(batcher, inner, queries):
+    first = batcher.submit(queries[0])
+    assert inner.entered.wait(5)
+    rest = [batcher.submit(q) for q in queries[1:]]
+    inner.release.set()
+    return [f.result(timeout=5) for f in [first, *rest]]
+
+
+def test_queries_queued_during_a_forward_pass_share_the_next(inner):
+    batcher = BatchingEmbedding(inner, window_seconds=0.0, max_batch_size=16)
+    queries = [f"question {i}" * (i + 1) for i in range(6)]
+
+    vectors = queue_behind_a_running_batch(batcher, inner, queries)
+
+    assert vectors == [inner._vector(q) for q in queries]  # each caller gets its own
+    assert inner.batches == [("query", queries[:1]), ("query", queries[1:])]
+    batcher.close()
+
+
+def test_window_collects_queries_into_one_batch(inner):
+    inner.release.set()
+    batcher = BatchingEmbedding(inner, window_seconds=1.0, max_batch_size=3)
+
+    futures = [batcher.submit(q) for q in ("a", "bb", "ccc")]
+
+    assert [f.result(timeout=5) for f in futures] == [inner._vector(q) for q in ("a", "bb", "ccc")]
+    assert inner.batches == [("query", ["a", "bb", "ccc"])]  # full batch: no waiting out the window
+    batcher.close()
+
+
+def test_batches_are_capped_at_max_batch_size(inner):
+    batcher = BatchingEmbedding(inner, window_seconds=0.0, max_batch_size=2)
+
+    queue_behind_a_running_batch(batcher, inner, [f"q{i}" for i in range(5)])
+
+    assert [len(inputs) for _prompt, inputs in inner.batches] == [1, 2, 2]
+    batcher.close()
+
+
+def test_a_failed_batch_fails_every_caller(inner):
+    inner.fail = True
+    batcher = BatchingEmbedding(inner, window_seconds=0.0)
+
+    futures = [batcher.submit(q) for q in ("a", "b", "c")]
+    inner.release.set()
+    for future in futures:
+        with pytest.raises(RuntimeError, match="model crashed"):
+            future.result(timeout=5)
+    batcher.close()
+
+
+def test_texts_bypass_the_batcher_and_close_embeds_inline(inner):
+    inner.release.set()
+    batcher = BatchingEmbedding(inner)
+
+    assert batcher.get_text_embedding_batch(["x", "yy"]) == [
+        inner._vector("x"),
+        inner._vector("yy"),
+    ]
+    assert inner.batches == [("text", ["x", "yy"])]
+
+    batcher.close()
+    assert not batcher._thread.is_alive()
+    assert batcher.get_query_embedding("late") == inner._vector("late")
@@ -0,0 +1,158 @@
+"""Content-addressed embedding cache: repeats are lookups, across restarts too."""
+
+import sqlite3
+
+import numpy as np
+import pytest
+from llama_index.core.embeddings import MockEmbedding
+from pydantic import Field
+
+from chat.embedding_cache import CachedEmbedding, EmbeddingStore
+
+
+class RecordingEmbedding(MockEmbedding):
+    """Deterministic per-text vectors; records what it was asked to embed."""
+
+    model_name: str = "mock"
+    calls: list = Field(default_factory=list)
+
+    def _vector(self, text):
+        rng = np.random.default_rng(abs(hash(text)) % 2**32)
+        return rng.random(self.embed_dim, dtype=np.float32).tolist()
+
+    def _get_query_embedding(self, query):
+        self.calls.append(("query", query))
+        return self._vector("q:" + query)
+
+    def _get_text_embedding(self, text):
+        self.calls.append(("text", text))
+        return self._vector(text)
+
+    def _get_text_embeddings(self, texts):
+        return [self._get_text_embedding(t) for t in texts]
+
+    async def _aget_text_embeddings(self, texts):
+        return self._get_text_embeddings(texts)
+
+
+@pytest.fixture
+def inner():
+    return RecordingEmbedding(embed_dim=16)
+
+
+def test_repeat_texts_and_queries_are_not_reembedded(tmp_path, inner):
+    cached = CachedEmbedding(inner, EmbeddingStore(str(tmp_path / "e.sqlite3")))
+
+    first = cached.get_text_embedding_batch(["a", "b", "a"])
+    again = cached.get_text_embedding_batch(["b", "a", "c"])
+    q1 = cached.get_query_embedding("who is he?")
+    q2 = cached.get_query_embedding("who is he?")
+
+    assert inner.calls == [("text", "a"), ("text", "b"), ("text", "c"), ("query", "who is he?")]
+    assert first[0] == first[2] == again[1]
+    assert q1 == q2 == inner._vector("q:who is he?")
+    assert isinstance(q1[0], float)
+
+
+def test_query_and_text_embeddings_are_keyed_apart(tmp_path, inner):
+    cached = CachedEmbedding(inner, EmbeddingStore(str(tmp_path / "e.sqlite3")))
+    assert cached.get_text_embedding("same") != cached.get_query_embedding("same")
+
+
+def test_cache_survives_a_restart_and_lru_is_bounded(tmp_path, inner):
+    path = str(tmp_path / "e.sqlite3")
+    store = EmbeddingStore(path, max_items=2)
+    CachedEmbedding(inner, store).get_text_embedding_batch(["a", "b", "c"])
+    assert len(store._lru) == 2
+    store.close()
+
+    inner.calls.clear()
+    reopened = EmbeddingStore(path)
+    vectors = CachedEmbedding(inner, reopened).get_text_embedding_batch(["a", "b", "c"])
+    assert inner.calls == []
+    assert len(reopened) == 3
+    assert vectors[0] == inner._vector("a")
+
+
+async def test_async_path_uses_the_cache(tmp_path, inner):
+    cached = CachedEmbedding(inner, EmbeddingStore(str(tmp_path / "e.sqlite3")))
+    await cached.aget_text_embedding_batch(["x", "y"])
+    await cached.aget_query_embedding("q")
+    inner.calls.clear()
+
+    await cached.aget_text_embedding_batch(["y", "x"])
+    await cached.aget_query_embedding("q")
+    assert inner.calls == []
+
+
+def test_different_models_do_not_share_vectors(tmp_path, inner):
+    store = EmbeddingStore(str(tmp_path / "e.sqlite3"))
+    CachedEmbedding(inner, store).get_text_embedding("a")
+    other = RecordingEmbedding(embed_dim=16, model_name="other")
+    CachedEmbedding(other, store).get_text_embedding("a")
+    assert other.calls == [("text", "a")]
+
+
+def test_disk_cache_is_capped_least_recently_used_first(tmp_path, inner):
+    path = str(tmp_path / "e.sqlite3")
+    store = EmbeddingStore(path, max_items=0, max_rows=10)
+    cached = CachedEmbedding(inner, store)
+    cached.get_text_embedding_batch([f"t{i}" for i in range(10)])
+    cached.get_text_embedding("t0")  # read back from disk: now the most recent
+
+    cached.get_text_embedding("new")
+
+    assert len(store) == 9  # pruned to 90% of the cap, not one row at a time
+    inner.calls.clear()
+    cached.get_text_embedding_batch(["t0", "new"])
+    assert inner.calls == []
+    cached.get_text_embedding("t1")
+    assert inner.calls == [("text", "t1")]
+
+
+def test_memory_hits_keep_a_hot_vector_from_being_pruned(tmp_path, inner, monkeypatch):
+    now = [0.0]
+    monkeypatch.setattr("chat.embedding_cache.time.time", lambda: now[0])
+    path = str(tmp_path / "e.sqlite3")
+    store = EmbeddingStore(path, max_items=16, max_rows=10)
+    cached = CachedEmbedding(inner, store)
+    cached.get_text_embedding("hot")
+    now[0] = 1.0
+    cached.get_text_embedding_batch([f"t{i}" for i in range(9)])
+
+    now[0] = 100.0
+    cached.get_text_embedding("hot")  # served from memory; used written back
+    now[0] = 130.0
+    cached.get_text_embedding("hot")  # within TOUCH_INTERVAL: no write
+    used = sqlite3.connect(path).execute("SELECT MAX(used) FROM embeddings").fetchone()[0]
+    assert used == 100.0
+
+    now[0] = 200.0
+    cached.get_text_embedding("new")  # over the cap: the two oldest t* go
+
+    assert len(store) == 9
+    key = EmbeddingStore.key("mock", "text", "hot")
+    assert (
+        sqlite3.connect(path)
+        .execute("SELECT COUNT(*) FROM embeddings WHERE key = ?", (key,))
+        .fetchone()[0]
+        == 1
+    )
+
+
+def test_cap_applies_to_a_cache_file_from_before_it(tmp_path):
+    path = str(tmp_path / "e.sqlite3")
+    db = sqlite3.connect(path)
+    db.execute("CREATE TABLE embeddings (key BLOB PRIMARY KEY, vector BLOB NOT NULL)")
+    vector = np.zeros(4, dtype=np.float32).tobytes()
+    db.executemany(
+        "INSERT INTO embeddings VALUES (?, ?)", [(bytes([i]), vector) for i in range(20)]
+    )
+    db.commit()
+    db.close()
+
+    store = EmbeddingStore(path, max_rows=10)
+
+    assert len(store) == 9
+    store.put_many({b"fresh": np.ones(4, dtype=np.float32)})
+    assert b"fresh" in store.get_many([b"fresh"])
@@ -0,0 +1,150 @@
+"""Blue/green index reloads: generation build, swap, and release."""
+
+import asyncio
+import threading
+from types import SimpleNamespace
+
+import pytest
+from test_vector_store_manager import PARAGRAPHS, CountingEmbedding, TripletLLM, write_resume
+
+from chat import index_generation
+from chat.ChatManager import ChatManager
+from chat.ChromaClient import ChromaStoreManager
+from chat.index_generation import IndexGeneration
+from settings import PropertyGraphSettings
+
+
+@pytest.fixture
+def settings(tmp_path):
+    docs = tmp_path / "documents"
+    docs.mkdir()
+    return PropertyGraphSettings(
+        groq_api_key="x",
+        google_api_key="x",
+        pdf_directory=str(docs),
+        storage_dir=str(tmp_path / "storage"),
+        chroma_db_path=str(tmp_path / "chroma"),
+        graph_file=str(tmp_path / "kg.html"),
+        chunk_size=192,
+        chunk_overlap=0,
+    )
+
+
+@pytest.fixture
+def models():
+    llm = TripletLLM()
+    return SimpleNamespace(
+        embed_model=CountingEmbedding(embed_dim=8),
+        llm=llm,
+        model_provider="groq",
+        get_llm=lambda _provider=None: llm,
+        supports_async_streaming=lambda _provider=None: False,
+    )
+
+
+def test_reload_seeds_from_active_generation_and_releases_it(
+    settings, models, tmp_path, monkeypatch
+):
+    monkeypatch.chdir(tmp_path)  # pyvis writes its JS assets into the cwd
+    docs = tmp_path / "documents"
+    write_resume(docs, PARAGRAPHS)
+    original = IndexGeneration.create(settings, None, models, None, None)
+    assert original.build() is True
+    (tmp_path / "storage" / "notes.txt").write_text("kept by the operator")
+
+    write_resume(docs, [PARAGRAPHS[0], "At Globex I moved sessions to Postgres.", PARAGRAPHS[2]])
+    models.embed_model.embedded.clear()
+    models.llm.prompts.clear()
+    reloaded = IndexGeneration.create(settings, "g1", models, None, None)
+    assert reloaded.build(seed=original) is True
+
+    # Seeded from the active generation: only the edited chunk is new work.
+    assert models.embed_model.embedded  # the edited chunk, plus its new entity
+    assert not any("Kafka" in t or "Rust" in t for t in models.embed_model.embedded)
+    assert len(models.llm.prompts) == 1
+    assert reloaded.query_engine.query_engine_KG is not None
+    assert reloaded.chroma_store_manager.collection_name.endswith("-g1")
+
+    original.release()
+    storage = tmp_path / "storage"
+    assert sorted(p.name for p in storage.iterdir()) == ["generations", "notes.txt"]
+    assert (storage / "generations" / "g1" / "manifest.json").exists()
+    assert not (storage / "generations" / "g1" / "notes.txt").exists()
+
+    client = reloaded.chroma_store_manager.chroma_client
+    assert client.list_collections() == [f"{ChromaStoreManager.COLLECTION_NAME}-g1"]
+
+    reloaded.release()
+    assert list((storage / "generations").iterdir()) == []  # only index files were in it
+
+
+class StubEngine:
+    def __init__(self, name):
+        self.name = name
+        self.proceed = asyncio.Event()
+
+    async def process_query(self, *_args):
+        yield self.name
+        await self.proceed.wait()
+        yield "done"
+
+    async def wait_idle(self):
+        pass
+
+
+def stub_generation(generation_id, released):
+    generation = IndexGeneration(
+        generation_id,
+        SimpleNamespace(storage_dir="unused"),
+        SimpleNamespace(drop=lambda: None),
+        SimpleNamespace(),
+        StubEngine(generation_id),
+    )
+    generation.release = lambda: released.append(generation_id)
+    return generation
+
+
+async def test_swap_waits_for_in_flight_queries_on_old_generation(tmp_path):
+    released = []
+    blue = stub_generation("blue", released)
+    manager = ChatManager.__new__(ChatManager)
+    manager.settings = SimpleNamespace(storage_dir=str(tmp_path))
+    manager.generation = blue
+    manager._releasing = set()
+
+    streaming = manager.query("q", chat=None)
+    assert await anext(streaming) == "blue"
+
+    await manager.activate_generation(stub_generation("green", released))
+    assert (tmp_path / index_generation.ACTIVE_POINTER).read_text() == "green"
+    assert blue.retired and released == []  # an answer is still streaming from blue
+
+    fresh = manager.query("q", chat=None)
+    assert await anext(fresh) == "green"
+    await fresh.aclose()
+
+    blue.query_engine.proceed.set()
+    assert [chunk async for chunk in streaming] == ["done"]
+    await asyncio.gather(*manager._releasing)
+    assert released == ["blue"]
+
+
+async def test_retired_generation_is_released_off_the_event_loop(tmp_path):
+    threads = []
+    blue = stub_generation("blue", [])
+    blue.release = lambda: threads.append(threading.get_ident())
+    manager = ChatManager.__new__(ChatManager)
+    manager.settings = SimpleNamespace(storage_dir=str(tmp_path))
+    manager.generation = blue
+    manager._releasing = set()
+
+    await manager.activate_generation(stub_generation("green", []))
+
+    assert len(threads) == 1 and threads[0] != threading.get_ident()
+
+
+def test_active_generation_falls_back_to_original_without_storage(tmp_path):
+    index_generation.write_active_generation_id(str(tmp_path), "gone")
+    assert index_generation.active_generation_id(str(tmp_path)) is None
+    (tmp_path / "generations" / "gone").mkdir(parents=True)
+    assert index_generation.active_generation_id(str(tmp_path)) == "gone"
@@ -0,0 +1,165 @@
+"""Batched KG extraction: batching, concurrency, pacing, retries, fallback."""
+
+import asyncio
+import re
+import threading
+import time
+from typing import Any
+
+import pytest
+from llama_index.core.graph_stores.types import KG_NODES_KEY, KG_RELATIONS_KEY
+from llama_index.core.llms import CompletionResponse, CustomLLM, LLMMetadata
+from llama_index.core.schema import TextNode
+from pydantic import Field
+
+from chat.kg_extraction import BatchedLLMPathExtractor, split_passages
+
+LOCK = threading.Lock()
+
+
+class ScriptedLLM(CustomLLM):
+    """Answers (doc, mentions, Tool<n>) for every 'Tool<n>' in each passage."""
+
+    tagged: bool = True
+    failures: list = Field(default_factory=list)  # exceptions to raise first
+    prompts: list = Field(default_factory=list)
+    active: int = 0
+    peak: int = 0
+
+    @property
+    def metadata(self) -> LLMMetadata:
+        return LLMMetadata()
+
+    def predict(self, prompt, **variables: Any) -> str:
+        with LOCK:
+            self.prompts.append(variables)
+            self.active += 1
+            self.peak = max(self.peak, self.active)
+            failure = self.failures.pop(0) if self.failures else None
+        try:
+            time.sleep(0.01)
+            if failure is not None:
+                raise failure
+            if "text" in variables:
+                return self._triplets(variables["text"])
+            passages = re.split(r"^### Passage \d+$", variables["passages"], flags=re.MULTILINE)
+            return "\n".join(
+                (f"### Passage {i}\n" if self.tagged else "") + self._triplets(passage)
+                for i, passage in enumerate(passages[1:], start=1)
+            )
+        finally:
+            with LOCK:
+                self.active -= 1
+
+    async def apredict(self, prompt, **variables: Any) -> str:
+        # Bound to whichever event loop first used it, like a real async client.
+        raise AssertionError("extraction must not use the shared async client")
+
+    @staticmethod
+    def _triplets(text: str) -> str:
+        return "\n".join(f"(doc, mentions, {tool})" for tool in re.findall(r"Tool\d+", text))
+
+    def complete(self, prompt: str, formatted: bool = False, **kwargs: Any) -> CompletionResponse:
+        raise NotImplementedError
+
+    def stream_complete(self, prompt: str, formatted: bool = False, **kwargs: Any):
+        raise NotImplementedError
+
+
+def make_nodes(count):
+    return [TextNode(text=f"Chunk {i} is about Tool{i}.") for i in range(count)]
+
+
+def extracted_tools(node):
+    return sorted(rel.target_id for rel in node.metadata[KG_RELATIONS_KEY])
+
+
+@pytest.fixture
+def instant_sleep(monkeypatch):
+    delays = []
+    real_sleep = asyncio.sleep
+
+    async def sleep(delay, *args, **kwargs):
+        delays.append(delay)
+        await real_sleep(0)
+
+    monkeypatch.setattr(asyncio, "sleep", sleep)
+    return delays
+
+
+async def test_chunks_are_batched_and_triplets_mapped_back():
+    llm = ScriptedLLM()
+    nodes = make_nodes(10)
+    extractor = BatchedLLMPathExtractor(llm=llm, batch_size=4)
+
+    await extractor.acall(nodes)
+
+    assert len(llm.prompts) == 3  # 4 + 4 + 2
+    for i, node in enumerate(nodes):
+        assert extracted_tools(node) == [f"Tool{i}"]
+        assert {n.name for n in node.metadata[KG_NODES_KEY]} == {"Doc", f"Tool{i}"}
+
+
+async def test_concurrency_is_bounded():
+    llm = ScriptedLLM()
+    extractor = BatchedLLMPathExtractor(llm=llm, batch_size=1, max_concurrency=2)
+
+    await extractor.acall(make_nodes(8))
+
+    assert llm.peak == 2
+
+
+async def test_request_starts_are_paced(instant_sleep):
+    extractor = BatchedLLMPathExtractor(
+        llm=ScriptedLLM(), batch_size=1, max_concurrency=3, requests_per_minute=60
+    )
+
+    await extractor.acall(make_nodes(3))
+
+    paced = [d for d in instant_sleep if d > 0]
+    assert paced == [pytest.approx(1.0, abs=0.1), pytest.approx(2.0, abs=0.1)]
+
+
+async def test_transient_errors_are_retried(instant_sleep):
+    llm = ScriptedLLM(failures=[RuntimeError("429 rate limit exceeded")])
+    nodes = make_nodes(2)
+
+    await BatchedLLMPathExtractor(llm=llm, batch_size=2).acall(nodes)
+
+    assert len(llm.prompts) == 2
+    assert extracted_tools(nodes[1]) == ["Tool1"]
+
+
+async def test_permanent_errors_fail_the_build():
+    llm = ScriptedLLM(failures=[ValueError("invalid api key")])
+    with pytest.raises(ValueError):
+        await BatchedLLMPathExtractor(llm=llm).acall(make_nodes(2))
+
+
+async def test_untagged_answer_falls_back_to_one_chunk_per_prompt():
+    llm = ScriptedLLM(tagged=False)
+    nodes = make_nodes(3)
+
+    await BatchedLLMPathExtractor(llm=llm, batch_size=3).acall(nodes)
+
+    assert len(llm.prompts) == 1 + 3
+    assert [extracted_tools(node) for node in nodes] == [["Tool0"], ["Tool1"], ["Tool2"]]
+
+
+def test_each_build_runs_on_its_own_event_loop():
+    llm = ScriptedLLM()
+    extractor = BatchedLLMPathExtractor(llm=llm, batch_size=2)
+
+    first, second = make_nodes(2), make_nodes(3)
+    extractor(first)  # asyncio.run: a fresh loop per call, as during a reload
+    extractor(second)
+
+    assert extracted_tools(second[2]) == ["Tool2"]
+    assert len(llm.prompts) == 3
+
+
+def test_split_passages_tolerates_formatting_drift():
+    response = "## passage 2:\n(a, b, c)\n### Passage 1\n(d, e, f)\n### Passage 9\n(x, y, z)"
+    sections = split_passages(response, 2)
+    assert [section.strip() for section in sections] == ["(d, e, f)", "(a, b, c)"]
+    assert split_passages("(a, b, c)", 2) is None
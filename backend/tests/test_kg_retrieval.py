@@ -0,0 +1,118 @@
+"""LLM-free KG retrieval: alias index, entity matching and engine wiring."""
+
+from types import SimpleNamespace
+
+from llama_index.core.graph_stores import SimplePropertyGraphStore
+from llama_index.core.graph_stores.types import TRIPLET_SOURCE_KEY, EntityNode, Relation
+from llama_index.core.indices.property_graph import LLMSynonymRetriever
+from llama_index.core.schema import QueryBundle, TextNode
+
+from chat.kg_retrieval import EntityMatchRetriever, build_alias_index, question_text
+from chat.query_engine import QueryEngine
+
+
+def make_graph():
+    store = SimplePropertyGraphStore()
+    chunk = TextNode(id_="resume.txt#1", text="I built Inpersona on Redis at Moss.")
+    store.upsert_llama_nodes([chunk])
+    source = {TRIPLET_SOURCE_KEY: chunk.id_}
+    inpersona = EntityNode(name="Inpersona", label="PROJECT", properties=source)
+    redis = EntityNode(name="Redis Streams", label="TOOL", properties=source)
+    moss = EntityNode(name="Moss", label="COMPANY", properties=source)
+    store.upsert_nodes([inpersona, redis, moss, EntityNode(name="The", label="OTHER")])
+    store.upsert_relations(
+        [
+            Relation(label="USES", source_id=inpersona.id, target_id=redis.id, properties=source),
+            Relation(label="BUILT_AT", source_id=inpersona.id, target_id=moss.id),
+        ]
+    )
+    return store
+
+
+def test_alias_index_covers_entities_only():
+    aliases = build_alias_index(make_graph())
+
+    assert aliases == {
+        "inpersona": ["Inpersona"],
+        "redi stream": ["Redis Streams"],  # plurals folded on both sides
+        "moss": ["Moss"],
+    }
+
+
+def test_entity_match_reads_only_the_current_question():
+    store = make_graph()
+    retriever = EntityMatchRetriever(store, build_alias_index(store))
+    context = (
+        "You work at Moss.\nUser: hi\nCurrent question: How does Inpersona use redis stream?\n"
+    )
+
+    assert question_text(context) == " How does Inpersona use redis stream?\n"
+    assert retriever.match(context) == ["Redis Streams", "Inpersona"]
+    assert retriever.match("Current question: what do you do?") == []
+
+
+def test_entity_match_expands_to_relations_with_source_text():
+    store = make_graph()
+    retriever = EntityMatchRetriever(store, build_alias_index(store))
+
+    nodes = retriever.retrieve(QueryBundle("Current question: Tell me about Inpersona"))
+
+    texts = [n.node.get_content() for n in nodes]
+    assert any("Inpersona -> USES -> Redis Streams" in t for t in texts)
+    assert any("I built Inpersona on Redis at Moss." in t for t in texts)
+
+
+class RecordingIndex:
+    def __init__(self, graph_store=None):
+        self.property_graph_store = graph_store
+        self.vector_store = None
+        self.calls = []
+
+    def as_query_engine(self, **kwargs):
+        self.calls.append(kwargs)
+        return SimpleNamespace()
+
+
+def make_qe(mode):
+    from llama_index.core.llms import MockLLM
+
+    gm = SimpleNamespace(
+        settings=SimpleNamespace(
+            similarity_top_k=4,
+            query_timeout_seconds=45.0,
+            llm_max_retries=4,
+            retrieval_cache_size=16,
+            retrieval_cache_ttl_seconds=60.0,
+            hyde_budget_seconds=2.0,
+            hyde_cache_size=16,
+            hyde_cache_ttl_seconds=60.0,
+            kg_retrieval_mode=mode,
+            vector_retriever="chroma",
+            numpy_retriever_dtype="float32",
+        ),
+        index_KG=RecordingIndex(make_graph()),
+        index_vector=RecordingIndex(),
+        model_manager=SimpleNamespace(get_llm=lambda _provider=None: MockLLM()),
+    )
+    return QueryEngine(gm, None), gm
+
+
+def test_entity_mode_replaces_the_llm_synonym_retriever():
+    qe, gm = make_qe("entity")
+
+    assert qe.initialize() is True
+    (retriever,) = gm.index_KG.calls[0]["sub_retrievers"]  # no vector store here
+    assert isinstance(retriever, EntityMatchRetriever)
+    assert "sub_retrievers" not in gm.index_vector.calls[0]
+
+    llm_qe, llm_gm = make_qe("llm")
+    assert llm_qe.initialize() is True
+    (retriever,) = llm_gm.index_KG.calls[0]["sub_retrievers"]
+    assert isinstance(retriever, LLMSynonymRetriever)
+    assert retriever._llm is llm_gm.index_KG.calls[0]["llm"]  # the engine set's own LLM
+
+
+def test_unknown_mode_fails_initialization():
+    qe, _gm = make_qe("keywords")
+
+    assert qe.initialize() is False
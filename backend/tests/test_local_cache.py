@@ -0,0 +1,74 @@
+"""In-process L1: TTL expiry and least-frequently-used eviction."""
+
+import time
+
+from chat.local_cache import LocalCache
+
+
+def test_get_returns_stored_value():
+    cache = LocalCache(max_items=4, ttl_seconds=60)
+    cache.set("q", "a")
+    assert cache.get("q") == "a"
+    assert cache.get("missing") is None
+
+
+def test_entries_expire_after_ttl(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(time, "monotonic", lambda: now[0])
+    cache = LocalCache(max_items=4, ttl_seconds=10)
+    cache.set("q", "a")
+
+    now[0] += 9
+    assert cache.get("q") == "a"
+    now[0] += 2
+    assert cache.get("q") is None
+    assert len(cache) == 0
+
+
+def test_full_cache_evicts_least_frequently_used():
+    cache = LocalCache(max_items=2, ttl_seconds=60)
+    cache.set("hot", "1")
+    cache.set("cold", "2")
+    cache.get("hot")
+
+    cache.set("new", "3")
+
+    assert cache.get("hot") == "1"
+    assert cache.get("cold") is None
+    assert cache.get("new") == "3"
+
+
+def test_eviction_prefers_expired_entries(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(time, "monotonic", lambda: now[0])
+    cache = LocalCache(max_items=2, ttl_seconds=10)
+    cache.set("old", "1")
+    now[0] += 8
+    cache.set("hot", "2")
+    for _ in range(3):
+        cache.get("old")
+    now[0] += 5  # "old" has expired despite its hits; "hot" has not
+
+    cache.set("new", "3")
+
+    assert cache.get("hot") == "2"
+    assert cache.get("new") == "3"
+
+
+def test_overwrite_keeps_frequency():
+    cache = LocalCache(max_items=2, ttl_seconds=60)
+    cache.set("hot", "1")
+    cache.get("hot")
+    cache.set("hot", "1b")
+    cache.set("cold", "2")
+
+    cache.set("new", "3")
+
+    assert cache.get("hot") == "1b"
+    assert cache.get("cold") is None
+
+
+def test_zero_size_disables_cache():
+    cache = LocalCache(max_items=0, ttl_seconds=60)
+    cache.set("q", "a")
+    assert cache.get("q") is None
@@ -0,0 +1,151 @@
+"""Provider registry: LLMs are built on first use and chosen per request."""
+
+from types import SimpleNamespace
+
+import pytest
+from llama_index.core import Settings
+
+from chat import ModelsManager, embedding_backend
+from chat.embedding_batcher import BatchingEmbedding
+from chat.ModelsManager import ModelManager
+
+real_llm_class = ModelsManager._llm_class
+
+
+class FakeClient:
+    def __init__(self, **kwargs):
+        self.kwargs = kwargs
+
+
+def fake_llm_class(provider):
+    return type(ModelsManager.LLM_CLASSES[provider][1], (FakeClient,), {})
+
+
+def break_provider(monkeypatch, broken_provider, error):
+    def broken(**_kwargs):
+        raise error
+
+    monkeypatch.setattr(
+        ModelsManager,
+        "_llm_class",
+        lambda provider: broken if provider == broken_provider else fake_llm_class(provider),
+    )
+
+
+@pytest.fixture(autouse=True)
+def fake_clients(monkeypatch):
+    monkeypatch.setattr(ModelsManager, "_llm_class", fake_llm_class)
+    monkeypatch.setattr(
+        embedding_backend, "HuggingFaceEmbedding", type("HuggingFaceEmbedding", (FakeClient,), {})
+    )
+
+
+def make_settings(openai_api_key=None, query_embedding_batch_size=1):
+    return SimpleNamespace(
+        groq_model="g",
+        groq_api_key="k",
+        google_model="m",
+        google_api_key="k",
+        openai_model="o",
+        openai_api_key=openai_api_key,
+        max_tokens=16,
+        chunk_size=800,
+        chunk_overlap=100,
+        similarity_top_k=4,
+        embedding_model="e",
+        embedding_backend="torch",
+        embedding_cache_path=None,
+        embedding_cache_size=0,
+        embedding_cache_max_rows=0,
+        query_embedding_batch_size=query_embedding_batch_size,
+        query_embedding_batch_window_seconds=0.005,
+    )
+
+
+def test_builds_the_default_provider_then_others_on_first_use():
+    mm = ModelManager(make_settings(openai_api_key="sk"), "groq")
+    assert mm.initialize() is True
+    assert set(mm.llms) == {"groq"}
+
+    assert type(mm.get_llm()).__name__ == "Groq"
+    gemini = mm.get_llm("gemini")
+    assert type(gemini).__name__ == "GoogleGenAI"
+    assert mm.get_llm("gemini") is gemini  # built once, then reused
+    assert mm.has_provider("openai")
+    assert set(mm.llms) == {"groq", "gemini", "openai"}
+    assert mm.llm is mm.get_llm("groq")
+
+
+def test_openai_unavailable_without_key():
+    mm = ModelManager(make_settings(), "groq")
+    assert mm.initialize() is True
+
+    assert not mm.has_provider("openai")
+    with pytest.raises(KeyError):
+        mm.get_llm("openai")
+
+
+def test_non_default_provider_failure_is_not_fatal(monkeypatch):
+    attempts = []
+
+    def broken(**_kwargs):
+        attempts.append("gemini")
+        raise RuntimeError("gemini outage")
+
+    monkeypatch.setattr(
+        ModelsManager,
+        "_llm_class",
+        lambda provider: broken if provider == "gemini" else fake_llm_class(provider),
+    )
+    mm = ModelManager(make_settings(), "groq")
+
+    assert mm.initialize() is True
+    assert mm.has_provider("groq") and not mm.has_provider("gemini")
+    with pytest.raises(KeyError):
+        mm.get_llm("gemini")
+    assert attempts == ["gemini"]  # a failed build is not retried per request
+    assert not mm.has_provider("anthropic")
+
+
+def test_default_provider_failure_is_fatal(monkeypatch):
+    break_provider(monkeypatch, "groq", RuntimeError("groq outage"))
+    assert ModelManager(make_settings(), "groq").initialize() is False
+
+
+def test_does_not_touch_llama_index_global_settings():
+    before = (Settings._llm, Settings._embed_model, Settings._node_parser)
+    mm = ModelManager(make_settings(), "groq")
+
+    assert mm.initialize() is True
+    assert (Settings._llm, Settings._embed_model, Settings._node_parser) == before
+
+
+def test_provider_sdk_is_imported_on_first_use(monkeypatch):
+    imported = []
+
+    def import_module(module):
+        imported.append(module)
+        return SimpleNamespace(Groq=FakeClient, GoogleGenAI=FakeClient, OpenAI=FakeClient)
+
+    monkeypatch.setattr(ModelsManager, "_llm_class", real_llm_class)
+    monkeypatch.setattr(ModelsManager.importlib, "import_module", import_module)
+
+    mm = ModelManager(make_settings(), "groq")
+    assert mm.initialize() is True
+    assert imported == ["llama_index.llms.groq"]
+
+    mm.get_llm("gemini")
+    assert imported == ["llama_index.llms.groq", "llama_index.llms.google_genai"]
+
+
+def test_query_embeddings_are_batched_under_the_cache(tmp_path):
+    settings = make_settings(query_embedding_batch_size=8)
+    settings.embedding_cache_path = str(tmp_path / "e.sqlite3")
+    mm = ModelManager(settings, "groq")
+    assert mm.initialize() is True
+
+    batcher = mm.embed_model.inner
+    assert isinstance(batcher, BatchingEmbedding)
+    assert type(batcher.inner).__name__ == "HuggingFaceEmbedding"
+    mm.close()
+    assert not batcher._thread.is_alive()
@@ -0,0 +1,123 @@
+"""In-memory brute-force vector retrieval: exact top-k, Chroma loading, wiring."""
+
+from types import SimpleNamespace
+
+import chromadb
+import numpy as np
+from llama_index.core.graph_stores import SimplePropertyGraphStore
+from llama_index.core.graph_stores.types import VECTOR_SOURCE_KEY
+from llama_index.core.query_engine import RetrieverQueryEngine
+from llama_index.core.schema import QueryBundle, TextNode
+from llama_index.vector_stores.chroma import ChromaVectorStore
+
+from chat.numpy_retriever import NumpyVectorRetriever
+from chat.query_engine import QueryEngine
+
+
+def random_vectors(n, dim=16, seed=0):
+    return np.random.default_rng(seed).normal(size=(n, dim)).astype(np.float32)
+
+
+def test_top_k_is_exact_cosine_ranking():
+    vectors = random_vectors(500)
+    nodes = [TextNode(text=f"chunk {i}", id_=str(i)) for i in range(500)]
+    retriever = NumpyVectorRetriever(nodes, vectors, None, similarity_top_k=5)
+    query = vectors[42] * 3  # same direction, different norm
+
+    rows, scores = retriever.top_k(query)
+
+    unit = vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+    expected = np.argsort(-(unit @ (query / np.linalg.norm(query))))[:5]
+    assert rows.tolist() == expected.tolist()
+    assert rows[0] == 42 and np.isclose(scores[0], 1.0)
+    assert list(scores) == sorted(scores, reverse=True)
+
+
+def test_float16_halves_memory_and_keeps_the_ranking():
+    vectors = random_vectors(20_000, dim=64)
+    nodes = [TextNode(text=str(i)) for i in range(20_000)]
+    exact = NumpyVectorRetriever(nodes, vectors, None, similarity_top_k=4)
+    half = NumpyVectorRetriever(nodes, vectors, None, similarity_top_k=4, dtype="float16")
+
+    assert half.nbytes * 2 == exact.nbytes
+    for query in vectors[:10]:
+        assert half.top_k(query)[0][0] == exact.top_k(query)[0][0]
+
+
+def test_loads_document_chunks_from_chroma_and_embeds_the_query():
+    collection = chromadb.EphemeralClient().get_or_create_collection("numpy_retriever_test")
+    store = ChromaVectorStore(chroma_collection=collection)
+    vectors = random_vectors(3, dim=4)
+    store.add(
+        [
+            TextNode(text="Built Inpersona.", id_="resume.txt#a", embedding=vectors[0].tolist()),
+            TextNode(text="Worked at Moss.", id_="resume.txt#b", embedding=vectors[1].tolist()),
+            # A KG entity embedding in the shared collection: never a vector-mode hit.
+            TextNode(
+                text="Moss", metadata={VECTOR_SOURCE_KEY: "Moss"}, embedding=vectors[1].tolist()
+            ),
+        ]
+    )
+    embed_model = SimpleNamespace(get_agg_embedding_from_queries=lambda _strs: vectors[1])
+
+    retriever = NumpyVectorRetriever.from_collection(
+        collection, embed_model, similarity_top_k=4, batch_size=2
+    )
+    nodes = retriever.retrieve(QueryBundle("Where do you work?"))
+
+    assert len(retriever) == 2
+    assert [n.node.node_id for n in nodes] == ["resume.txt#b", "resume.txt#a"]
+    assert nodes[0].node.get_content() == "Worked at Moss."
+
+
+class RecordingIndex:
+    def __init__(self):
+        self.property_graph_store = SimplePropertyGraphStore()
+        self.vector_store = None
+        self.calls = []
+
+    def as_query_engine(self, **kwargs):
+        self.calls.append(kwargs)
+        return SimpleNamespace()
+
+
+def make_qe(vector_retriever):
+    from llama_index.core.llms import MockLLM
+
+    collection = SimpleNamespace(get=lambda **_kwargs: {"ids": []})
+    gm = SimpleNamespace(
+        settings=SimpleNamespace(
+            similarity_top_k=4,
+            query_timeout_seconds=45.0,
+            llm_max_retries=4,
+            retrieval_cache_size=16,
+            retrieval_cache_ttl_seconds=60.0,
+            hyde_budget_seconds=2.0,
+            hyde_cache_size=16,
+            hyde_cache_ttl_seconds=60.0,
+            kg_retrieval_mode="llm",
+            vector_retriever=vector_retriever,
+            numpy_retriever_dtype="float32",
+        ),
+        index_KG=RecordingIndex(),
+        index_vector=RecordingIndex(),
+        chroma_store_manager=SimpleNamespace(collection=collection),
+        model_manager=SimpleNamespace(get_llm=lambda _provider=None: MockLLM(), embed_model=None),
+    )
+    return QueryEngine(gm, None), gm
+
+
+def test_numpy_mode_serves_vector_queries_without_chroma():
+    qe, gm = make_qe("numpy")
+
+    assert qe.initialize() is True
+    assert isinstance(qe.query_engine_vector, RetrieverQueryEngine)
+    assert isinstance(qe.query_engine_vector.retriever, NumpyVectorRetriever)
+    assert gm.index_vector.calls == []
+    assert len(gm.index_KG.calls) == 1  # KG mode is unaffected
+
+
+def test_unknown_vector_retriever_fails_initialization():
+    qe, _gm = make_qe("faiss")
+
+    assert qe.initialize() is False
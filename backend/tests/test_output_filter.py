@@ -1,5 +1,7 @@
 """PII redaction: targeted contact-info scrubbing that survives a token stream."""
 
+import random
+
 from chat.output_filter import StreamRedactor, redact_text
 
 REDACTED = "[hidden]"
@@ -69,3 +71,80 @@ def test_stream_redactor_passes_clean_text_through():
     text = "Hello there. I cut p99 latency 40% on the search path."
     out = "".join(r.feed(c) for c in text) + r.flush()
     assert out == text
+
+
+def test_stream_redactor_text_is_full_redacted_response():
+    r = StreamRedactor()
+    text = "Mail a@b.com or call +1 (930) 333-4182. " * 5
+    for i in range(0, len(text), 7):
+        r.feed(text[i : i + 7])
+    r.flush()
+    assert r.text == redact_text(text)
+
+
+def test_stream_redactor_keeps_only_a_bounded_tail():
+    r = StreamRedactor()
+    for _ in range(2000):
+        r.feed("some clean streamed text, ")
+    assert len(r._tail) < 200  # settled text is dropped, not rescanned
+
+
+class _ReferenceRedactor:
+    """The original whole-buffer implementation, kept as the fuzz oracle."""
+
+    def __init__(self):
+        self._raw = ""
+        self._sent = 0
+
+    def feed(self, chunk):
+        self._raw += chunk
+        redacted = redact_text(self._raw)
+        safe_upto = max(0, len(redacted) - 80)
+        if safe_upto <= self._sent:
+            return ""
+        out = redacted[self._sent : safe_upto]
+        self._sent = safe_upto
+        return out
+
+    def flush(self):
+        redacted = redact_text(self._raw)
+        out = redacted[self._sent :]
+        self._sent = len(redacted)
+        return out
+
+
+_WORDS = [
+    "latency",
+    "p99",
+    "40%",
+    "350ms",
+    "+1 (930) 333-4182",
+    "+91 98765 43210",
+    "930-333-4182",
+    "+44.207.555.0100",
+    "a@b.com",
+    "yatharth.k2@outlook.com",
+    "x@y",
+    "@",
+    "2025",
+    "1234567",
+    "(555)",
+    ".",
+    "-",
+    "\n",
+]
+
+
+def test_stream_redactor_matches_reference_on_random_streams():
+    rng = random.Random(1234)
+    for _ in range(300):
+        words = [rng.choice(_WORDS) for _ in range(rng.randint(0, 120))]
+        text = "".join(w + rng.choice([" ", "", "  ", "\n"]) for w in words)
+        cuts = sorted(rng.sample(range(len(text) + 1), min(len(text), rng.randint(0, 40))))
+        chunks = [text[a:b] for a, b in zip([0, *cuts], [*cuts, len(text)], strict=True)]
+
+        new, ref = StreamRedactor(), _ReferenceRedactor()
+        for chunk in chunks:
+            assert new.feed(chunk) == ref.feed(chunk)
+        assert new.flush() == ref.flush()
+        assert new.text == redact_text(text)
@@ -9,10 +9,13 @@ import asyncio
 import threading
 from types import SimpleNamespace
 
+from llama_index.core.graph_stores import SimplePropertyGraphStore
+from llama_index.core.schema import NodeWithScore, TextNode
 from prometheus_client import REGISTRY
 
 from chat.chatdata import Chat
-from chat.query_engine import GENERIC_ERROR, GENERIC_TIMEOUT, QueryEngine
+from chat.query_engine import GENERIC_BUSY, GENERIC_ERROR, GENERIC_TIMEOUT, QueryEngine
+from chat.worker_pool import BoundedExecutor
 
 # --- fakes ------------------------------------------------------------------
 
@@ -42,39 +45,132 @@ class FakeEngine:
         return FakeResponse(self.chunks, self.response_gen_none)
 
 
-class RecordingIndex:
+class FakeAsyncResponse:
+    def __init__(self, chunks, release=None):
+        self.closed = False
+        self.response_gen = self._gen(chunks, release)
+
+    async def _gen(self, chunks, release):
+        try:
+            for chunk in chunks:
+                if release is not None:
+                    await release.wait()
+                yield chunk
+        finally:
+            self.closed = True  # the provider connection would be torn down here
+
+
+class FakeAsyncEngine:
+    """Stand-in for a RetrieverQueryEngine on the native async path."""
+
+    def __init__(self, chunks=None, exc=None, release=None):
+        self.chunks = chunks or []
+        self.exc = exc
+        self.release = release  # if set, the stream waits on this asyncio.Event
+        self.retrieved = []
+        self.threads = []
+        self.responses = []
+        self.synthesized = []
+
+    def query(self, _query_context):
+        raise AssertionError("async path must not use the blocking query()")
+
+    def retrieve(self, query_bundle):
+        self.retrieved.append(query_bundle)
+        self.threads.append(threading.current_thread().name)
+        return [NodeWithScore(node=TextNode(text="node", id_="n1"), score=0.8)]
+
+    async def asynthesize(self, query_bundle, nodes):
+        self.synthesized.append(query_bundle.query_str)
+        assert [(n.node.node_id, n.node.text, n.score) for n in nodes] == [("n1", "node", 0.8)]
+        if self.exc is not None:
+            raise self.exc
+        response = FakeAsyncResponse(self.chunks, self.release)
+        self.responses.append(response)
+        return response
+
+
+class FakeSplitEngine:
+    """Stand-in for a RetrieverQueryEngine on the thread-bridge path."""
+
+    def __init__(self, chunks):
+        self.chunks = chunks
+        self.retrieved = []
+        self.synthesized = []
+
+    def retrieve(self, query_bundle):
+        self.retrieved.append(query_bundle.query_str)
+        return [NodeWithScore(node=TextNode(text="node", id_="n1"), score=0.8)]
+
+    def synthesize(self, query_bundle, nodes):
+        self.synthesized.append((query_bundle.query_str, [n.node.node_id for n in nodes]))
+        return FakeResponse(self.chunks)
+
+
+class FakeTransform:
     def __init__(self):
+        self.calls = 0
+
+    def run(self, query_bundle):
+        self.calls += 1
+        query_bundle.custom_embedding_strs = ["hypothetical doc"]
+        return query_bundle
+
+
+class RecordingIndex:
+    def __init__(self, llm_names=None):
+        self.property_graph_store = SimplePropertyGraphStore()
+        self.vector_store = None
         self.calls = []
+        self.llm_names = llm_names  # id(llm) -> provider name
 
     def as_query_engine(self, **kwargs):
         self.calls.append(kwargs)
+        if self.llm_names:  # answer names the LLM the engine was built with
+            return FakeEngine([f"answer from {self.llm_names[id(kwargs['llm'])]}"])
         return FakeEngine([])
 
 
 class FakeCache:
-    def __init__(self, cached=None):
+    def __init__(self, cached=None, local=None):
         self.cached = cached
+        self.local = local
         self.stored = []
+        self.namespaces = []
+        self.remote_lookups = 0
 
     def is_available(self):
         return True
 
-    def get_cached_response(self, _question):
+    def get_local_response(self, _question, _namespace=None):
+        return self.local
+
+    def get_cached_response(self, _question, _namespace=None):
+        self.remote_lookups += 1
         return self.cached
 
-    def cache_response(self, question, response):
+    def cache_response(self, question, response, namespace=None):
         self.stored.append((question, response))
+        self.namespaces.append(namespace)
 
 
-def make_qe(cache=None, kg=None, vector=None, timeout=45.0, retries=4):
+def make_qe(
+    cache=None, kg=None, vector=None, timeout=45.0, retries=4, executor=None, async_llm=False
+):
     gm = SimpleNamespace(
         settings=SimpleNamespace(
             similarity_top_k=6,
             query_timeout_seconds=timeout,
             llm_max_retries=retries,
-        )
+            retrieval_cache_size=16,
+            retrieval_cache_ttl_seconds=60.0,
+            hyde_budget_seconds=2.0,
+            hyde_cache_size=16,
+            hyde_cache_ttl_seconds=60.0,
+        ),
+        model_manager=SimpleNamespace(supports_async_streaming=lambda _provider=None: async_llm),
     )
-    qe = QueryEngine(gm, cache)
+    qe = QueryEngine(gm, cache, executor=executor)
     qe.query_engine_KG = kg or FakeEngine([])
     qe.query_engine_vector = vector or FakeEngine([])
     qe.hyde_engine_KG = kg or FakeEngine([])
@@ -120,6 +216,18 @@ async def test_cache_hit_returns_cached_without_touching_engine():
     assert qval("hit") == before + 1
 
 
+async def test_local_cache_hit_skips_remote_lookup():
+    cache = FakeCache(cached="<p>stale remote</p>", local="<p>Hot answer.</p>")
+    kg = FakeEngine(["SHOULD NOT RUN"])
+    qe = make_qe(cache=cache, kg=kg)
+
+    out = await drain(qe.process_query("hello", Chat(10), None, "KG"))
+
+    assert out == ["<p>Hot answer.</p>"]
+    assert cache.remote_lookups == 0  # served from L1, no Redis round trip
+    assert kg.calls == 0
+
+
 async def test_stream_yields_chunks_and_caches_full_response():
     cache = FakeCache(cached=None)
     qe = make_qe(cache=cache, kg=FakeEngine(["Hi, ", "I'm Yatharth."]))
@@ -132,6 +240,112 @@ async def test_stream_yields_chunks_and_caches_full_response():
     assert ("who are you", "Hi, I'm Yatharth.") in cache.stored
 
 
+async def test_cache_namespace_separates_engine_transformation_and_provider():
+    cache = FakeCache(cached=None)
+    qe = make_qe(cache=cache, kg=FakeEngine(["kg"]), vector=FakeEngine(["vec"]))
+    qe.graph_manager.model_manager = SimpleNamespace(model_provider="groq")
+
+    await drain(qe.process_query("q", Chat(10), None, "KG"))
+    await drain(qe.process_query("q", Chat(10), None, "vector"))
+    qe.graph_manager.model_manager.model_provider = "gemini"
+    await drain(qe.process_query("q", Chat(10), None, "vector"))
+
+    assert len(set(cache.namespaces)) == 3
+    assert cache.namespaces[0].startswith("kg:none:groq:")
+    assert cache.namespaces[2].startswith("vector:none:gemini:")
+
+
+def test_cache_namespace_changes_with_prompt_and_index(tmp_path):
+    prompt = tmp_path / "persona.txt"
+    prompt.write_text("You are someone else.")
+    qe = make_qe()
+    base = qe.cache_namespace(None, "KG")
+
+    qe.graph_manager.settings.prompt_path = str(prompt)
+    assert QueryEngine(qe.graph_manager).cache_namespace(None, "KG") != base
+
+    qe.graph_manager.settings.prompt_path = None
+    qe.graph_manager.index_fingerprint = lambda: "rebuilt"
+    assert QueryEngine(qe.graph_manager).cache_namespace(None, "KG") != base
+
+
+async def test_identical_concurrent_questions_share_one_upstream_call():
+    gate = threading.Event()
+    cache = FakeCache(cached=None)
+    kg = FakeEngine(["Hi, ", "I'm Yatharth."], gate=gate)
+    qe = make_qe(cache=cache, kg=kg)
+    before = REGISTRY.get_sample_value("inpersona_coalesced_queries_total") or 0.0
+
+    tasks = [
+        asyncio.create_task(drain(qe.process_query("Who are you?", Chat(10), None, "KG"))),
+        asyncio.create_task(drain(qe.process_query("who are you?", Chat(10), None, "KG"))),
+        asyncio.create_task(drain(qe.process_query("  WHO ARE YOU? ", Chat(10), None, "KG"))),
+    ]
+    await asyncio.sleep(0.05)  # all three are now waiting on the same flight
+    gate.set()
+    outs = ["".join(out) for out in await asyncio.gather(*tasks)]
+
+    assert outs == ["Hi, I'm Yatharth."] * 3
+    assert kg.calls == 1
+    assert len(cache.stored) == 1  # stored once, by the flight
+    assert REGISTRY.get_sample_value("inpersona_coalesced_queries_total") == before + 2
+    assert qe._inflight == {}
+
+
+async def test_different_modes_do_not_coalesce():
+    gate = threading.Event()
+    kg = FakeEngine(["kg"], gate=gate)
+    vec = FakeEngine(["vec"], gate=gate)
+    qe = make_qe(kg=kg, vector=vec)
+
+    tasks = [
+        asyncio.create_task(drain(qe.process_query("q", Chat(10), None, "KG"))),
+        asyncio.create_task(drain(qe.process_query("q", Chat(10), None, "vector"))),
+    ]
+    await asyncio.sleep(0.05)
+    gate.set()
+    outs = ["".join(out) for out in await asyncio.gather(*tasks)]
+
+    assert outs == ["kg", "vec"]
+    assert kg.calls == vec.calls == 1
+
+
+async def test_late_joiner_is_replayed_earlier_chunks():
+    gate = threading.Event()
+
+    class SlowEngine(FakeEngine):
+        def query(self, _query_context):
+            self.calls += 1
+
+            def gen():
+                yield "first "
+                gate.wait()
+                yield "second"
+
+            return SimpleNamespace(response="", response_gen=gen())
+
+    kg = SlowEngine()
+    qe = make_qe(kg=kg)
+    leader = qe.process_query("q", Chat(10), None, "KG")
+    leader_out = []
+    leader_task = asyncio.create_task(_collect(leader, leader_out))
+    await asyncio.sleep(0.05)  # leader is mid-stream, "first " already published
+
+    follower = asyncio.create_task(drain(qe.process_query("q", Chat(10), None, "KG")))
+    await asyncio.sleep(0.05)
+    gate.set()
+    await leader_task
+
+    assert "".join(await follower) == "first second"
+    assert "".join(leader_out) == "first second"
+    assert kg.calls == 1
+
+
+async def _collect(agen, out):
+    async for chunk in agen:
+        out.append(chunk)
+
+
 async def test_stream_redacts_pii_split_across_chunks():
     qe = make_qe(kg=FakeEngine(["You can reach me at +1 (930) ", "333-4182 anytime."]))
     chat = Chat(10)
@@ -143,6 +357,23 @@ async def test_stream_redacts_pii_split_across_chunks():
     assert chat.to_list()[-1]["content"].count("[hidden]") >= 1
 
 
+async def test_stream_is_redacted_once_and_cached_as_streamed(monkeypatch):
+    from chat.output_filter import StreamRedactor
+
+    fed = []
+    real_feed = StreamRedactor.feed
+    monkeypatch.setattr(StreamRedactor, "feed", lambda self, c: fed.append(c) or real_feed(self, c))
+    cache = FakeCache()
+    chunks = ["Mail me at yk", "@example.com or call +1 (930) ", "333-4182. " + "Thanks! " * 20]
+    qe = make_qe(cache=cache, kg=FakeEngine(chunks))
+
+    out = "".join(await drain(qe.process_query("contact", Chat(10), None, "KG")))
+
+    assert fed == chunks  # one redactor per stream, each chunk fed once
+    assert cache.stored == [("contact", out)]
+    assert out.count("[hidden]") == 2 and "4182" not in out
+
+
 async def test_vector_store_routes_to_vector_engine():
     kg = FakeEngine(exc=AssertionError("KG engine must not be used"))
     vec = FakeEngine(["from the vector index"])
@@ -164,6 +395,319 @@ async def test_hyde_routes_to_hyde_engine():
     assert out == "from the hyde engine"
 
 
+def make_multi_provider_qe(cache=None):
+    from llama_index.core.llms import MockLLM
+
+    llms = {p: MockLLM() for p in ("groq", "gemini")}
+    names = {id(llm): p for p, llm in llms.items()}
+    gm = SimpleNamespace(
+        settings=SimpleNamespace(
+            similarity_top_k=4,
+            query_timeout_seconds=45.0,
+            llm_max_retries=4,
+            retrieval_cache_size=16,
+            retrieval_cache_ttl_seconds=60.0,
+            hyde_budget_seconds=2.0,
+            hyde_cache_size=16,
+            hyde_cache_ttl_seconds=60.0,
+            kg_retrieval_mode="llm",
+            vector_retriever="chroma",
+            numpy_retriever_dtype="float32",
+        ),
+        index_KG=RecordingIndex(names),
+        index_vector=RecordingIndex(names),
+        model_manager=SimpleNamespace(
+            model_provider="groq",
+            get_llm=lambda provider=None: llms[provider or "groq"],
+            supports_async_streaming=lambda _provider=None: False,
+        ),
+    )
+    qe = QueryEngine(gm, cache)
+    assert qe.initialize() is True
+    return qe, gm
+
+
+async def test_request_picks_its_provider_without_rebuilding_default():
+    cache = FakeCache(cached=None)
+    qe, gm = make_multi_provider_qe(cache)
+
+    default = "".join(await drain(qe.process_query("q?", Chat(10), None, "KG")))
+    gemini = "".join(await drain(qe.process_query("q?", Chat(10), None, "KG", "gemini")))
+    again = "".join(await drain(qe.process_query("r?", Chat(10), None, "KG", "gemini")))
+
+    assert default == "answer from groq"
+    assert gemini == again == "answer from gemini"
+    assert len(gm.index_KG.calls) == 2  # gemini engines built once, then reused
+    assert cache.namespaces[0] != cache.namespaces[1]  # answers cached per provider
+
+
+async def test_mixed_providers_stream_concurrently():
+    qe, _ = make_multi_provider_qe()
+
+    outs = await asyncio.gather(
+        drain(qe.process_query("same?", Chat(10), None, "KG", "groq")),
+        drain(qe.process_query("same?", Chat(10), None, "KG", "gemini")),
+    )
+
+    assert ["".join(o) for o in outs] == ["answer from groq", "answer from gemini"]
+
+
+def test_kg_synonym_step_uses_each_providers_llm():
+    qe, gm = make_multi_provider_qe()
+
+    qe._engines_for("gemini")
+
+    for call in gm.index_KG.calls:
+        (retriever,) = call["sub_retrievers"]
+        assert retriever._llm is call["llm"]
+    assert gm.index_KG.calls[0]["llm"] is not gm.index_KG.calls[1]["llm"]
+
+
+async def test_async_path_streams_on_loop_and_caches():
+    cache = FakeCache(cached=None)
+    kg = FakeAsyncEngine(["<p>Hello", " world</p>"])
+    qe = make_qe(cache=cache, kg=kg, async_llm=True)
+
+    out = "".join(await drain(qe.process_query("hi", Chat(10), None, "KG")))
+
+    assert out == "<p>Hello world</p>"
+    assert cache.stored == [("hi", "<p>Hello world</p>")]
+    assert kg.threads[0] != threading.main_thread().name  # retrieval off-loop
+
+
+async def test_async_hyde_merges_plain_and_hypothetical_retrieval():
+    kg = FakeAsyncEngine(["answer"])
+    qe = make_qe(kg=kg, async_llm=True)
+    qe.hyde_transform = FakeTransform()
+
+    out = "".join(await drain(qe.process_query("q", Chat(10), "HyDE", "KG")))
+
+    assert out == "answer"  # asynthesize asserts the duplicate node was merged away
+    plain, hyde = kg.retrieved
+    assert plain.custom_embedding_strs is None
+    assert hyde.custom_embedding_strs[0] == "hypothetical doc"
+
+
+def hydeval(outcome):
+    v = REGISTRY.get_sample_value("inpersona_hyde_documents_total", {"outcome": outcome})
+    return v or 0.0
+
+
+async def test_hyde_document_is_reused_across_engines():
+    kg, vec = FakeAsyncEngine(["answer"]), FakeAsyncEngine(["answer"])
+    qe = make_qe(kg=kg, vector=vec, async_llm=True)
+    qe.hyde_transform = FakeTransform()
+    before = hydeval("cached")
+
+    await drain(qe.process_query("q", Chat(10), "HyDE", "KG"))
+    await drain(qe.process_query("Q ", Chat(10), "HyDE", "vector"))
+
+    assert qe.hyde_transform.calls == 1
+    (bundle,) = vec.retrieved  # cached document: no plain retrieval needed
+    assert bundle.custom_embedding_strs[0] == "hypothetical doc"
+    assert hydeval("cached") == before + 1
+
+
+async def test_slow_hyde_is_capped_by_the_budget_and_cached_when_it_lands():
+    gate = threading.Event()
+
+    class SlowTransform(FakeTransform):
+        def run(self, query_bundle):
+            gate.wait()
+            return super().run(query_bundle)
+
+    kg = FakeAsyncEngine(["answer"])
+    qe = make_qe(kg=kg, async_llm=True)
+    qe.graph_manager.settings.hyde_budget_seconds = 0.05
+    qe.hyde_transform = SlowTransform()
+    before = hydeval("timeout")
+
+    out = "".join(await drain(qe.process_query("q", Chat(10), "HyDE", "KG")))
+
+    assert out == "answer"
+    assert len(kg.retrieved) == 1  # plain candidates only
+    assert hydeval("timeout") == before + 1
+
+    gate.set()
+    for _ in range(100):
+        if len(qe.hyde_cache):
+            break
+        await asyncio.sleep(0.01)
+    await drain(qe.process_query("q", Chat(10), "HyDE", "KG"))
+
+    # The stand-in result wasn't cached, and the late document was.
+    assert len(kg.retrieved) == 2
+    assert kg.retrieved[1].custom_embedding_strs[0] == "hypothetical doc"
+    assert qe.hyde_transform.calls == 1
+
+
+async def test_retrieval_is_reused_across_conversations_and_providers():
+    kg = FakeAsyncEngine(["answer"])
+    qe = make_qe(kg=kg, async_llm=True)
+    qe._provider_engines["gemini"] = qe._engines_for(None)
+    earlier = Chat(10)
+    earlier.append({"role": "user", "content": "Where do you work?"})
+
+    await drain(qe.process_query("What do you build?", Chat(10), None, "KG"))
+    await drain(qe.process_query("  what do you build? ", earlier, None, "KG", "gemini"))
+
+    assert len(kg.retrieved) == 1
+    # Synthesis still sees the asking conversation's own history.
+    assert "Where do you work?" in kg.synthesized[-1]
+
+
+async def test_retrieval_cache_hit_skips_hyde_and_is_keyed_on_mode_and_index():
+    kg = FakeAsyncEngine(["answer"])
+    qe = make_qe(kg=kg, async_llm=True)
+    qe.hyde_transform = FakeTransform()
+
+    await drain(qe.process_query("q", Chat(10), "HyDE", "KG"))
+    await drain(qe.process_query("q", Chat(10), "HyDE", "KG"))
+    assert qe.hyde_transform.calls == 1
+    assert len(kg.retrieved) == 2  # plain + HyDE, once
+
+    await drain(qe.process_query("q", Chat(10), None, "KG"))  # no HyDE: its own retrieval
+    qe.fingerprint = "reindexed"
+    await drain(qe.process_query("q", Chat(10), "HyDE", "KG"))
+    assert len(kg.retrieved) == 5
+    assert qe.hyde_transform.calls == 2
+
+
+async def test_thread_bridge_splits_retrieval_and_shares_the_cache():
+    kg = FakeSplitEngine(["from synthesis"])
+    qe = make_qe(kg=kg)
+    qe._provider_engines["gemini"] = qe._engines_for(None)
+
+    first = "".join(await drain(qe.process_query("q", Chat(10), None, "KG")))
+    second = "".join(await drain(qe.process_query("q", Chat(10), None, "KG", "gemini")))
+
+    assert first == second == "from synthesis"
+    assert len(kg.retrieved) == 1
+    assert [ids for _query, ids in kg.synthesized] == [["n1"], ["n1"]]
+
+
+async def test_async_stream_holds_its_slot_until_it_ends():
+    release = asyncio.Event()
+    kg = FakeAsyncEngine(["slow"], release=release)
+    qe = make_qe(kg=kg, async_llm=True, executor=BoundedExecutor(max_workers=1, max_queue=0))
+
+    first = asyncio.ensure_future(drain(qe.process_query("first?", Chat(10), None, "KG")))
+    await asyncio.sleep(0.05)  # first is now mid-stream, on the loop
+    second = "".join(await drain(qe.process_query("second?", Chat(10), None, "KG")))
+    release.set()
+
+    assert "".join(await first) == "slow"
+    assert second == GENERIC_BUSY  # the stream still counts against the pool
+    third = "".join(await drain(qe.process_query("third?", Chat(10), None, "KG")))
+    assert third == "slow"  # slot given back when the stream ended
+
+
+async def test_async_path_error_yields_generic_message():
+    cache = FakeCache(cached=None)
+    qe = make_qe(cache=cache, kg=FakeAsyncEngine(exc=RuntimeError("secret")), async_llm=True)
+    before = errval("stream")
+
+    out = "".join(await drain(qe.process_query("q", Chat(10), None, "KG")))
+
+    assert out == GENERIC_ERROR
+    assert cache.stored == []
+    assert errval("stream") == before + 1
+
+
+async def test_falls_back_to_thread_bridge_without_async_support():
+    kg = FakeEngine(["via thread"])
+    qe = make_qe(kg=kg, async_llm=True)  # provider is async, engine isn't
+
+    out = "".join(await drain(qe.process_query("q", Chat(10), None, "KG")))
+
+    assert out == "via thread"
+    assert kg.calls == 1
+
+
+def cancelled_streams():
+    return REGISTRY.get_sample_value("inpersona_cancelled_streams_total") or 0.0
+
+
+async def test_timeout_cancels_async_upstream_stream():
+    kg = FakeAsyncEngine(["never sent"], release=asyncio.Event())
+    cache = FakeCache(cached=None)
+    qe = make_qe(cache=cache, kg=kg, async_llm=True, timeout=0.2)
+    before = cancelled_streams()
+
+    out = "".join(await drain(qe.process_query("q", Chat(10), None, "KG")))
+    await asyncio.sleep(0.05)
+
+    assert out == GENERIC_TIMEOUT
+    assert kg.responses[0].closed  # provider stream closed, not left generating
+    assert cancelled_streams() == before + 1
+    assert cache.stored == []
+    assert qe._inflight == {}
+
+
+async def test_disconnect_cancels_async_upstream_stream():
+    kg = FakeAsyncEngine(["first", "second"], release=asyncio.Event())
+    qe = make_qe(kg=kg, async_llm=True)
+
+    consumer = asyncio.ensure_future(drain(qe.process_query("q", Chat(10), None, "KG")))
+    await asyncio.sleep(0.05)
+    consumer.cancel()  # what the server does when the socket closes
+    await asyncio.sleep(0.05)
+
+    assert kg.responses[0].closed
+    assert qe._inflight == {}
+
+
+async def test_abandoned_thread_stream_is_closed_at_next_chunk():
+    resumed = threading.Event()
+    closed = threading.Event()
+    produced = []
+
+    def response_gen():
+        try:
+            produced.append("one")
+            yield "one"
+            resumed.wait()
+            produced.append("two")
+            yield "two"
+            produced.append("three")
+            yield "three"
+        finally:
+            closed.set()
+
+    engine = FakeEngine()
+    engine.query = lambda _ctx: SimpleNamespace(response_gen=response_gen())
+    qe = make_qe(kg=engine, timeout=0.2)
+
+    out = "".join(await drain(qe.process_query("q", Chat(10), None, "KG")))
+    resumed.set()
+    assert await asyncio.to_thread(closed.wait, 1)
+
+    assert out == "one" + GENERIC_TIMEOUT
+    assert "three" not in produced  # stream closed instead of read to the end
+
+
+async def test_wait_idle_outlasts_an_abandoned_stream():
+    resumed = threading.Event()
+
+    def response_gen():
+        yield "one"
+        resumed.wait()
+        yield "two"
+
+    engine = FakeEngine()
+    engine.query = lambda _ctx: SimpleNamespace(response_gen=response_gen())
+    qe = make_qe(kg=engine, timeout=0.2)
+
+    out = "".join(await drain(qe.process_query("q", Chat(10), None, "KG")))
+    idle = asyncio.ensure_future(qe.wait_idle())
+    await asyncio.sleep(0.05)
+    assert out == "one" + GENERIC_TIMEOUT
+    assert not idle.done()  # every subscriber left; the producer is still reading
+
+    resumed.set()
+    await asyncio.wait_for(idle, 1)
+
+
 async def test_stream_error_yields_generic_message_and_skips_cache():
     cache = FakeCache(cached=None)
     qe = make_qe(cache=cache, kg=FakeEngine(exc=RuntimeError("boom internal detail")))
@@ -198,6 +742,43 @@ async def test_query_timeout_yields_generic_timeout():
     assert chat.to_list()[-1] == {"role": "assistant", "content": GENERIC_TIMEOUT}
 
 
+async def test_saturated_pool_answers_busy_without_calling_llm():
+    gate = threading.Event()
+    kg = FakeEngine(["slow answer"], gate=gate)
+    qe = make_qe(kg=kg, executor=BoundedExecutor(max_workers=1, max_queue=0))
+    chat = Chat(10)
+    before = errval("busy")
+
+    first = qe.process_query("first question?", chat, None, "KG")
+    pending = asyncio.ensure_future(drain(first))
+    await asyncio.sleep(0.05)  # first stream now holds the only worker
+
+    out = await drain(qe.process_query("second question?", Chat(10), None, "KG"))
+
+    assert out == [GENERIC_BUSY]
+    assert errval("busy") == before + 1
+    assert kg.calls == 1  # the rejected query never reached the LLM
+
+    gate.set()
+    assert "".join(await pending) == "slow answer"
+
+
+async def test_identical_question_joins_flight_even_when_pool_is_full():
+    gate = threading.Event()
+    kg = FakeEngine(["shared"], gate=gate)
+    qe = make_qe(kg=kg, executor=BoundedExecutor(max_workers=1, max_queue=0))
+
+    first = asyncio.ensure_future(drain(qe.process_query("same?", Chat(10), None, "KG")))
+    await asyncio.sleep(0.05)
+    second = asyncio.ensure_future(drain(qe.process_query("same?", Chat(10), None, "KG")))
+    await asyncio.sleep(0.05)
+    gate.set()
+
+    assert "".join(await first) == "shared"
+    assert "".join(await second) == "shared"  # coalesced, not refused
+    assert kg.calls == 1
+
+
 async def test_empty_response_gen_yields_fallback_message():
     qe = make_qe(kg=FakeEngine(chunks=[], response_gen_none=True))
 
@@ -217,7 +798,17 @@ def test_initialize_propagates_similarity_top_k():
     try:
         gm = SimpleNamespace(
             settings=SimpleNamespace(
-                similarity_top_k=6, query_timeout_seconds=45.0, llm_max_retries=4
+                similarity_top_k=6,
+                query_timeout_seconds=45.0,
+                llm_max_retries=4,
+                retrieval_cache_size=16,
+                retrieval_cache_ttl_seconds=60.0,
+                hyde_budget_seconds=2.0,
+                hyde_cache_size=16,
+                hyde_cache_ttl_seconds=60.0,
+                kg_retrieval_mode="llm",
+                vector_retriever="chroma",
+                numpy_retriever_dtype="float32",
             ),
             index_KG=RecordingIndex(),
             index_vector=RecordingIndex(),
@@ -1,10 +1,11 @@
 """Transient-error classification and retry-with-backoff behavior."""
 
+import asyncio
 import time
 
 import pytest
 
-from chat.retry import call_with_retry, is_transient
+from chat.retry import acall_with_retry, call_with_retry, is_transient
 
 
 @pytest.fixture(autouse=True)
@@ -12,6 +13,11 @@ def _no_sleep(monkeypatch):
     # Neutralize tenacity's backoff sleeps so the suite stays fast/deterministic.
     monkeypatch.setattr(time, "sleep", lambda *a, **k: None)
 
+    async def _instant(*_a, **_k):
+        return None
+
+    monkeypatch.setattr(asyncio, "sleep", _instant)
+
 
 @pytest.mark.parametrize(
     "msg",
@@ -78,3 +84,28 @@ def test_exhausts_attempts_and_reraises_original():
 
 def test_forwards_args_and_kwargs():
     assert call_with_retry(lambda a, b=0: a + b, 2, b=3) == 5
+
+
+async def test_async_retries_transient_then_succeeds():
+    calls = {"n": 0}
+
+    async def flaky():
+        calls["n"] += 1
+        if calls["n"] < 3:
+            raise Exception("503 service unavailable")
+        return "ok"
+
+    assert await acall_with_retry(flaky, max_attempts=4) == "ok"
+    assert calls["n"] == 3
+
+
+async def test_async_does_not_retry_non_transient():
+    calls = {"n": 0}
+
+    async def bad():
+        calls["n"] += 1
+        raise ValueError("400 bad request")
+
+    with pytest.raises(ValueError):
+        await acall_with_retry(bad, max_attempts=4)
+    assert calls["n"] == 1
@@ -2,14 +2,25 @@
 
 The TestClient is used WITHOUT its lifespan context manager, so the heavy RAG
 stack is never initialized — exactly the cold-start state /ready must report as
-503.
+503. WebSocket tests swap in a stub chat manager.
 """
 
+import asyncio
+import json
+import os
+import signal
+import subprocess
+import sys
+import threading
+import time
 from types import SimpleNamespace
 
+import pytest
+import uvicorn
 from fastapi.testclient import TestClient
 
 import server
+from chat.startup import StartupProgress
 
 client = TestClient(server.app)
 
@@ -35,6 +46,150 @@ def test_ready_returns_200_when_engines_built(monkeypatch):
     assert r.json()["status"] == "ready"
 
 
+def test_ready_reports_startup_progress(monkeypatch):
+    progress = StartupProgress()
+    with progress.track("imports"):
+        pass
+    progress.stage = "models"
+    monkeypatch.setattr(server, "chat_manager", None)
+    monkeypatch.setattr(server, "startup", progress)
+
+    body = client.get("/ready").json()
+    assert body["status"] == "initializing"
+    assert body["stage"] == "models"
+    assert set(body["completed"]) == {"imports"}
+    assert body["pending"] == ["chroma", "indices", "engines"]
+
+    progress.fail(RuntimeError("chroma unreachable"))
+    assert client.get("/ready").json()["status"] == "failed"
+
+
+def background_startup(monkeypatch, build):
+    monkeypatch.setattr(server, "_build_chat_manager", build)
+    monkeypatch.setattr(server, "chat_manager", None)
+    monkeypatch.setattr(server, "startup", StartupProgress())
+    monkeypatch.setattr(server, "_startup_failed", False)
+    monkeypatch.setattr(server.SETTINGS, "startup_mode", "background")
+    monkeypatch.setattr(server.SETTINGS, "answer_warming_top_n", 0)
+
+
+def test_background_startup_serves_health_while_warming(monkeypatch):
+    building, release = threading.Event(), threading.Event()
+    warm = SimpleNamespace(
+        query_engine=SimpleNamespace(query_engine_KG=object()), cleanup=lambda: None
+    )
+
+    def build(_provider, progress):
+        with progress.track("models"):
+            building.set()
+            release.wait(5)
+        progress.finish()
+        return warm
+
+    background_startup(monkeypatch, build)
+
+    with TestClient(server.app) as warming:
+        assert building.wait(5)
+        assert warming.get("/health").status_code == 200
+        assert warming.get("/ready").json()["stage"] == "models"
+        with warming.websocket_connect(server.SETTINGS.websocket_path) as ws:
+            ws.send_text(json.dumps({"question": "hello?"}))
+            assert "starting up" in json.loads(ws.receive_text())["error"]
+
+        release.set()
+        for _ in range(100):
+            if warming.get("/ready").status_code == 200:
+                break
+            time.sleep(0.02)
+        assert warming.get("/ready").json() == {"status": "ready"}
+
+
+def test_failed_background_startup_exits_nonzero(monkeypatch):
+    runs = []
+
+    class Server:
+        """uvicorn.Server stand-in: serves until told to exit, like main_loop."""
+
+        def __init__(self, config):
+            self.should_exit = False
+
+        def run(self):
+            with TestClient(server.app) as failing:
+                for _ in range(100):
+                    if self.should_exit:
+                        break
+                    time.sleep(0.02)
+                runs.append(failing.get("/ready").json()["status"])
+
+    def build(_provider, _progress):
+        raise RuntimeError("chroma unreachable")
+
+    background_startup(monkeypatch, build)
+    monkeypatch.setattr(server, "_server", None)
+    monkeypatch.setattr(uvicorn, "Server", Server)
+    monkeypatch.setattr(uvicorn, "Config", lambda app, **config: config)
+
+    with pytest.raises(SystemExit) as exited:
+        server.serve()
+
+    assert runs == ["failed"]  # uvicorn's normal shutdown ran first...
+    assert exited.value.code == server.STARTUP_FAILURE_EXIT_CODE  # ...then a failing exit
+
+
+def test_failed_startup_under_the_uvicorn_cli_stops_it_by_signal(monkeypatch):
+    signals = []
+
+    def build(_provider, _progress):
+        raise RuntimeError("chroma unreachable")
+
+    background_startup(monkeypatch, build)
+    monkeypatch.setattr(server, "_server", None)
+    monkeypatch.setattr(server.signal, "raise_signal", signals.append)
+
+    with TestClient(server.app) as failing:
+        for _ in range(100):
+            if signals:
+                break
+            time.sleep(0.02)
+        assert failing.get("/ready").json()["status"] == "failed"
+
+    assert signals == [signal.SIGTERM]
+    assert server._startup_failed is True
+
+
+def test_shutdown_cancels_a_background_build(monkeypatch):
+    building, release = threading.Event(), threading.Event()
+
+    def build(_provider, _progress):
+        building.set()
+        release.wait(5)
+        return SimpleNamespace(cleanup=lambda: None)
+
+    background_startup(monkeypatch, build)
+    with TestClient(server.app):
+        assert building.wait(5)
+
+    assert server._warmup_task.cancelled()
+    release.set()
+
+
+def test_importing_server_defers_the_rag_stack():
+    code = (
+        "import sys, server; "
+        "print(sorted(m for m in ('torch', 'chromadb', 'llama_index.core') if m in sys.modules))"
+    )
+    env = {**os.environ, "GROQ_API_KEY": "x", "Google_Gemini_API_KEY": "x"}
+    out = subprocess.run(
+        [sys.executable, "-c", code],
+        cwd=os.path.dirname(server.__file__),
+        env=env,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    assert out.stdout.strip() == "[]"
+
+
 def test_metrics_exposition_format():
     r = client.get("/metrics")
     assert r.status_code == 200
@@ -60,3 +215,206 @@ def test_client_key_falls_back_to_peer():
 def test_client_key_unknown_without_client():
     ws = SimpleNamespace(headers={}, client=None)
     assert server._client_key(ws) == "unknown"
+
+
+def test_disconnect_mid_answer_cancels_query(monkeypatch):
+    cancelled = threading.Event()
+
+    async def query(**_kwargs):
+        try:
+            yield "first"
+            await asyncio.Event().wait()  # an answer that never finishes
+            yield "unreachable"
+        finally:
+            cancelled.set()
+
+    stub = SimpleNamespace(query=query, model_manager=SimpleNamespace(model_provider="groq"))
+    monkeypatch.setattr(server, "chat_manager", stub, raising=False)
+
+    with client.websocket_connect(server.SETTINGS.websocket_path) as ws:
+        ws.send_text(json.dumps({"question": "hello?"}))
+        assert json.loads(ws.receive_text()) == {"type": "chunk", "content": "first"}
+
+    assert cancelled.wait(2)
+
+
+async def test_failed_receive_mid_answer_cancels_query():
+    cancelled = asyncio.Event()
+
+    async def chunks():
+        try:
+            yield "first"
+            await asyncio.Event().wait()
+        finally:
+            cancelled.set()
+
+    async def receive():
+        await asyncio.sleep(0.05)
+        raise RuntimeError("socket reset")
+
+    sent = []
+
+    async def send_text(text):
+        sent.append(text)
+
+    listener = asyncio.create_task(receive())
+    await asyncio.wait_for(
+        server._stream_answer(SimpleNamespace(send_text=send_text), chunks(), listener), 2
+    )
+
+    assert cancelled.is_set()  # the sender was not left streaming
+    assert isinstance(listener.exception(), RuntimeError)  # left for the main loop
+    assert len(sent) == 1
+
+
+def test_frame_sent_mid_answer_is_handled_after_it(monkeypatch):
+    async def query(question, **_kwargs):
+        await asyncio.sleep(0.05)
+        yield f"answer to {question}"
+
+    stub = SimpleNamespace(query=query, model_manager=SimpleNamespace(model_provider="groq"))
+    monkeypatch.setattr(server, "chat_manager", stub, raising=False)
+
+    with client.websocket_connect(server.SETTINGS.websocket_path) as ws:
+        ws.send_text(json.dumps({"question": "one?"}))
+        ws.send_text(json.dumps({"question": "two?"}))
+        frames = [json.loads(ws.receive_text()) for _ in range(4)]
+
+    assert frames == [
+        {"type": "chunk", "content": "answer to one?"},
+        {"type": "complete"},
+        {"type": "chunk", "content": "answer to two?"},
+        {"type": "complete"},
+    ]
+
+
+def test_provider_is_chosen_per_request(monkeypatch):
+    seen = []
+
+    async def query(model_provider=None, **_kwargs):
+        seen.append(model_provider)
+        yield "ok"
+
+    stub = SimpleNamespace(
+        query=query,
+        model_manager=SimpleNamespace(has_provider=lambda p: p in {"groq", "gemini"}),
+    )
+    monkeypatch.setattr(server, "chat_manager", stub, raising=False)
+    monkeypatch.setattr(server.rate_limiter, "allow", lambda _key: True)
+
+    with client.websocket_connect(server.SETTINGS.websocket_path) as ws:
+        ws.send_text(json.dumps({"question": "a?", "model_provider": "gemini"}))
+        assert json.loads(ws.receive_text())["content"] == "ok"
+        assert json.loads(ws.receive_text()) == {"type": "complete"}
+        ws.send_text(json.dumps({"question": "b?", "model_provider": "openai"}))
+        assert "error" in json.loads(ws.receive_text())
+
+    assert seen == ["gemini"]  # unconfigured provider rejected, chat manager untouched
+
+
+def test_admin_reload_disabled_without_token(monkeypatch):
+    monkeypatch.setattr(server.SETTINGS, "admin_token", None)
+    assert client.post("/admin/reload").status_code == 404
+
+
+def test_admin_reload_requires_bearer_token(monkeypatch):
+    monkeypatch.setattr(server.SETTINGS, "admin_token", "s3cret")
+    assert client.post("/admin/reload").status_code == 401
+    r = client.post("/admin/reload", headers={"Authorization": "Bearer wrong"})
+    assert r.status_code == 401
+
+
+def test_admin_reload_starts_in_background(monkeypatch):
+    started = []
+
+    async def reload_generation():
+        started.append(True)
+
+    monkeypatch.setattr(server, "_reload_generation", reload_generation)
+    monkeypatch.setattr(server, "_reload_task", None)
+    monkeypatch.setattr(server, "_reload_status", "idle")
+    monkeypatch.setattr(server.SETTINGS, "admin_token", "s3cret")
+    monkeypatch.setattr(server, "chat_manager", None)
+    r = client.post("/admin/reload", headers={"Authorization": "Bearer s3cret"})
+    assert r.status_code == 503  # nothing to reload until the first build is warm
+
+    monkeypatch.setattr(server, "chat_manager", SimpleNamespace(generation=None))
+    r = client.post("/admin/reload", headers={"Authorization": "Bearer s3cret"})
+    assert r.status_code == 202
+    assert r.json()["status"] == "reloading"
+
+
+def test_reload_activates_the_built_generation(monkeypatch):
+    async def activate(generation):
+        stub.generation = generation
+
+    stub = SimpleNamespace(
+        generation=SimpleNamespace(id=None),
+        build_generation=lambda: SimpleNamespace(id="g1"),
+        activate_generation=activate,
+    )
+    monkeypatch.setattr(server, "chat_manager", stub, raising=False)
+    monkeypatch.setattr(server, "_reload_status", "reloading")
+    asyncio.run(server._reload_generation())
+    assert server._reload_state() == {"status": "idle", "generation": "g1"}
+
+
+def test_admin_reload_failure_keeps_serving_old_generation(monkeypatch):
+    stub = SimpleNamespace(
+        generation=SimpleNamespace(id="g0"),
+        build_generation=lambda: None,
+        activate_generation=lambda generation: pytest.fail("must not activate"),
+    )
+    monkeypatch.setattr(server, "chat_manager", stub, raising=False)
+    monkeypatch.setattr(server, "_reload_status", "reloading")
+    asyncio.run(server._reload_generation())
+    assert server._reload_state() == {"status": "failed", "generation": "g0"}
+
+
+def test_admin_warm_runs_one_warmup_at_a_time(monkeypatch):
+    runs = []
+    gate = asyncio.Event()
+
+    async def warm_answers(top_n):
+        runs.append(top_n)
+        await gate.wait()
+
+    monkeypatch.setattr(server, "_warm_answers", warm_answers)
+    monkeypatch.setattr(server, "_warm_task", None)
+    monkeypatch.setattr(server.SETTINGS, "admin_token", "s3cret")
+    auth = {"Authorization": "Bearer s3cret"}
+
+    assert client.post("/admin/warm").status_code == 401
+    monkeypatch.setattr(server, "chat_manager", None)
+    assert client.post("/admin/warm", headers=auth).status_code == 503
+
+    warm = SimpleNamespace(cleanup=lambda: None)
+    monkeypatch.setattr(server, "_build_chat_manager", lambda *_args: warm)
+    monkeypatch.setattr(server.SETTINGS, "answer_warming_top_n", 0)  # no automatic run
+    with TestClient(server.app) as live:  # one loop, so the task stays pending
+        monkeypatch.setattr(server, "chat_manager", warm)
+        r = live.post("/admin/warm?top_n=3", headers=auth)
+        assert r.status_code == 202
+        assert r.json()["status"] == "warming"
+        assert live.post("/admin/warm", headers=auth).status_code == 409
+        assert live.get("/admin/warm", headers=auth).json()["status"] == "warming"
+    assert runs == [3]
+
+
+def test_reload_warms_answers_for_the_new_generation(monkeypatch):
+    started = []
+    monkeypatch.setattr(server, "_start_answer_warming", lambda **kw: started.append(kw))
+
+    async def activate(_generation):
+        pass
+
+    stub = SimpleNamespace(
+        generation=SimpleNamespace(id=None),
+        build_generation=lambda: SimpleNamespace(id="g1"),
+        activate_generation=activate,
+    )
+    monkeypatch.setattr(server, "chat_manager", stub)
+
+    asyncio.run(server._reload_generation())
+
+    assert started == [{"automatic": True}]
@@ -0,0 +1,256 @@
+"""Vector index persistence and incremental re-indexing.
+
+Uses an in-memory Chroma collection, a mock embedder and a scripted LLM, so no
+model download or API key is needed.
+"""
+
+import re
+import uuid
+from types import SimpleNamespace
+from typing import Any
+
+import chromadb
+import pytest
+from llama_index.core import Document
+from llama_index.core.embeddings import MockEmbedding
+from llama_index.core.llms import CompletionResponse, CustomLLM, LLMMetadata
+from llama_index.core.storage.docstore import SimpleDocumentStore
+from llama_index.vector_stores.chroma import ChromaVectorStore
+from pydantic import Field
+
+from chat.vector_store_manager import VectorStoreManager
+
+
+class CountingEmbedding(MockEmbedding):
+    """Mock embedder that records every text it is asked to embed."""
+
+    embedded: list = Field(default_factory=list)
+
+    def _get_text_embeddings(self, texts):
+        self.embedded.extend(texts)
+        return super()._get_text_embeddings(texts)
+
+    async def _aget_text_embeddings(self, texts):
+        return self._get_text_embeddings(texts)
+
+
+class TripletLLM(CustomLLM):
+    """Extracts one (Yatharth, uses, <Tool>) triplet per known tool in each passage."""
+
+    prompts: list = Field(default_factory=list)
+
+    @property
+    def metadata(self) -> LLMMetadata:
+        return LLMMetadata()
+
+    def complete(self, prompt: str, formatted: bool = False, **kwargs: Any) -> CompletionResponse:
+        self.prompts.append(prompt)
+        body = prompt.rsplit("---------------------", 1)[-1]
+        passages = re.split(r"^### Passage \d+$", body, flags=re.MULTILINE)
+        lines = []
+        for i, passage in enumerate(passages[1:] or passages, start=1):
+            if len(passages) > 1:
+                lines.append(f"### Passage {i}")
+            tools = dict.fromkeys(re.findall(r"\b(Kafka|Redis|Postgres|Rust)\b", passage))
+            lines.extend(f"(Yatharth, uses, {t})" for t in tools)
+        return CompletionResponse(text="\n".join(lines))
+
+    def stream_complete(self, prompt: str, formatted: bool = False, **kwargs: Any):
+        raise NotImplementedError
+
+
+@pytest.fixture
+def docs(tmp_path):
+    directory = tmp_path / "documents"
+    directory.mkdir()
+    return directory
+
+
+@pytest.fixture
+def collection():
+    return chromadb.EphemeralClient().create_collection(f"t-{uuid.uuid4().hex[:8]}")
+
+
+@pytest.fixture
+def models():
+    return SimpleNamespace(
+        embed_model=CountingEmbedding(embed_dim=8),
+        llm=TripletLLM(),
+    )
+
+
+@pytest.fixture
+def manager(tmp_path, docs, collection, models):
+    settings = SimpleNamespace(
+        storage_dir=str(tmp_path / "storage"),
+        pdf_directory=str(docs),
+        graph_file=str(tmp_path / "kg.html"),
+        chunk_size=192,
+        chunk_overlap=0,
+        kg_extraction_batch_size=4,
+        kg_extraction_concurrency=2,
+        kg_extraction_requests_per_minute=0,
+        llm_max_retries=1,
+    )
+    chroma = SimpleNamespace(
+        get_vector_store=lambda: ChromaVectorStore(chroma_collection=collection)
+    )
+    return lambda: VectorStoreManager(settings, models, chroma)
+
+
+def retrieve_texts(vsm, query="resume"):
+    return [
+        n.get_content() for n in vsm.index_vector.as_retriever(similarity_top_k=5).retrieve(query)
+    ]
+
+
+def test_vector_index_round_trips_without_pickle(manager):
+    built = manager()
+    built.documents = [Document(text="Yatharth's resume: search latency work.")]
+    assert built.create_vector_store() is True
+    assert not (built._vector_dir().parent / "vector_store.pkl").exists()
+
+    loaded = manager()
+    assert loaded.can_load_existing_vector_store() is True
+    assert loaded.load_existing_vector_store() is True
+    assert retrieve_texts(loaded) == retrieve_texts(built)
+
+
+def test_legacy_pickle_is_migrated_not_unpickled(manager):
+    seeded = manager()
+    seeded.documents = [Document(text="Vectors already live in Chroma.")]
+    assert seeded.create_vector_store() is True
+    for path in seeded._vector_dir().iterdir():
+        path.unlink()
+    legacy = seeded._vector_dir().parent / "vector_store.pkl"
+    legacy.write_bytes(b"not a pickle - loading this would raise")
+
+    vsm = manager()
+    assert vsm.can_load_existing_vector_store() is True
+    assert vsm.load_existing_vector_store() is True
+
+    assert not legacy.exists()
+    assert vsm._has_vector_metadata()
+    assert retrieve_texts(vsm) == ["Vectors already live in Chroma."]
+
+
+def test_nothing_to_load_on_fresh_storage(manager):
+    assert manager().can_load_existing_vector_store() is False
+
+
+# --- incremental re-indexing -------------------------------------------------
+
+PARAGRAPHS = [
+    "At Acme I rebuilt the ingestion pipeline on Kafka and cut lag to seconds.",
+    "At Globex I moved session storage to Redis and halved p99 latency.",
+    "At Initech I wrote a query planner in Rust for the analytics service.",
+]
+
+
+def write_resume(docs, paragraphs):
+    # Padded so each paragraph fills most of a chunk and lands in its own one.
+    padded = [p + " " + "Shipped, measured and documented it." * 12 for p in paragraphs]
+    (docs / "resume.txt").write_text("\n\n\n".join(padded), encoding="utf-8")
+
+
+def vector_chunk_texts(collection):
+    rows = collection.get(include=["documents", "metadatas"])
+    return sorted(
+        text
+        for text, meta in zip(rows["documents"], rows["metadatas"], strict=True)
+        if "vector_source_id" not in meta
+    )
+
+
+def test_unchanged_documents_are_not_reembedded(manager, docs, models):
+    write_resume(docs, PARAGRAPHS)
+    built = manager()
+    assert built.load_documents() and built.create_vector_store()
+    assert len(built._chunk_documents()["resume.txt"]) >= 3
+
+    models.embed_model.embedded.clear()
+    loaded = manager()
+    assert loaded._load_or_create_vector_store() is True
+    assert models.embed_model.embedded == []
+
+
+def test_edit_reembeds_only_the_changed_chunk(manager, docs, models, collection):
+    write_resume(docs, PARAGRAPHS)
+    built = manager()
+    assert built.load_documents() and built.create_vector_store()
+    before = vector_chunk_texts(collection)
+
+    edited = [PARAGRAPHS[0], "At Globex I moved session storage to Postgres.", PARAGRAPHS[2]]
+    write_resume(docs, edited)
+    models.embed_model.embedded.clear()
+    loaded = manager()
+    assert loaded._load_or_create_vector_store() is True
+
+    assert len(models.embed_model.embedded) == 1
+    assert "Postgres" in models.embed_model.embedded[0]
+    after = vector_chunk_texts(collection)
+    assert len(after) == len(before)
+    assert not any("Redis" in text for text in after)
+    assert loaded._read_manifest(loaded._vector_dir()) == {
+        "resume.txt": [n.id_ for n in loaded._chunk_documents()["resume.txt"]]
+    }
+
+
+def test_deleted_file_is_removed_from_chroma(manager, docs, collection):
+    write_resume(docs, PARAGRAPHS)
+    (docs / "notes.txt").write_text("Side project: a Rust ray tracer.", encoding="utf-8")
+    built = manager()
+    assert built.load_documents() and built.create_vector_store()
+
+    (docs / "notes.txt").unlink()
+    loaded = manager()
+    assert loaded._load_or_create_vector_store() is True
+    assert not any("ray tracer" in text for text in vector_chunk_texts(collection))
+    assert "notes.txt" not in loaded._read_manifest(loaded._vector_dir())
+
+
+def test_graph_sync_extracts_only_new_chunks_and_prunes_orphans(
+    manager, docs, models, collection, tmp_path, monkeypatch
+):
+    monkeypatch.chdir(tmp_path)  # pyvis writes its JS assets into the cwd
+    write_resume(docs, PARAGRAPHS)
+    built = manager()
+    assert built.load_documents() and built.create_knowledge_graph()
+    graph = built.index_KG.property_graph_store.graph
+    assert {"Kafka", "Redis", "Rust"} <= graph.nodes.keys()
+
+    edited = [PARAGRAPHS[0], "At Globex I moved session storage to Postgres.", PARAGRAPHS[2]]
+    write_resume(docs, edited)
+    models.llm.prompts.clear()
+    loaded = manager()
+    assert loaded._load_or_create_graph() is True
+
+    assert len(models.llm.prompts) == 1
+    graph = loaded.index_KG.property_graph_store.graph
+    assert "Redis" not in graph.nodes
+    assert {"Kafka", "Postgres", "Rust", "Yatharth"} <= graph.nodes.keys()
+    entity_vectors = collection.get(where={"vector_source_id": "Redis"})
+    assert entity_vectors["ids"] == []
+
+    # The persisted docstore holds exactly the current chunks: the edited-away
+    # one is deleted, the unchanged ones are not dropped by the sync.
+    docstore = SimpleDocumentStore.from_persist_dir(str(tmp_path / "storage"))
+    texts = [node.get_content() for node in docstore.docs.values()]
+    assert sorted(text.split(" Shipped")[0] for text in texts) == sorted(edited)
+
+
+def test_fingerprint_covers_only_the_index_files(manager, docs, tmp_path):
+    write_resume(docs, PARAGRAPHS)
+    built = manager()
+    assert built.load_documents() and built.create_vector_store()
+    before = built.index_fingerprint()
+
+    storage = tmp_path / "storage"
+    (storage / "ACTIVE_GENERATION").write_text("g1")
+    (storage / "generations" / "g1").mkdir(parents=True)
+    (storage / "generations" / "g1" / "docstore.json").write_text("{}")
+    (storage / "notes.txt").write_text("kept by the operator")
+    assert built.index_fingerprint() == before
+
+    (storage / "vector" / "manifest.json").write_text('{"resume.txt": []}')
+    assert built.index_fingerprint() != before
@@ -0,0 +1,101 @@
+"""Bounded worker pool: caps running + queued work and exports usage gauges."""
+
+import threading
+import time
+
+from prometheus_client import REGISTRY
+
+from chat.worker_pool import BoundedExecutor
+
+
+def workers(state):
+    return REGISTRY.get_sample_value("inpersona_llm_workers", {"state": state}) or 0.0
+
+
+def test_rejects_beyond_workers_plus_queue():
+    gate = threading.Event()
+    pool = BoundedExecutor(max_workers=1, max_queue=1)
+    try:
+        running = pool.try_submit(gate.wait)
+        queued = pool.try_submit(gate.wait)
+        assert running is not None
+        assert queued is not None
+        assert pool.try_submit(gate.wait) is None  # saturated: refused at once
+    finally:
+        gate.set()
+        pool.shutdown(wait=True)
+
+
+def test_slot_is_released_after_work_finishes():
+    pool = BoundedExecutor(max_workers=1, max_queue=0)
+    try:
+        assert pool.try_submit(lambda: 1).result(timeout=1) == 1
+        assert pool.try_submit(lambda: 2).result(timeout=1) == 2
+    finally:
+        pool.shutdown(wait=True)
+
+
+def test_slot_is_released_when_work_raises():
+    pool = BoundedExecutor(max_workers=1, max_queue=0)
+
+    def boom():
+        raise RuntimeError("boom")
+
+    try:
+        assert pool.try_submit(boom).exception(timeout=1) is not None
+        assert pool.try_submit(lambda: "ok").result(timeout=1) == "ok"
+    finally:
+        pool.shutdown(wait=True)
+
+
+def test_gauges_track_in_use_and_queued():
+    gate = threading.Event()
+    started = threading.Event()
+
+    def work():
+        started.set()
+        gate.wait()
+
+    pool = BoundedExecutor(max_workers=1, max_queue=1)
+    try:
+        pool.try_submit(work)
+        started.wait(timeout=1)
+        pool.try_submit(gate.wait)
+        assert workers("in_use") == 1
+        assert workers("queued") == 1
+    finally:
+        gate.set()
+        pool.shutdown(wait=True)
+    deadline = time.monotonic() + 1
+    while workers("in_use") and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert workers("in_use") == 0
+    assert workers("queued") == 0
+
+
+def test_submit_after_shutdown_is_refused():
+    pool = BoundedExecutor(max_workers=1, max_queue=0)
+    pool.shutdown(wait=True)
+    assert pool.try_submit(lambda: None) is None
+    assert workers("queued") == 0  # the refused submission left no phantom entry
+
+
+def test_reserved_slot_counts_against_admission_until_released():
+    pool = BoundedExecutor(max_workers=1, max_queue=0)
+    try:
+        release = pool.try_reserve()
+        assert release is not None
+        assert workers("in_use") == 1
+        assert pool.submit(lambda: "retrieved").result(timeout=1) == "retrieved"
+        assert pool.try_reserve() is None
+        assert pool.try_submit(lambda: None) is None
+
+        release()
+        release()  # idempotent: the slot is not given back twice
+        assert workers("in_use") == 0
+        again = pool.try_reserve()
+        assert again is not None
+        assert pool.try_reserve() is None
+        again()
+    finally:
+        pool.shutdown(wait=True)